@@ -0,0 +1,274 @@
+import json
+import os
+from collections import (
+    OrderedDict,
+)
+from hashlib import (
+    blake2b,
+)
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Optional,
+    Union,
+)
+
+import numpy as np
+
+from databaser.core.helpers import (
+    logger,
+)
+from databaser.core.storages import (
+    ArrayPKStorage,
+    BasePKStorage,
+)
+
+
+class LookupsCache:
+    """
+    Cache of results of lookups of tables column values
+
+    Lookups are identified by stable fingerprint of table, column, lookup
+    direction and digests of identifiers sets of conditions. Results are
+    evicted in least recently used order, when total count of cached
+    identifiers exceeds limit. Lookups returned nothing are kept in separate
+    negative cache, which is limited by count of fingerprints
+    """
+
+    # Limit of count of fingerprints of lookups returned nothing
+    NEGATIVE_CACHE_SIZE = 100000
+
+    def __init__(
+        self,
+        max_size: int,
+    ):
+        self._max_size = max_size
+        self._size = 0
+
+        self._results: OrderedDict = OrderedDict()
+        self._negative_results: OrderedDict = OrderedDict()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._max_size > 0
+
+    @staticmethod
+    def _update_digest(
+        digest,
+        ids: Iterable[Union[int, str]],
+    ):
+        """
+        Updating digest by set of identifiers independent of their order.
+        Arrays are hashed without copying, string identifiers are hashed one
+        by one
+        """
+        if isinstance(ids, ArrayPKStorage):
+            array = ids.array
+        else:
+            ids = list(ids)
+
+            if ids and isinstance(ids[0], int):
+                array = np.unique(np.fromiter(ids, dtype=np.int64))
+            else:
+                array = None
+
+                ids.sort(key=str)
+
+                digest.update(f's{len(ids)}:'.encode())
+
+                for id_ in ids:
+                    digest.update(f'{id_}\x00'.encode())
+
+        if array is not None:
+            digest.update(f'i{array.size}:'.encode())
+            digest.update(memoryview(np.ascontiguousarray(array)))
+
+    def make_fingerprint(
+        self,
+        table_name: str,
+        column_name: str,
+        primary_key_values: Iterable[Union[int, str]] = (),
+        where_conditions_columns: Optional[Dict[str, Iterable[Union[int, str]]]] = None,  # noqa
+        is_revert: bool = False,
+    ) -> bytes:
+        """
+        Stable fingerprint of lookup
+        """
+        digest = blake2b(digest_size=20)
+        digest.update(
+            f'{table_name}\x00{column_name}\x00{int(is_revert)}\x00'.encode()
+        )
+
+        self._update_digest(digest, primary_key_values)
+
+        for c_name, c_ids in sorted((where_conditions_columns or {}).items()):
+            digest.update(f'\x00{c_name}\x00'.encode())
+
+            self._update_digest(digest, c_ids or ())
+
+        return digest.digest()
+
+    def get(
+        self,
+        fingerprint: bytes,
+    ) -> Optional[BasePKStorage]:
+        """
+        Getting cached result of lookup. Returned storage must not be changed
+        """
+        if fingerprint in self._negative_results:
+            self._negative_results.move_to_end(fingerprint)
+            self.negative_hits += 1
+
+            return self._negative_results[fingerprint]
+
+        result = self._results.get(fingerprint)
+
+        if result is not None:
+            self._results.move_to_end(fingerprint)
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        return result
+
+    def set(
+        self,
+        fingerprint: bytes,
+        result: BasePKStorage,
+    ):
+        """
+        Caching result of lookup
+        """
+        if not self.is_enabled:
+            return
+
+        if not result:
+            self._negative_results[fingerprint] = result
+
+            if len(self._negative_results) > self.NEGATIVE_CACHE_SIZE:
+                self._negative_results.popitem(last=False)
+
+            return
+
+        result_size = len(result)
+
+        # слишком большие результаты не кешируются, чтобы не вытеснять все
+        # остальные
+        if result_size > self._max_size:
+            return
+
+        previous_result = self._results.pop(fingerprint, None)
+        if previous_result is not None:
+            self._size -= len(previous_result)
+
+        self._results[fingerprint] = result
+        self._size += result_size
+
+        while self._size > self._max_size:
+            _, evicted_result = self._results.popitem(last=False)
+            self._size -= len(evicted_result)
+            self.evictions += 1
+
+    def get_statistic(self) -> Dict[str, int]:
+        """
+        Indicators of cache work
+        """
+        return {
+            'size': self._size,
+            'max_size': self._max_size,
+            'results': len(self._results),
+            'negative_results': len(self._negative_results),
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class FilesCache:
+    """
+    Cache of JSON-serializable results stored in files of directory. Results
+    are reused by repeated runs
+
+    Result is identified by name and key. Key must be JSON-serializable and
+    contain everything result depends on, so changed data gets new key
+    """
+
+    def __init__(
+        self,
+        directory: str,
+    ):
+        self._directory = directory
+
+    @property
+    def is_enabled(self) -> bool:
+        return bool(self._directory)
+
+    def _get_file_path(
+        self,
+        name: str,
+        key: Any,
+    ) -> str:
+        digest = blake2b(
+            json.dumps(key, sort_keys=True, default=str).encode(),
+            digest_size=16,
+        )
+
+        return os.path.join(
+            self._directory,
+            f'{name}_{digest.hexdigest()}.json',
+        )
+
+    def get(
+        self,
+        name: str,
+        key: Any,
+    ) -> Optional[Any]:
+        """
+        Getting cached result. If result is absent or file is damaged, None
+        is returned
+        """
+        if not self.is_enabled:
+            return
+
+        file_path = self._get_file_path(name, key)
+
+        try:
+            with open(file_path) as cache_file:
+                return json.load(cache_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f'{str(e)} --- {file_path} --- FilesCache.get')
+
+    def set(
+        self,
+        name: str,
+        key: Any,
+        value: Any,
+    ):
+        """
+        Caching result. File is written atomically by renaming of temporary
+        file
+        """
+        if not self.is_enabled:
+            return
+
+        file_path = self._get_file_path(name, key)
+        tmp_file_path = f'{file_path}.tmp'
+
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+
+            with open(tmp_file_path, 'w') as cache_file:
+                json.dump(value, cache_file)
+
+            os.replace(tmp_file_path, file_path)
+        except OSError as e:
+            logger.warning(f'{str(e)} --- {file_path} --- FilesCache.set')
@@ -3,46 +3,73 @@ from abc import (
     ABCMeta,
     abstractmethod,
 )
-from copy import (
-    copy,
-)
 from typing import (
+    Callable,
     Dict,
     Iterable,
+    Iterator,
     List,
     Optional,
+    Sequence,
     Set,
+    Tuple,
     Union,
 )
 
 import asyncpg
+from async_lru import (
+    alru_cache,
+)
 
+from databaser.core.caches import (
+    LookupsCache,
+)
 from databaser.core.db_entities import (
     DBColumn,
     DBTable,
     DstDatabase,
     SrcDatabase,
 )
+from databaser.core.engines import (
+    ClosureEngine,
+    ServerSideClosureEngine,
+)
 from databaser.core.enums import (
+    LookupStrategiesEnum,
     StagesEnum,
 )
 from databaser.core.helpers import (
+    get_dependency_levels,
+    get_strongly_connected_components,
     logger,
-    make_chunks,
-    make_str_from_iterable,
-    topological_sort,
 )
 from databaser.core.loggers import (
     StatisticManager,
     statistic_indexer,
 )
+from databaser.core.planners import (
+    LookupsPlanner,
+)
 from databaser.core.repositories import (
     SQLRepository,
 )
+from databaser.core.schedulers import (
+    TaskScheduler,
+)
+from databaser.core.storages import (
+    BasePKStorage,
+    SetPKStorage,
+    make_pk_storage,
+)
 from databaser.settings import (
     EXCLUDED_TABLES,
     FULL_TRANSFER_TABLES,
+    IS_BATCHED_GENERIC_TABLES,
+    KEY_COLUMN_NAMES,
     KEY_TABLE_NAME,
+    SAMPLE_PERCENT,
+    SAMPLE_ROWS_LIMIT,
+    SORTED_TABLES_LEVEL_CONCURRENCY,
     TABLES_WITH_GENERIC_FOREIGN_KEY,
 )
 
@@ -50,8 +77,8 @@ from databaser.settings import (
 class BaseCollector(metaclass=ABCMeta):
     CHUNK_SIZE = 60000
 
-    # Hashes of unique SQL-queries uses for excluding duplicate of queries
-    QUERY_HASHES = set()
+    # Size of batches of records fetched by cursor
+    FETCH_BATCH_SIZE = 10000
 
     def __init__(
         self,
@@ -59,40 +86,357 @@ class BaseCollector(metaclass=ABCMeta):
         dst_database: DstDatabase,
         statistic_manager: StatisticManager,
         key_column_values: Set[int],
+        scheduler: TaskScheduler,
+        lookups_cache: LookupsCache,
+        lookups_planner: LookupsPlanner,
+        on_table_ready: Optional[Callable[[DBTable], None]] = None,
     ):
         self._dst_database = dst_database
         self._src_database = src_database
         self._key_column_values = key_column_values
         self._statistic_manager = statistic_manager
+        self._scheduler = scheduler
+        self._lookups_cache = lookups_cache
+        self._lookups_planner = lookups_planner
+        # Callback for tables, records ids of which are final
+        self._on_table_ready = on_table_ready
+
+    def _set_ready_for_transferring(
+        self,
+        table: DBTable,
+    ):
+        """
+        Marking table as ready for transferring. Ids of ready tables are not
+        changed by collectors except generic tables collector, so ready not
+        generic tables are passed to callback
+        """
+        table.is_ready_for_transferring = True
+
+        if (
+            self._on_table_ready is not None and
+            table.name not in TABLES_WITH_GENERIC_FOREIGN_KEY
+        ):
+            self._on_table_ready(table)
+
+    async def _stream_table_column_values(
+        self,
+        connection: asyncpg.Connection,
+        table_column_values_sql: str,
+        table_column_values: BasePKStorage,
+        parameters: Sequence[List[Union[str, int]]] = (),
+    ):
+        """
+        Fetching values of first column of query by server-side cursor.
+        Values are added to storage by batches, so records of whole result
+        are not kept in memory. Cursor must be used inside transaction
+        """
+        cursor = await connection.cursor(
+            table_column_values_sql,
+            *parameters,
+        )
+
+        while True:
+            records = await cursor.fetch(self.FETCH_BATCH_SIZE)
+
+            if not records:
+                break
+
+            table_column_values.update(
+                [
+                    record[0]
+                    for record in records if
+                    record[0] is not None
+                ]
+            )
+
+            del records
 
     async def _get_table_column_values_part(
         self,
         table_column_values_sql: str,
-        table_column_values: List[Union[str, int]],
+        table_column_values: BasePKStorage,
+        parameters: Sequence[List[Union[str, int]]] = (),
     ):
         if table_column_values_sql:
             logger.debug(table_column_values_sql)
 
             async with self._src_database.connection_pool.acquire() as connection:  # noqa
                 try:
-                    table_column_values_part = await connection.fetch(table_column_values_sql)  # noqa
+                    async with connection.transaction(readonly=True):
+                        await self._stream_table_column_values(
+                            connection=connection,
+                            table_column_values_sql=table_column_values_sql,
+                            table_column_values=table_column_values,
+                            parameters=parameters,
+                        )
                 except (asyncpg.PostgresSyntaxError, asyncpg.UndefinedColumnError) as e:
                     logger.warning(
                         f"{str(e)} --- {table_column_values_sql} --- "
                         f"_get_table_column_values_part"
                     )
-                    table_column_values_part = []
 
-                filtered_table_column_values_part = [
-                    record[0]
-                    for record in table_column_values_part if
-                    record[0] is not None
-                ]
+                del table_column_values_sql
 
-                table_column_values.extend(filtered_table_column_values_part)
+    async def _copy_ids_to_temp_table(
+        self,
+        connection: asyncpg.Connection,
+        temp_table_name: str,
+        column: DBColumn,
+        ids: Iterable[Union[int, str]],
+    ):
+        """
+        Copying identifiers to session temporary table by binary COPY
+        """
+        await connection.execute(
+            SQLRepository.get_create_temp_ids_table_sql(
+                temp_table_name=temp_table_name,
+                column=column,
+            )
+        )
 
-                del table_column_values_part
-                del table_column_values_sql
+        await connection.copy_records_to_table(
+            table_name=temp_table_name,
+            records=((id_, ) for id_ in ids),
+            columns=('id', ),
+        )
+
+        await connection.execute(
+            SQLRepository.get_analyze_table_sql(
+                table_name=temp_table_name,
+            )
+        )
+
+    async def _get_table_column_values_by_temp_tables(
+        self,
+        table: DBTable,
+        column: DBColumn,
+        primary_key_values: Iterable[Union[int, str]] = (),
+        where_conditions_columns: Optional[Dict[str, Iterable[Union[int, str]]]] = None,  # noqa
+        is_revert=False,
+    ) -> BasePKStorage:
+        """
+        Getting table column values by one query, where sets of identifiers
+        are copied to temporary tables of source database session
+        """
+        table_column_values = make_pk_storage(column=column)
+
+        async with self._src_database.connection_pool.acquire() as connection:  # noqa
+            async with connection.transaction():
+                primary_key_temp_table_name = None
+                where_conditions_temp_tables = {}
+
+                if primary_key_values:
+                    primary_key_temp_table_name = 'databaser_pk_ids'
+
+                    await self._copy_ids_to_temp_table(
+                        connection=connection,
+                        temp_table_name=primary_key_temp_table_name,
+                        column=table.primary_key,
+                        ids=primary_key_values,
+                    )
+
+                for index, (c_name, c_ids) in enumerate((where_conditions_columns or {}).items()):  # noqa
+                    if c_name in KEY_COLUMN_NAMES:
+                        continue
+
+                    if c_ids:
+                        temp_table_name = f'databaser_condition_ids_{index}'
+
+                        await self._copy_ids_to_temp_table(
+                            connection=connection,
+                            temp_table_name=temp_table_name,
+                            column=await table.get_column_by_name(c_name),
+                            ids=c_ids,
+                        )
+
+                        where_conditions_temp_tables[c_name] = temp_table_name
+                    else:
+                        where_conditions_temp_tables[c_name] = None
+
+                table_column_values_sql = (
+                    SQLRepository.get_table_column_values_by_temp_tables_sql(
+                        table=table,
+                        column=column,
+                        key_column_values=self._key_column_values,
+                        primary_key_temp_table_name=primary_key_temp_table_name,  # noqa
+                        where_conditions_temp_tables=where_conditions_temp_tables,  # noqa
+                        is_revert=is_revert,
+                    )
+                )
+
+                try:
+                    async with connection.transaction():
+                        await self._stream_table_column_values(
+                            connection=connection,
+                            table_column_values_sql=table_column_values_sql,
+                            table_column_values=table_column_values,
+                        )
+                except (asyncpg.PostgresSyntaxError, asyncpg.UndefinedColumnError) as e:  # noqa
+                    logger.warning(
+                        f"{str(e)} --- {table_column_values_sql} --- "
+                        f"_get_table_column_values_by_temp_tables"
+                    )
+
+        return table_column_values
+
+    async def _get_table_column_values_by_full_scan(
+        self,
+        table: DBTable,
+        column: DBColumn,
+        primary_key_values: Iterable[Union[int, str]] = (),
+        where_conditions_columns: Optional[Dict[str, Iterable[Union[int, str]]]] = None,  # noqa
+        is_revert=False,
+    ) -> BasePKStorage:
+        """
+        Getting table column values by reading of all table records, which
+        are filtered by sets of identifiers on client side
+        """
+        table_column_values = make_pk_storage(column=column)
+
+        # наборы идентификаторов колонок фильтрации в порядке колонок запроса
+        # и признак допустимости пустого значения колонки
+        filters = []
+        null_columns_names = []
+
+        for c_name, c_ids in (where_conditions_columns or {}).items():
+            if c_name in KEY_COLUMN_NAMES:
+                continue
+
+            if c_ids:
+                filters.append((c_name, set(c_ids), not is_revert))
+            else:
+                null_columns_names.append(c_name)
+
+        if primary_key_values:
+            filters.append(
+                (table.primary_key.name, set(primary_key_values), False)
+            )
+
+        table_column_values_sql = (
+            SQLRepository.get_table_column_values_full_scan_sql(
+                table=table,
+                column=column,
+                key_column_values=self._key_column_values,
+                filter_columns_names=[c_name for c_name, _, _ in filters],
+                null_columns_names=null_columns_names,
+            )
+        )
+
+        async with self._src_database.connection_pool.acquire() as connection:  # noqa
+            try:
+                async with connection.transaction(readonly=True):
+                    cursor = await connection.cursor(table_column_values_sql)
+
+                    while True:
+                        records = await cursor.fetch(self.FETCH_BATCH_SIZE)
+
+                        if not records:
+                            break
+
+                        table_column_values.update(
+                            [
+                                record[0]
+                                for record in records if
+                                record[0] is not None and
+                                all(
+                                    record[index] in ids or (
+                                        with_null and
+                                        record[index] is None
+                                    )
+                                    for index, (_, ids, with_null) in enumerate(filters, start=1)  # noqa
+                                )
+                            ]
+                        )
+
+                        del records
+            except (asyncpg.PostgresSyntaxError, asyncpg.UndefinedColumnError) as e:  # noqa
+                logger.warning(
+                    f"{str(e)} --- {table_column_values_sql} --- "
+                    f"_get_table_column_values_by_full_scan"
+                )
+
+        return table_column_values
+
+    @property
+    def _is_sampling(self) -> bool:
+        """
+        Initial records of tables are sampled
+        """
+        return bool(SAMPLE_PERCENT or SAMPLE_ROWS_LIMIT)
+
+    async def _get_sampled_table_primary_key_values(
+        self,
+        table: DBTable,
+    ) -> BasePKStorage:
+        """
+        Getting primary key values of sample of table records
+        """
+        table_column_values = make_pk_storage(column=table.primary_key)
+
+        async with self._scheduler.slot(priority=(int(not table.with_key_column), 0)):  # noqa
+            await self._get_table_column_values_part(
+                table_column_values_sql=(
+                    SQLRepository.get_sampled_table_column_values_sql(
+                        table=table,
+                        column=table.primary_key,
+                        key_column_values=self._key_column_values,
+                        sample_percent=SAMPLE_PERCENT,
+                        rows_limit=SAMPLE_ROWS_LIMIT,
+                    )
+                ),
+                table_column_values=table_column_values,
+            )
+
+        logger.info(
+            f'sampled {len(table_column_values)} records of table '
+            f'"{table.name}"'
+        )
+
+        return table_column_values
+
+    async def _get_table_primary_key_values(
+        self,
+        table: DBTable,
+        is_sampled: bool = True,
+    ) -> BasePKStorage:
+        """
+        Getting primary key values of all table records or their sample in
+        sampling mode
+        """
+        if is_sampled and self._is_sampling:
+            return await self._get_sampled_table_primary_key_values(table)
+
+        return await self._get_table_column_values(
+            table=table,
+            column=table.primary_key,
+        )
+
+    async def _is_full_prepared(
+        self,
+        table: DBTable,
+    ) -> bool:
+        """
+        Checking, that all table records are prepared for transferring. If
+        count of table records is estimated and decision is borderline, then
+        exact count of records is fetched before checking
+        """
+        if table.is_full_count_borderline:
+            async with self._scheduler.slot():
+                async with self._src_database.connection_pool.acquire() as connection:  # noqa
+                    full_count = await connection.fetchval(
+                        SQLRepository.get_count_table_records_sql(
+                            table_name=table.name,
+                        )
+                    )
+
+            table.full_count = int(full_count)
+            table.is_full_count_estimated = False
+
+            logger.debug(
+                f'table {table.name} with exact count {table.full_count}'
+            )
+
+        return bool(table.is_full_prepared)
 
     async def _get_table_column_values(
         self,
@@ -101,15 +445,111 @@ class BaseCollector(metaclass=ABCMeta):
         primary_key_values: Iterable[Union[int, str]] = (),
         where_conditions_columns: Optional[Dict[str, Iterable[Union[int, str]]]] = None,  # noqa
         is_revert=False,
-    ) -> Set[Union[str, int]]:
+    ) -> BasePKStorage:
         # если таблица находится в исключенных, то ее записи не нужно
         # импортировать
         try:
             if column.constraint_table.name in EXCLUDED_TABLES:
-                return set()
+                return SetPKStorage()
         except AttributeError as e:
             logger.warning(f"{str(e)} --- _get_table_column_values")
-            return set()
+            return SetPKStorage()
+
+        # повторные запросы с теми же условиями не выполняются, результат
+        # берется из кеша. При выключенном кеше отпечаток не вычисляется
+        fingerprint = None
+
+        if self._lookups_cache.is_enabled:
+            fingerprint = self._lookups_cache.make_fingerprint(
+                table_name=table.name,
+                column_name=column.name,
+                primary_key_values=primary_key_values,
+                where_conditions_columns=where_conditions_columns,
+                is_revert=is_revert,
+            )
+
+            table_column_values = self._lookups_cache.get(fingerprint)
+
+            if table_column_values is not None:
+                return table_column_values
+
+        # в первую очередь выполняются запросы таблиц с ключевой колонкой,
+        # затем запросы с меньшим количеством идентификаторов
+        frontier_size = len(primary_key_values) + sum(
+            len(c_ids)
+            for c_ids in (where_conditions_columns or {}).values()
+        )
+        priority = (int(not table.with_key_column), frontier_size)
+
+        async with self._scheduler.slot(priority=priority):
+            table_column_values = await self._fetch_table_column_values(
+                table=table,
+                column=column,
+                primary_key_values=primary_key_values,
+                where_conditions_columns=where_conditions_columns,
+                is_revert=is_revert,
+            )
+
+        if fingerprint is not None:
+            self._lookups_cache.set(fingerprint, table_column_values)
+
+        return table_column_values
+
+    async def _fetch_table_column_values(
+        self,
+        table: DBTable,
+        column: DBColumn,
+        primary_key_values: Iterable[Union[int, str]] = (),
+        where_conditions_columns: Optional[Dict[str, Iterable[Union[int, str]]]] = None,  # noqa
+        is_revert=False,
+    ) -> BasePKStorage:
+        """
+        Fetching table column values from source database
+        """
+        lookup_plan = self._lookups_planner.plan(
+            table=table,
+            column=column,
+            primary_key_values=primary_key_values,
+            where_conditions_columns=where_conditions_columns,
+        )
+
+        with_ids = bool(
+            primary_key_values or
+            any((where_conditions_columns or {}).values())
+        )
+
+        # при выборке по временным таблицам наборы идентификаторов
+        # передаются бинарным COPY и выполняется один запрос вместо
+        # запросов по частям. При полном чтении таблицы записи фильтруются
+        # по наборам идентификаторов на стороне клиента. Если наборов
+        # идентификаторов нет, то используется обычный запрос
+        if with_ids and lookup_plan.strategy == LookupStrategiesEnum.TEMP_TABLE:  # noqa
+            return await self._get_table_column_values_by_temp_tables(
+                table=table,
+                column=column,
+                primary_key_values=primary_key_values,
+                where_conditions_columns=where_conditions_columns,
+                is_revert=is_revert,
+            )
+
+        if with_ids and lookup_plan.strategy == LookupStrategiesEnum.FULL_SCAN:  # noqa
+            return await self._get_table_column_values_by_full_scan(
+                table=table,
+                column=column,
+                primary_key_values=primary_key_values,
+                where_conditions_columns=where_conditions_columns,
+                is_revert=is_revert,
+            )
+
+        # наборы идентификаторов, встраиваемые в запрос целиком, не должны
+        # превышать размера части, иначе они передаются массивами
+        is_parametrized = (
+            lookup_plan.strategy != LookupStrategiesEnum.LITERAL or
+            not SQLRepository.is_literal_lookup_bounded(
+                primary_key_values=primary_key_values,
+                where_conditions_columns=where_conditions_columns,
+            )
+        )
 
         # формирование запроса на получения идентификаторов записей
         # внешней таблицы
@@ -120,27 +560,25 @@ class BaseCollector(metaclass=ABCMeta):
             primary_key_values=primary_key_values,
             where_conditions_columns=where_conditions_columns,
             is_revert=is_revert,
+            is_parametrized=is_parametrized,
         )
-        table_column_values = []
+        table_column_values = make_pk_storage(column=column)
 
         for table_column_values_sql in table_column_values_sql_list:
-            sql_query_hash = hash(table_column_values_sql)
-
-            if sql_query_hash not in self.__class__.QUERY_HASHES:
-                BaseCollector.QUERY_HASHES.add(sql_query_hash)
-
-                await self._get_table_column_values_part(
-                    table_column_values_sql=table_column_values_sql,
-                    table_column_values=table_column_values,
-                )
+            if is_parametrized:
+                table_column_values_sql, parameters = table_column_values_sql
+            else:
+                parameters = ()
+
+            await self._get_table_column_values_part(
+                table_column_values_sql=table_column_values_sql,
+                table_column_values=table_column_values,
+                parameters=parameters,
+            )
 
         del table_column_values_sql_list[:]
 
-        unique_table_column_values = set(table_column_values)
-
-        del table_column_values[:]
-
-        return unique_table_column_values
+        return table_column_values
 
     @abstractmethod
     def collect(self):
@@ -163,7 +601,7 @@ class KeyTableCollector(BaseCollector):
             need_transfer_pks=self._key_column_values,
         )
 
-        key_table.is_ready_for_transferring = True
+        self._set_ready_for_transferring(key_table)
 
         logger.info('preparing key table values finished!')
 
@@ -212,19 +650,14 @@ class FullTransferCollector(BaseCollector):
 
         tables = [table for table in self._dst_database.tables.values() if table.name in FULL_TRANSFER_TABLES]
 
-        coroutines = [
-            asyncio.create_task(
-                self._prepare_full_transfer_table(table)
-            )
+        await self._scheduler.map(
+            self._prepare_full_transfer_table(table)
             for table in tables
-        ]
-
-        if coroutines:
-            await asyncio.wait(coroutines)
+        )
 
         for table in tables:
             if table.is_checked:
-                table.is_ready_for_transferring = True
+                self._set_ready_for_transferring(table)
 
         logger.info(
             'finished preparing full transfer tables..'
@@ -234,410 +667,179 @@ class FullTransferCollector(BaseCollector):
 class TablesWithKeyColumnSiblingsCollector(BaseCollector):
     """
     Collector of records of tables with key columns and their siblings
-    """
-
-    async def _direct_recursively_preparing_foreign_table_chunk(
-        self,
-        table: DBTable,
-        column: DBColumn,
-        need_transfer_pks_chunk: Iterable[int],
-        stack_tables: Set[DBTable],
-    ):
-        """
-        Direct recursively preparing foreign table chunk
-        """
-        foreign_table = column.constraint_table
-        foreign_table.is_checked = True
-
-        # Если таблица с key_column, то нет необходимости пробрасывать
-        # идентификаторы записей
-        if table.with_key_column:
-            foreign_table_pks = await self._get_table_column_values(
-                table=table,
-                column=column,
-            )
-        else:
-            need_transfer_pks = (
-                need_transfer_pks_chunk if
-                not table.is_full_prepared else
-                ()
-            )
-
-            foreign_table_pks = await self._get_table_column_values(
-                table=table,
-                column=column,
-                primary_key_values=need_transfer_pks,
-            )
-
-        # если найдены значения внешних ключей отличающиеся от null, то
-        # записи из внешней талицы с этими идентификаторами должны быть
-        # импортированы
-        if foreign_table_pks:
-            logger.debug(
-                f"table - {table.name}, column - {column.name} - reversed "
-                f"collecting of fk_ids ----- {foreign_table.name}"
-            )
-
-            foreign_table_pks_difference = foreign_table_pks.difference(
-                foreign_table.need_transfer_pks
-            )
 
-            # если есть разница между предполагаемыми записями для импорта
-            # и уже выбранными ранее, то разницу нужно импортировать
-            if foreign_table_pks_difference:
-                foreign_table.update_need_transfer_pks(
-                    need_transfer_pks=foreign_table_pks_difference,
-                )
-
-                await asyncio.wait(
-                    [
-                        asyncio.create_task(
-                            self._direct_recursively_preparing_table(
-                                table=foreign_table,
-                                need_transfer_pks=foreign_table_pks_difference,
-                                stack_tables=stack_tables,
-                            )
-                        ),
-                    ]
-                )
-
-            del foreign_table_pks_difference
-
-        del foreign_table_pks
-        del need_transfer_pks_chunk
+    Records of tables with key column are used as initial values of closure
+    by foreign keys, which is computed by ClosureEngine
+    """
 
-    async def _direct_recursively_preparing_foreign_table(
+    def __init__(
         self,
-        table: DBTable,
-        column: DBColumn,
-        need_transfer_pks: Iterable[int],
-        stack_tables: Set[DBTable],
+        *args,
+        **kwargs,
     ):
-        """
-        Recursively preparing foreign table
-        """
-        need_transfer_pks_chunks = make_chunks(
-            iterable=need_transfer_pks,
-            size=self.CHUNK_SIZE,
-            is_list=True,
+        super().__init__(
+            *args,
+            **kwargs,
         )
 
-        coroutines = [
-            asyncio.create_task(
-                self._direct_recursively_preparing_foreign_table_chunk(
-                    table=table,
-                    column=column,
-                    need_transfer_pks_chunk=need_transfer_pks_chunk,
-                    stack_tables=stack_tables,
-                )
-            )
-            for need_transfer_pks_chunk in need_transfer_pks_chunks
-        ]
-
-        if coroutines:
-            await asyncio.wait(coroutines)
-
-    async def _direct_recursively_preparing_table_chunk(
-        self,
-        table: DBTable,
-        need_transfer_pks_chunk: List[int],
-        stack_tables: Optional[Set[DBTable]] = None,
-    ):
-        """
-        Recursively preparing table
-        """
-
-        logger.debug(make_str_from_iterable([t.name for t in stack_tables]))
-
-        coroutines = [
-            asyncio.create_task(
-                self._direct_recursively_preparing_foreign_table(
-                    table=table,
-                    column=column,
-                    need_transfer_pks=need_transfer_pks_chunk,
-                    stack_tables=stack_tables,
-                )
-            )
-            for column in table.not_self_fk_columns if
-            not (
-                column.constraint_table.with_key_column or
-                column.constraint_table in stack_tables
-            )
-        ]
-
-        if coroutines:
-            await asyncio.wait(coroutines)
-
-        del need_transfer_pks_chunk
+        self._closure_engine = ClosureEngine(
+            get_table_column_values=self._get_table_column_values,
+            is_full_prepared=self._is_full_prepared,
+            scheduler=self._scheduler,
+            chunk_size=self.CHUNK_SIZE,
+            is_sampling=self._is_sampling,
+        )
 
-    async def _direct_recursively_preparing_table(
+    async def _prepare_tables_with_key_column(
         self,
         table: DBTable,
-        need_transfer_pks: Iterable[int],
-        stack_tables: Optional[Set[DBTable]] = None,
     ):
         """
-        Recursively preparing table
+        Preparing initial records of tables with key column
         """
-        if stack_tables is None:
-            stack_tables = set()
+        logger.info(
+            f'start preparing table with key column "{table.name}"'
+        )
 
-        if table in stack_tables:
+        if table.is_ready_for_transferring:
             return
 
-        stack_tables.add(table)
-
-        coroutines = [
-            asyncio.create_task(
-                self._direct_recursively_preparing_foreign_table(
-                    table=table,
-                    column=column,
-                    need_transfer_pks=need_transfer_pks,
-                    stack_tables=stack_tables,
-                )
-            )
-            for column in table.not_self_fk_columns if
-            not (
-                column.constraint_table.with_key_column or
-                column.constraint_table in stack_tables or
-                column.constraint_table.is_ready_for_transferring
-            )
-        ]
-
-        coroutines_hierarchy = [
-            asyncio.create_task(
-                self._direct_recursively_preparing_foreign_table(
-                    table=table,
-                    column=column,
-                    need_transfer_pks=need_transfer_pks,
-                    stack_tables=stack_tables - {table},
-                )
-            )
-            for column in table.self_fk_columns if
-            not (
-                column.constraint_table.is_ready_for_transferring
-            )
-        ]
-
-        if coroutines:
-            await asyncio.wait(coroutines)
-
-        if coroutines_hierarchy:
-            await asyncio.wait(coroutines_hierarchy)
+        need_transfer_pks = await self._get_table_primary_key_values(table)
 
         table.is_checked = True
 
-        del stack_tables
+        if need_transfer_pks:
+            self._closure_engine.add(
+                table=table,
+                pks=need_transfer_pks,
+                with_revert=True,
+            )
 
-    async def _revert_recursively_preparing_revert_table_column_chunk(
-        self,
-        revert_table: DBTable,
-        revert_column: DBColumn,
-        need_transfer_pks_chunk: Iterable[Union[int, str]],
-    ):
-        """
-        Recursively preparing revert table column chunk
-        """
-        where_conditions_columns = {
-            revert_column.name: need_transfer_pks_chunk,
-        }
+        del need_transfer_pks
 
-        revert_table_pks = await self._get_table_column_values(
-            table=revert_table,
-            column=revert_table.primary_key,
-            where_conditions_columns=where_conditions_columns,
-            is_revert=True,
+        logger.info(
+            f'finished preparing table with key column "{table.name}"'
         )
 
-        if revert_table_pks:
-            revert_table.update_need_transfer_pks(
-                need_transfer_pks=revert_table_pks,
-            )
-
-        del need_transfer_pks_chunk
-        del revert_table_pks
-
-    async def _revert_recursively_preparing_revert_table_column(
-        self,
-        revert_table: DBTable,
-        revert_column: DBColumn,
-        need_transfer_pks: Set[Union[int, str]],
-    ):
-        """
-        Recursively preparing revert table column
-        """
-        need_transfer_pks_chunks = make_chunks(
-            iterable=need_transfer_pks,
-            size=self.CHUNK_SIZE,
-            is_list=True,
+    async def collect(self):
+        logger.info(
+            'start preparing tables with key column and their siblings..'
         )
 
-        coroutines = [
-            asyncio.create_task(
-                self._revert_recursively_preparing_revert_table_column_chunk(
-                    revert_table=revert_table,
-                    revert_column=revert_column,
-                    need_transfer_pks_chunk=need_transfer_pks_chunk,
-                )
-            )
-            for need_transfer_pks_chunk in need_transfer_pks_chunks
-        ]
+        await self._scheduler.map(
+            self._prepare_tables_with_key_column(table)
+            for table in self._dst_database.tables_with_key_column
+        )
 
-        if coroutines:
-            await asyncio.wait(coroutines)
+        await self._closure_engine.run()
 
-    async def _revert_recursively_preparing_revert_table(
-        self,
-        revert_table: DBTable,
-        revert_columns: Set[DBColumn],
-        need_transfer_pks: Set[Union[int, str]],
-        stack_tables: Set[DBTable],
-    ):
-        """
-        Recursively preparing revert table
-        """
-        if need_transfer_pks:
-            coroutines = [
-                asyncio.create_task(
-                    self._revert_recursively_preparing_revert_table_column(
-                        revert_table=revert_table,
-                        revert_column=revert_column,
-                        need_transfer_pks=need_transfer_pks,
-                    )
-                )
-                for revert_column in revert_columns if
-                revert_column in revert_table.highest_priority_fk_columns
-            ]
+        logger.info(
+            f'closure of tables with key column computed by '
+            f'{self._closure_engine.rounds_count} rounds'
+        )
 
-            if coroutines:
-                await asyncio.wait(coroutines)
+        for dst_table in self._dst_database.tables.values():
+            if dst_table.is_checked:
+                self._set_ready_for_transferring(dst_table)
 
-            if revert_table.need_transfer_pks:
-                stack_tables_copy = copy(stack_tables)
+        logger.info(
+            'finished preparing tables with key column and their siblings..'
+        )
 
-                await self._revert_recursively_preparing_table(
-                    table=revert_table,
-                    stack_tables=stack_tables,
-                )
 
-                await self._direct_recursively_preparing_table(
-                    table=revert_table,
-                    need_transfer_pks=revert_table.need_transfer_pks,
-                    stack_tables=stack_tables_copy,
-                )
+class ServerSideTablesWithKeyColumnSiblingsCollector(BaseCollector):
+    """
+    Collector of records of tables with key columns and their siblings, which
+    computes closure by foreign keys on source database side by
+    ServerSideClosureEngine
 
-        del need_transfer_pks
-        del stack_tables
+    Records ids do not leave source database during computing of closure,
+    they are fetched once from slices tables after computing
+    """
 
-    async def _revert_recursively_preparing_table(
+    def __init__(
         self,
-        table: DBTable,
-        stack_tables: Optional[Set[DBTable]] = None,
+        *args,
+        **kwargs,
     ):
-        """
-        Revert recursively preparing table
-        """
-        if stack_tables is None:
-            stack_tables = set()
-
-        if table in stack_tables:
-            return
-
-        stack_tables.add(table)
-
-        coroutines = [
-            asyncio.create_task(
-                self._revert_recursively_preparing_revert_table(
-                    revert_table=revert_table,
-                    revert_columns=revert_columns,
-                    need_transfer_pks=table.need_transfer_pks,
-                    stack_tables=stack_tables,
-                )
-            )
-            for revert_table, revert_columns in table.revert_foreign_tables.items() if  # noqa
-            not (
-                revert_table.with_key_column or
-                revert_table == table or
-                revert_table in stack_tables or
-                revert_table.is_ready_for_transferring
-            )
-        ]
-
-        if coroutines:
-            await asyncio.wait(coroutines)
+        super().__init__(
+            *args,
+            **kwargs,
+        )
 
-        table.is_checked = True
+        self._closure_engine = ServerSideClosureEngine(
+            src_database=self._src_database,
+            scheduler=self._scheduler,
+            key_column_values=self._key_column_values,
+        )
 
-    async def _prepare_tables_with_key_column(
+    async def _fetch_slice_table_pks(
         self,
         table: DBTable,
     ):
         """
-        Preparing tables with key column and siblings
+        Fetching records ids of slice table
         """
-        logger.info(
-            f'start preparing table with key column "{table.name}"'
-        )
+        need_transfer_pks = make_pk_storage(column=table.primary_key)
 
-        if table.is_ready_for_transferring:
-            return
+        async with self._scheduler.slot():
+            await self._get_table_column_values_part(
+                table_column_values_sql=SQLRepository.get_select_slice_pks_sql(  # noqa
+                    schema=self._closure_engine.schema,
+                    table=table,
+                ),
+                table_column_values=need_transfer_pks,
+            )
 
-        need_transfer_pks = await self._get_table_column_values(
-            table=table,
-            column=table.primary_key,
+        table.update_need_transfer_pks(
+            need_transfer_pks=need_transfer_pks,
         )
 
-        table.is_checked = True
+        del need_transfer_pks
 
-        if need_transfer_pks:
-            table.update_need_transfer_pks(
-                need_transfer_pks=need_transfer_pks,
-            )
+    async def collect(self):
+        logger.info(
+            'start preparing tables with key column and their siblings on '
+            'source database side..'
+        )
 
-            await asyncio.wait(
-                [
-                    asyncio.create_task(
-                        self._direct_recursively_preparing_table(
-                            table=table,
-                            need_transfer_pks=need_transfer_pks,
-                        )
-                    ),
-                ]
-            )
+        src_table_names = set(self._src_database.table_names or ())
 
-            await asyncio.wait(
-                [
-                    asyncio.create_task(
-                        self._revert_recursively_preparing_table(
-                            table=table,
-                        )
-                    ),
-                ]
+        try:
+            await self._closure_engine.prepare(
+                tables=[
+                    table
+                    for table in self._dst_database.tables.values() if
+                    table.name in src_table_names and
+                    not table.is_ready_for_transferring
+                ],
             )
 
-        del need_transfer_pks
+            await self._scheduler.map(
+                self._closure_engine.add_seeds(table)
+                for table in self._dst_database.tables_with_key_column if
+                not table.is_ready_for_transferring
+            )
 
-        logger.info(
-            f'finished preparing table with key column "{table.name}"'
-        )
+            await self._closure_engine.run()
 
-    async def collect(self):
-        logger.info(
-            'start preparing tables with key column and their siblings..'
-        )
-        coroutines = [
-            asyncio.create_task(
-                self._prepare_tables_with_key_column(table)
+            logger.info(
+                f'closure of tables with key column computed on source '
+                f'database side by {self._closure_engine.rounds_count} rounds, '
+                f'slice records - '
+                f'{sum(self._closure_engine.tables_counts.values())}'
             )
-            for table in self._dst_database.tables_with_key_column
-        ]
 
-        if coroutines:
-            await asyncio.wait(coroutines)
+            await self._scheduler.map(
+                self._fetch_slice_table_pks(table)
+                for table in self._closure_engine.tables_counts
+            )
+        finally:
+            await self._closure_engine.drop()
 
         for dst_table in self._dst_database.tables.values():
             if dst_table.is_checked:
-                dst_table.is_ready_for_transferring = True
+                self._set_ready_for_transferring(dst_table)
 
         logger.info(
             'finished preparing tables with key column and their siblings..'
@@ -658,11 +860,15 @@ class SortedByDependencyTablesCollector(BaseCollector):
         """
         Get revert table column values
         """
-        revert_table_pks = (
-            revert_table.need_transfer_pks if
-            not revert_table.is_full_prepared else
-            ()
-        )
+        if await self._is_full_prepared(revert_table):
+            revert_table_pks = ()
+        else:
+            # значения колонки записей ранее перенесенного среза уже
+            # находятся в срезе
+            revert_table_pks = revert_table.new_need_transfer_pks
+
+            if not revert_table_pks:
+                return
 
         revert_table_column_values = await self._get_table_column_values(
             table=revert_table,
@@ -696,31 +902,67 @@ class SortedByDependencyTablesCollector(BaseCollector):
             return
 
         if revert_table.need_transfer_pks:
-
-            coroutines = [
-                asyncio.create_task(
-                    self._get_revert_table_column_values(
-                        table=table,
-                        revert_table=revert_table,
-                        revert_column=revert_column,
-                    )
+            await self._scheduler.map(
+                self._get_revert_table_column_values(
+                    table=table,
+                    revert_table=revert_table,
+                    revert_column=revert_column,
                 )
-                for revert_column in revert_columns
+                for revert_column in list(revert_columns)
+            )
+
+    def _get_where_conditions_columns_deltas(
+        self,
+        table: DBTable,
+        where_conditions_columns: Dict[str, BasePKStorage],
+    ) -> List[Dict[str, BasePKStorage]]:
+        """
+        Variants of conditions of table foreign keys columns for collecting
+        records, which are absent in slice transferred earlier
+
+        Conditions of columns are combined by AND, so every variant takes
+        new identifiers of one column and all identifiers of other columns.
+        Without slice transferred earlier all identifiers are taken once
+        """
+        fk_tables = {
+            fk_column.name: self._dst_database.tables[
+                fk_column.constraint_table.name
             ]
+            for fk_column in table.highest_priority_fk_columns
+        }
+
+        if all(
+            fk_tables[c_name].known_pks is None
+            for c_name in where_conditions_columns
+        ):
+            return [where_conditions_columns]
 
-            if coroutines:
-                await asyncio.wait(coroutines)
+        deltas = []
 
-    async def _prepare_unready_table(
+        for c_name in where_conditions_columns:
+            new_pks = fk_tables[c_name].new_need_transfer_pks
+
+            if new_pks:
+                deltas.append(
+                    {
+                        **where_conditions_columns,
+                        c_name: new_pks,
+                    }
+                )
+
+        return deltas
+
+    async def _collect_unready_table_records(
         self,
         table: DBTable,
-    ):
+    ) -> bool:
         """
-        Preparing table records for transferring
+        Collecting table records ids by foreign keys and revert tables
+
+        Returns:
+            False, if records of tables referenced by table are not collected
+            yet and table can not be prepared
         """
-        logger.info(
-            f'start preparing table "{table.name}"'
-        )
         # обход таблиц связанных через внешние ключи
         where_conditions_columns = {}
 
@@ -735,7 +977,7 @@ class SortedByDependencyTablesCollector(BaseCollector):
             ]
 
             if fk_table.need_transfer_pks:
-                if not fk_table.is_full_prepared:
+                if not await self._is_full_prepared(fk_table):
                     where_conditions_columns[fk_column.name] = (
                         fk_table.need_transfer_pks
                     )
@@ -747,20 +989,31 @@ class SortedByDependencyTablesCollector(BaseCollector):
             not where_conditions_columns and
             not with_full_transferred_table
         ):
-            return
+            return False
+
+        table_pks = make_pk_storage(column=table.primary_key)
 
-        table_pks = await self._get_table_column_values(
+        for delta_where_conditions_columns in self._get_where_conditions_columns_deltas(  # noqa
             table=table,
-            column=table.primary_key,
             where_conditions_columns=where_conditions_columns,
-        )
+        ):
+            table_pks.update(
+                await self._get_table_column_values(
+                    table=table,
+                    column=table.primary_key,
+                    where_conditions_columns=delta_where_conditions_columns,
+                )
+            )
 
+        # таблица, записи которой есть в ранее перенесенном срезе, уже
+        # собрана, даже если новых записей не найдено
         if (
             fk_columns and
             where_conditions_columns and
-            not table_pks
+            not table_pks and
+            not table.known_pks
         ):
-            return
+            return False
 
         table.update_need_transfer_pks(
             need_transfer_pks=table_pks,
@@ -776,24 +1029,30 @@ class SortedByDependencyTablesCollector(BaseCollector):
         # обход таблиц ссылающихся на текущую таблицу
         logger.debug('prepare revert tables')
 
-        coroutines = [
-            asyncio.create_task(
-                self._prepare_revert_table(
-                    table=table,
-                    revert_table=revert_table,
-                    revert_columns=revert_columns,
-                )
+        await self._scheduler.map(
+            self._prepare_revert_table(
+                table=table,
+                revert_table=revert_table,
+                revert_columns=revert_columns,
             )
-            for revert_table, revert_columns in table.revert_foreign_tables.items()  # noqa
-        ]
+            for revert_table, revert_columns in list(table.revert_foreign_tables.items())  # noqa
+        )
 
-        if coroutines:
-            await asyncio.wait(coroutines)
+        return True
 
+    async def _finish_unready_table(
+        self,
+        table: DBTable,
+    ):
+        """
+        Marking table as ready for transferring. If no records were collected,
+        all table records are transferred. In sampling mode records are
+        sampled, if table does not refer to its own records
+        """
         if not table.need_transfer_pks:
-            all_records = await self._get_table_column_values(
+            all_records = await self._get_table_primary_key_values(
                 table=table,
-                column=table.primary_key,
+                is_sampled=not table.with_self_fk,
             )
 
             table.update_need_transfer_pks(
@@ -802,12 +1061,68 @@ class SortedByDependencyTablesCollector(BaseCollector):
 
             del all_records
 
-        table.is_ready_for_transferring = True
+        self._set_ready_for_transferring(table)
 
         logger.info(
             f'finished collecting records ids of table "{table.name}"'
         )
 
+    async def _prepare_unready_table(
+        self,
+        table: DBTable,
+    ):
+        """
+        Preparing table records for transferring
+        """
+        logger.info(
+            f'start preparing table "{table.name}"'
+        )
+
+        if await self._collect_unready_table_records(table):
+            await self._finish_unready_table(table)
+
+    async def _prepare_cyclic_tables(
+        self,
+        tables: List[DBTable],
+    ):
+        """
+        Preparing records of tables with cyclic dependencies between them
+
+        Tables of group are passed repeatedly, until count of collected
+        records of each table stops changing. Identifiers are only added, so
+        passes are finite
+        """
+        logger.info(
+            f'start preparing cyclic tables '
+            f'"{", ".join(t.name for t in tables)}"'
+        )
+
+        passes_count = 0
+        # имена таблиц, записи которых были собраны хотя бы на одном проходе.
+        # Идентификаторы только добавляются, поэтому такие таблицы достигают
+        # неподвижной точки вместе со всей группой
+        collected_tables_names = set()
+
+        while True:
+            passes_count += 1
+
+            counts_before = [len(t.need_transfer_pks) for t in tables]
+
+            for table in tables:
+                if await self._collect_unready_table_records(table):
+                    collected_tables_names.add(table.name)
+
+            if counts_before == [len(t.need_transfer_pks) for t in tables]:
+                break
+
+        logger.debug(
+            f'cyclic tables prepared in {passes_count} passes'
+        )
+
+        for table in tables:
+            if table.name in collected_tables_names:
+                await self._finish_unready_table(table)
+
     async def collect(self):
         logger.info('start preparing tables sorted by dependency..')
 
@@ -831,35 +1146,70 @@ class SortedByDependencyTablesCollector(BaseCollector):
                     (table.name, fk_column.constraint_table.name)
                 )
 
-        sorted_dependencies_result = topological_sort(
+        # таблицы с циклическими зависимостями объединяются в компоненты
+        # сильной связности, граф компонент не содержит циклов и разбивается
+        # на уровни. Компоненты одного уровня не связаны между собой, а их
+        # зависимости обработаны на предыдущих уровнях, поэтому уровень
+        # обрабатывается параллельно
+        components = get_strongly_connected_components(
+            nodes=[
+                table.name
+                for table in self._dst_database.tables_without_generics
+            ],
             dependency_pairs=dependencies_between_models,
         )
-        sorted_dependencies_result.cyclic.reverse()
-        sorted_dependencies_result.sorted.reverse()
 
-        sorted_tables_by_dependency = (
-            sorted_dependencies_result.cyclic + sorted_dependencies_result.sorted
-        )
+        component_indexes = {
+            table_name: index
+            for index, component in enumerate(components)
+            for table_name in component
+        }
 
-        without_relatives = list(
-            {
-                table.name
-                for table in self._dst_database.tables_without_generics
-            }.difference(
-                sorted_tables_by_dependency
-            )
+        components_levels = get_dependency_levels(
+            nodes=range(len(components)),
+            dependency_pairs={
+                (component_indexes[table_name], component_indexes[fk_table_name])  # noqa
+                for table_name, fk_table_name in dependencies_between_models if
+                component_indexes[table_name] != component_indexes[fk_table_name]  # noqa
+            },
         )
 
-        sorted_tables_by_dependency = without_relatives + sorted_tables_by_dependency
+        logger.debug(
+            f'tables sorted by dependency are split into '
+            f'{len(components_levels)} levels, cyclic groups - '
+            f'{len([c for c in components if len(c) > 1])}'
+        )
 
-        # Явно ломаю асинхронность, т.к. порядок импорта таблиц важен
-        for table_name in sorted_tables_by_dependency:
-            table = self._dst_database.tables[table_name]
+        for components_level in components_levels:
+            level_components = [
+                [
+                    self._dst_database.tables[table_name]
+                    for table_name in components[component_index]
+                ]
+                for component_index in components_level
+            ]
 
-            if not table.is_ready_for_transferring:
-                await self._prepare_unready_table(
-                    table=table,
-                )
+            await self._scheduler.map(
+                (
+                    self._prepare_unready_table(
+                        table=component_tables[0],
+                    )
+                    if len(component_tables) == 1 else
+                    self._prepare_cyclic_tables(
+                        tables=component_tables,
+                    )
+                    for component_tables in (
+                        [
+                            table
+                            for table in level_component if
+                            not table.is_ready_for_transferring
+                        ]
+                        for level_component in level_components
+                    ) if
+                    component_tables
+                ),
+                window=SORTED_TABLES_LEVEL_CONCURRENCY,
+            )
 
         logger.info('preparing tables sorted by dependency finished.')
 
@@ -879,19 +1229,23 @@ class GenericTablesCollector(BaseCollector):
             *args,
             **kwargs,
         )
-        # словарь с названиями таблиц и идентификаторами импортированных записей
-        self._transfer_progress_dict = {}
         self.filling_tables = set()
 
         self.content_type_table = {}
 
-    async def _prepare_content_type_tables(self):
+    @staticmethod
+    @alru_cache(maxsize=None)
+    async def _get_content_type_table(
+        src_database: SrcDatabase,
+        dst_database: DstDatabase,
+    ) -> Dict[str, int]:
         """
-        Подготавливает соответствие content_type_id и наименование таблицы в БД
+        Возвращает соответствие наименования таблицы в БД и content_type_id.
+        Соответствие получается один раз за время работы
         """
-        logger.info("prepare content type tables")
+        content_type_table = {}
 
-        content_type_table_list = await self._dst_database.fetch_raw_sql(
+        content_type_table_list = await dst_database.fetch_raw_sql(
             SQLRepository.get_content_type_table_sql()
         )
 
@@ -900,7 +1254,7 @@ class GenericTablesCollector(BaseCollector):
             for table_name, app_label, model in content_type_table_list
         }
 
-        content_type_list = await self._src_database.fetch_raw_sql(
+        content_type_list = await src_database.fetch_raw_sql(
             SQLRepository.get_content_type_sql()
         )
 
@@ -910,7 +1264,7 @@ class GenericTablesCollector(BaseCollector):
         }
 
         for key in content_type_table_dict.keys():
-            self.content_type_table[content_type_table_dict[key]] = (
+            content_type_table[content_type_table_dict[key]] = (
                 content_type_dict[key]
             )
 
@@ -919,11 +1273,28 @@ class GenericTablesCollector(BaseCollector):
         del content_type_list[:]
         del content_type_dict
 
-    async def _prepare_content_type_generic_data(
+        return content_type_table
+
+    async def _prepare_content_type_tables(self):
+        """
+        Подготавливает соответствие content_type_id и наименование таблицы в БД
+        """
+        logger.info("prepare content type tables")
+
+        self.content_type_table = await self._get_content_type_table(
+            src_database=self._src_database,
+            dst_database=self._dst_database,
+        )
+
+    async def _get_content_type_rel_table(
         self,
-        target_table: DBTable,
+        object_id_column: DBColumn,
         rel_table_name: str,
-    ):
+    ) -> Optional[DBTable]:
+        """
+        Возвращает таблицу, на записи которой может ссылаться таблица с
+        generic key, если тип ее первичного ключа совместим с object_id
+        """
         if not rel_table_name:
             logger.debug('not send rel_table_name')
             return
@@ -934,18 +1305,33 @@ class GenericTablesCollector(BaseCollector):
             logger.debug(f'table {rel_table_name} not found')
             return
 
-        object_id_column = await target_table.get_column_by_name('object_id')
-
         if rel_table.primary_key.data_type != object_id_column.data_type:
             logger.debug(
                 f'pk of table {rel_table_name} has an incompatible data type'
             )
             return
 
+        return rel_table
+
+    async def _prepare_content_type_generic_data(
+        self,
+        target_table: DBTable,
+        rel_table_name: str,
+    ):
+        object_id_column = await target_table.get_column_by_name('object_id')
+
+        rel_table = await self._get_content_type_rel_table(
+            object_id_column=object_id_column,
+            rel_table_name=rel_table_name,
+        )
+
+        if not rel_table:
+            return
+
         logger.info('prepare content type generic data')
 
         where_conditions = {
-            'object_id': rel_table.need_transfer_pks,
+            'object_id': rel_table.new_need_transfer_pks,
             'content_type_id': [self.content_type_table[rel_table.name]],
         }
 
@@ -966,23 +1352,174 @@ class GenericTablesCollector(BaseCollector):
         del where_conditions
         del need_transfer_pks
 
+    async def _get_content_type_rel_tables(
+        self,
+        object_id_column: DBColumn,
+    ) -> List[Tuple[int, DBTable]]:
+        """
+        Пары content_type_id и связанной таблицы, тип первичного ключа
+        которой совместим с object_id
+        """
+        content_type_rel_tables = []
+
+        for rel_table_name, content_type_id in self.content_type_table.items():
+            rel_table = await self._get_content_type_rel_table(
+                object_id_column=object_id_column,
+                rel_table_name=rel_table_name,
+            )
+
+            if rel_table:
+                content_type_rel_tables.append((content_type_id, rel_table))
+
+        return content_type_rel_tables
+
+    def _get_content_type_pairs_chunks(
+        self,
+        content_type_rel_tables: List[Tuple[int, DBTable]],
+    ) -> Iterator[Tuple[List[int], List[Union[int, str]]]]:
+        """
+        Разбиение пар content_type_id и object_id связанных таблиц на части
+        размером CHUNK_SIZE. Каждая часть представлена двумя списками
+        одинаковой длины. Части формируются по мере потребления
+        """
+        content_type_ids = []
+        object_ids = []
+
+        for content_type_id, rel_table in content_type_rel_tables:
+            rel_table_pks = rel_table.new_need_transfer_pks
+
+            if not rel_table_pks:
+                continue
+
+            for pks_chunk in rel_table_pks.chunks(self.CHUNK_SIZE):
+                while pks_chunk:
+                    part_size = self.CHUNK_SIZE - len(object_ids)
+
+                    object_ids.extend(pks_chunk[:part_size])
+                    content_type_ids.extend(
+                        [content_type_id] * len(pks_chunk[:part_size])
+                    )
+
+                    pks_chunk = pks_chunk[part_size:]
+
+                    if len(object_ids) >= self.CHUNK_SIZE:
+                        yield content_type_ids, object_ids
+
+                        content_type_ids = []
+                        object_ids = []
+
+        if object_ids:
+            yield content_type_ids, object_ids
+
+    async def _fetch_generic_table_pks_part(
+        self,
+        generic_table_pks_sql: str,
+        content_type_ids: List[int],
+        object_ids: List[Union[int, str]],
+        need_transfer_pks: BasePKStorage,
+    ):
+        """
+        Получение идентификаторов записей таблицы с generic key по части пар
+        """
+        async with self._scheduler.slot(priority=(1, len(object_ids))):
+            await self._get_table_column_values_part(
+                table_column_values_sql=generic_table_pks_sql,
+                table_column_values=need_transfer_pks,
+                parameters=(content_type_ids, object_ids),
+            )
+
+    async def _prepare_generic_table_data_batched(
+        self,
+        target_table: DBTable,
+    ):
+        """
+        Получение идентификаторов записей таблицы с generic key одним
+        запросом по парам content_type_id и object_id всех связанных таблиц.
+        При большом количестве пар запрос выполняется по частям
+        """
+        object_id_column = await target_table.get_column_by_name('object_id')
+        content_type_id_column = await target_table.get_column_by_name(
+            'content_type_id'
+        )
+
+        generic_table_pks_sql = (
+            SQLRepository.get_generic_table_pks_by_pairs_sql(
+                table=target_table,
+                content_type_id_column=content_type_id_column,
+                object_id_column=object_id_column,
+                key_column_values=self._key_column_values,
+            )
+        )
+
+        content_type_rel_tables = await self._get_content_type_rel_tables(
+            object_id_column=object_id_column,
+        )
+
+        need_transfer_pks = make_pk_storage(column=target_table.primary_key)
+
+        # как и при выборке по отдельным связанным таблицам, собираются
+        # записи без object_id всех совместимых типов содержимого
+        if content_type_rel_tables:
+            async with self._scheduler.slot(priority=(1, 0)):
+                await self._get_table_column_values_part(
+                    table_column_values_sql=(
+                        SQLRepository.get_generic_table_pks_without_object_sql(
+                            table=target_table,
+                            content_type_id_column=content_type_id_column,
+                            object_id_column=object_id_column,
+                            key_column_values=self._key_column_values,
+                        )
+                    ),
+                    table_column_values=need_transfer_pks,
+                    parameters=(
+                        [
+                            content_type_id
+                            for content_type_id, _ in content_type_rel_tables
+                        ],
+                    ),
+                )
+
+        await self._scheduler.map(
+            self._fetch_generic_table_pks_part(
+                generic_table_pks_sql=generic_table_pks_sql,
+                content_type_ids=content_type_ids,
+                object_ids=object_ids,
+                need_transfer_pks=need_transfer_pks,
+            )
+            for content_type_ids, object_ids in self._get_content_type_pairs_chunks(  # noqa
+                content_type_rel_tables=content_type_rel_tables,
+            )
+        )
+
+        logger.info(
+            f'{target_table.name} need transfer pks {len(need_transfer_pks)}'
+        )
+
+        target_table.update_need_transfer_pks(
+            need_transfer_pks=need_transfer_pks,
+        )
+
+        del need_transfer_pks
+
     async def _prepare_generic_table_data(self, target_table: DBTable):
         """
         Перенос данных из таблицы, содержащей generic foreign key
         """
         logger.info(f"prepare generic table data {target_table.name}")
 
-        coroutines = [
-            asyncio.create_task(
-                self._prepare_content_type_generic_data(
-                    target_table=target_table, rel_table_name=rel_table_name
-                )
+        if IS_BATCHED_GENERIC_TABLES:
+            await self._prepare_generic_table_data_batched(
+                target_table=target_table,
             )
-            for rel_table_name in self.content_type_table.keys()
-        ]
 
-        if coroutines:
-            await asyncio.wait(coroutines)
+            return
+
+        await self._scheduler.map(
+            self._prepare_content_type_generic_data(
+                target_table=target_table, rel_table_name=rel_table_name
+            )
+            for rel_table_name in list(self.content_type_table.keys())
+        )
 
     async def _collect_generic_tables_records_ids(self):
         """
@@ -1001,17 +1538,12 @@ class GenericTablesCollector(BaseCollector):
 
         generic_table_names = set(TABLES_WITH_GENERIC_FOREIGN_KEY).difference(EXCLUDED_TABLES)
 
-        coroutines = [
-            asyncio.create_task(
-                self._prepare_generic_table_data(
-                    self._dst_database.tables.get(table_name)
-                )
+        await self._scheduler.map(
+            self._prepare_generic_table_data(
+                self._dst_database.tables.get(table_name)
             )
             for table_name in filter(None, generic_table_names)
-        ]
-
-        if coroutines:
-            await asyncio.wait(coroutines)
+        )
 
         logger.info("finish collecting")
 
@@ -27,6 +27,7 @@ from databaser.core.enums import (
 from databaser.core.helpers import (
     DBConnectionParameters,
     deep_getattr,
+    get_dependency_levels,
     logger,
     make_chunks,
     make_str_from_iterable,
@@ -34,10 +35,16 @@ from databaser.core.helpers import (
 from databaser.core.repositories import (
     SQLRepository,
 )
+from databaser.core.storages import (
+    BasePKStorage,
+    PKStoragesSpiller,
+    make_pk_storage,
+)
 from databaser.core.strings import (
     CONNECTION_STR_TEMPLATE,
 )
 from databaser.settings import (
+    BULK_LOAD_MAINTENANCE_WORK_MEM,
     EXCLUDED_TABLES,
     IS_TRUNCATE_TABLES,
     KEY_COLUMN_NAMES,
@@ -194,6 +201,9 @@ class DstDatabase(BaseDatabase):
             db_connection_parameters=db_connection_parameters,
         )
 
+        # Names of tables switched to unlogged for loading
+        self._unlogged_table_names: Set[str] = set()
+
         logger.info('init dst database')
 
     @property
@@ -382,6 +392,100 @@ class DstDatabase(BaseDatabase):
 
         logger.info('triggers enabled.')
 
+    @staticmethod
+    async def setup_bulk_load_session(
+        connection: asyncpg.Connection,
+    ):
+        """
+        Setup hook of connections pool for bulk loading. Settings are applied
+        on every acquiring, because they are reset by pool on releasing
+        """
+        await connection.execute(
+            SQLRepository.get_bulk_load_session_sql(
+                maintenance_work_mem=BULK_LOAD_MAINTENANCE_WORK_MEM,
+            )
+        )
+
+    async def _set_table_logging(
+        self,
+        table_name: str,
+        is_logged: bool,
+    ) -> bool:
+        async with self._connection_pool.acquire() as connection:
+            try:
+                await connection.execute(
+                    SQLRepository.get_set_table_logging_sql(
+                        table_name=table_name,
+                        is_logged=is_logged,
+                    )
+                )
+            except asyncpg.PostgresError as e:
+                logger.warning(f'{str(e)} --- {table_name} --- _set_table_logging')  # noqa
+
+                return False
+
+        return True
+
+    def _get_tables_dependency_levels(self) -> List[List[str]]:
+        """
+        Levels of tables names, where tables depend on tables of previous
+        levels by foreign keys. Tables with cyclic dependencies are absent
+        """
+        return get_dependency_levels(
+            nodes=self.tables.keys(),
+            dependency_pairs=[
+                (table.name, fk_column.constraint_table.name)
+                for table in self.tables.values()
+                for fk_column in table.not_self_fk_columns
+            ],
+        )
+
+    async def set_tables_unlogged(self):
+        """
+        Switching tables to unlogged for loading. Permanent tables can not
+        refer to unlogged tables, so referring tables are switched first
+        """
+        logger.info('start switching tables to unlogged..')
+
+        for level in reversed(self._get_tables_dependency_levels()):
+            results = await asyncio.gather(
+                *(
+                    self._set_table_logging(table_name, is_logged=False)
+                    for table_name in level
+                )
+            )
+
+            self._unlogged_table_names.update(
+                table_name
+                for table_name, is_switched in zip(level, results) if
+                is_switched
+            )
+
+        logger.info(
+            f'switching tables to unlogged finished, unlogged tables - '
+            f'{len(self._unlogged_table_names)}'
+        )
+
+    async def set_tables_logged(self):
+        """
+        Switching unlogged tables back to logged. Referred tables are switched
+        first
+        """
+        logger.info('start switching tables to logged..')
+
+        for level in self._get_tables_dependency_levels():
+            await asyncio.gather(
+                *(
+                    self._set_table_logging(table_name, is_logged=True)
+                    for table_name in level if
+                    table_name in self._unlogged_table_names
+                )
+            )
+
+        self._unlogged_table_names.clear()
+
+        logger.info('switching tables to logged finished.')
+
 
 class DBTable(object):
     """
@@ -393,13 +497,15 @@ class DBTable(object):
     __slots__ = (
         'name',
         'full_count',
+        'is_full_count_estimated',
         'max_pk',
         'columns',
         '_is_ready_for_transferring',
         '_is_checked',
         '_key_column',
         'revert_foreign_tables',
-        'need_transfer_pks',
+        '_need_transfer_pks',
+        'known_pks',
         'transferred_pks_count',
     )
 
@@ -409,9 +515,19 @@ class DBTable(object):
     # производиться действия пользователями и кол-во объектов может меняться
     inaccuracy_count = 100
 
+    # Допустимая относительная погрешность оценки кол-ва объектов по
+    # статистике каталога
+    estimate_inaccuracy_ratio = 0.1
+
+    # Keeper of memory budget of tables pks storages, which is notified about
+    # every access to storage
+    pks_spiller: Optional[PKStoragesSpiller] = None
+
     def __init__(self, name):
         self.name = name
         self.full_count = 0
+        # Count of records is estimated by catalog statistics
+        self.is_full_count_estimated = False
         self.max_pk = 0
         self.columns: Dict[str, 'DBColumn'] = {}
 
@@ -429,8 +545,13 @@ class DBTable(object):
             defaultdict(set)
         )
 
-        # Pks of table for transferring
-        self.need_transfer_pks = set()
+        # Pks of table for transferring. Storage is created by primary key
+        # data type on first access
+        self._need_transfer_pks: Optional[BasePKStorage] = None
+
+        # Pks of table, which are in slice transferred earlier. In
+        # incremental mode links of these records are not traversed again
+        self.known_pks: Optional[BasePKStorage] = None
 
         self.transferred_pks_count = 0
 
@@ -467,6 +588,39 @@ class DBTable(object):
         if primary_keys:
             return primary_keys[0]
 
+    @property
+    def need_transfer_pks(self) -> BasePKStorage:
+        """
+        Storage of table pks for transferring
+        """
+        if self._need_transfer_pks is None:
+            self._need_transfer_pks = make_pk_storage(
+                column=self.primary_key,
+            )
+
+        if self.pks_spiller is not None:
+            self.pks_spiller.touch(self.name, self._need_transfer_pks)
+
+        return self._need_transfer_pks
+
+    @need_transfer_pks.setter
+    def need_transfer_pks(self, need_transfer_pks: BasePKStorage):
+        self._need_transfer_pks = need_transfer_pks
+
+        if self.pks_spiller is not None:
+            self.pks_spiller.touch(self.name, need_transfer_pks)
+
+    @property
+    def new_need_transfer_pks(self) -> BasePKStorage:
+        """
+        Pks of table for transferring, which are absent in slice transferred
+        earlier
+        """
+        if self.known_pks is None:
+            return self.need_transfer_pks
+
+        return self.need_transfer_pks.difference(self.known_pks)
+
     @property
     def is_ready_for_transferring(self) -> bool:
         """
@@ -490,6 +644,19 @@ class DBTable(object):
 
             return True
 
+    @property
+    def is_full_count_borderline(self) -> bool:
+        """
+        Count of records is estimated and decision about full transferring of
+        table can be wrong in range of estimation inaccuracy
+        """
+        return self.is_full_count_estimated and (
+            len(self.need_transfer_pks) >= (
+                self.full_count * (1 - self.estimate_inaccuracy_ratio) -
+                self.inaccuracy_count
+            )
+        )
+
     @property
     @lru_cache()
     def with_fk(self):
@@ -0,0 +1,677 @@
+from abc import (
+    ABCMeta,
+    abstractmethod,
+)
+from collections import (
+    defaultdict,
+)
+from functools import (
+    partial,
+)
+from itertools import (
+    chain,
+)
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Set,
+    Tuple,
+    Union,
+)
+from uuid import (
+    uuid4,
+)
+
+from databaser.core.db_entities import (
+    DBColumn,
+    DBTable,
+    SrcDatabase,
+)
+from databaser.core.helpers import (
+    get_status_rows_count,
+    logger,
+)
+from databaser.core.repositories import (
+    SQLRepository,
+)
+from databaser.core.schedulers import (
+    TaskScheduler,
+)
+from databaser.core.storages import (
+    BasePKStorage,
+    make_pk_storage,
+)
+
+
+class BaseClosureEngine(metaclass=ABCMeta):
+    """
+    Базовый класс движков вычисления замыкания записей таблиц по внешним
+    ключам
+    """
+
+    def __init__(
+        self,
+        is_sampling: bool = False,
+    ):
+        self._is_sampling = is_sampling
+
+        self.rounds_count = 0
+
+    def _get_direct_columns(
+        self,
+        table: DBTable,
+    ) -> List[DBColumn]:
+        """
+        Колонки прямых связей таблицы
+        """
+        columns = [
+            column
+            for column in table.not_self_fk_columns if
+            not (
+                (
+                    column.constraint_table.with_key_column and
+                    not self._is_sampling
+                ) or
+                column.constraint_table.is_ready_for_transferring
+            )
+        ]
+
+        hierarchy_columns = [
+            column
+            for column in table.self_fk_columns if
+            not column.constraint_table.is_ready_for_transferring
+        ]
+
+        return columns + hierarchy_columns
+
+    @staticmethod
+    def _get_revert_edges(
+        table: DBTable,
+    ) -> List[Tuple[DBTable, DBColumn]]:
+        """
+        Обратные связи таблицы в виде пар из ссылающейся таблицы и ее колонки
+        """
+        return [
+            (revert_table, revert_column)
+            for revert_table, revert_columns in table.revert_foreign_tables.items() if  # noqa
+            not (
+                revert_table.with_key_column or
+                revert_table == table or
+                revert_table.is_ready_for_transferring
+            )
+            for revert_column in revert_columns if
+            revert_column in revert_table.highest_priority_fk_columns
+        ]
+
+    @abstractmethod
+    async def run(self):
+        """
+        Вычисление замыкания до неподвижной точки
+        """
+
+
+class ClosureEngine(BaseClosureEngine):
+    """
+    Движок вычисления замыкания записей таблиц по внешним ключам
+
+    Работает по принципу полунаивного вычисления Datalog. Для каждой таблицы
+    хранится дельта - идентификаторы, добавленные с момента последнего
+    обхода ее связей. На каждом шаге связи таблиц обходятся только по
+    дельтам, новые идентификаторы попадают в дельты следующего шага.
+    Вычисление заканчивается, когда новых идентификаторов не появляется.
+
+    Прямые связи (записи внешних таблиц, на которые ссылаются записи
+    таблицы) обходятся для всех таблиц. Обратные связи (записи таблиц,
+    ссылающихся на записи таблицы) обходятся только для таблиц, записи
+    которых были получены по обратным связям или являются начальными
+
+    При выборке начальных записей (sampling) записи таблиц с ключевой
+    колонкой собраны не полностью, поэтому прямые связи с такими таблицами
+    также обходятся по идентификаторам
+    """
+
+    def __init__(
+        self,
+        get_table_column_values: Callable[..., Awaitable[BasePKStorage]],
+        is_full_prepared: Callable[[DBTable], Awaitable[bool]],
+        scheduler: TaskScheduler,
+        chunk_size: int,
+        is_sampling: bool = False,
+    ):
+        super().__init__(
+            is_sampling=is_sampling,
+        )
+
+        self._get_table_column_values = get_table_column_values
+        self._is_full_prepared = is_full_prepared
+        self._scheduler = scheduler
+        self._chunk_size = chunk_size
+
+        # Идентификаторы, еще не пройденные по прямым связям
+        self._direct_deltas: Dict[DBTable, BasePKStorage] = {}
+        # Идентификаторы, еще не пройденные по обратным связям
+        self._revert_deltas: Dict[DBTable, BasePKStorage] = {}
+        # Таблицы, для которых обходятся обратные связи
+        self._revert_tables: Set[DBTable] = set()
+        # Прямые связи, запрос по которым выполняется без идентификаторов
+        # записей и достаточно одного обхода
+        self._passed_full_edges: Set[Tuple[DBTable, str]] = set()
+
+    @staticmethod
+    def _append_delta(
+        deltas: Dict[DBTable, BasePKStorage],
+        table: DBTable,
+        pks: Iterable[Union[int, str]],
+    ):
+        """
+        Добавление идентификаторов в дельту таблицы
+        """
+        delta = deltas.get(table)
+
+        if delta is None:
+            deltas[table] = make_pk_storage(
+                column=table.primary_key,
+                pks=pks,
+            )
+        else:
+            delta.update(pks)
+
+    def add(
+        self,
+        table: DBTable,
+        pks: Iterable[Union[int, str]],
+        with_revert: bool = False,
+    ):
+        """
+        Добавление идентификаторов записей таблицы. Новые идентификаторы
+        сохраняются в таблице и попадают в дельты для обхода связей
+
+        Args:
+            table: таблица
+            pks: идентификаторы записей
+            with_revert: идентификаторы получены по обратной связи или
+                являются начальными, поэтому для таблицы необходимо обходить
+                обратные связи
+        """
+        new_pks = table.need_transfer_pks.missing(pks)
+
+        if new_pks:
+            table.update_need_transfer_pks(
+                need_transfer_pks=new_pks,
+            )
+
+            self._append_delta(self._direct_deltas, table, new_pks)
+
+            if table in self._revert_tables:
+                self._append_delta(self._revert_deltas, table, new_pks)
+
+        if (
+            with_revert and
+            table not in self._revert_tables and
+            table.need_transfer_pks
+        ):
+            self._revert_tables.add(table)
+            table.is_checked = True
+
+            # при включении обхода обратных связей обходятся все ранее
+            # собранные идентификаторы таблицы, кроме идентификаторов ранее
+            # перенесенного среза
+            revert_delta = table.new_need_transfer_pks
+
+            if revert_delta:
+                self._append_delta(
+                    self._revert_deltas,
+                    table,
+                    revert_delta,
+                )
+
+            del revert_delta
+
+        del new_pks
+
+    async def _pass_direct_edge_chunk(
+        self,
+        table: DBTable,
+        column: DBColumn,
+        pks_chunk: Iterable[Union[int, str]],
+    ):
+        """
+        Обход прямой связи по части идентификаторов
+        """
+        foreign_table_pks = await self._get_table_column_values(
+            table=table,
+            column=column,
+            primary_key_values=pks_chunk,
+        )
+
+        if foreign_table_pks:
+            logger.debug(
+                f"table - {table.name}, column - {column.name} - direct "
+                f"collecting of fk_ids ----- {column.constraint_table.name}"
+            )
+
+            self.add(
+                table=column.constraint_table,
+                pks=foreign_table_pks,
+            )
+
+        del foreign_table_pks
+
+    async def _pass_direct_edge(
+        self,
+        table: DBTable,
+        column: DBColumn,
+        delta: BasePKStorage,
+    ):
+        """
+        Обход прямой связи таблицы по дельте
+        """
+        column.constraint_table.is_checked = True
+
+        # для таблиц с ключевой колонкой и полностью переносимых таблиц
+        # идентификаторы записей не передаются, поэтому запрос выполняется
+        # один раз
+        if (
+            (table.with_key_column and not self._is_sampling) or
+            await self._is_full_prepared(table)
+        ):
+            edge_key = (table, column.name)
+
+            if edge_key in self._passed_full_edges:
+                return
+
+            self._passed_full_edges.add(edge_key)
+
+            pks_chunks = [()]
+        else:
+            pks_chunks = delta.chunks(self._chunk_size)
+
+        await self._scheduler.map(
+            self._pass_direct_edge_chunk(
+                table=table,
+                column=column,
+                pks_chunk=pks_chunk,
+            )
+            for pks_chunk in pks_chunks
+        )
+
+    async def _pass_revert_edge_chunk(
+        self,
+        revert_table: DBTable,
+        revert_column: DBColumn,
+        pks_chunk: Iterable[Union[int, str]],
+    ):
+        """
+        Обход обратной связи по части идентификаторов
+        """
+        revert_table_pks = await self._get_table_column_values(
+            table=revert_table,
+            column=revert_table.primary_key,
+            where_conditions_columns={
+                revert_column.name: pks_chunk,
+            },
+            is_revert=True,
+        )
+
+        if revert_table_pks:
+            self.add(
+                table=revert_table,
+                pks=revert_table_pks,
+                with_revert=True,
+            )
+
+        del revert_table_pks
+
+    async def _pass_revert_edge(
+        self,
+        revert_table: DBTable,
+        revert_column: DBColumn,
+        delta: BasePKStorage,
+    ):
+        """
+        Обход обратной связи таблицы по дельте
+        """
+        await self._scheduler.map(
+            self._pass_revert_edge_chunk(
+                revert_table=revert_table,
+                revert_column=revert_column,
+                pks_chunk=pks_chunk,
+            )
+            for pks_chunk in delta.chunks(self._chunk_size)
+        )
+
+    async def run(self):
+        """
+        Вычисление замыкания до неподвижной точки
+        """
+        while self._direct_deltas or self._revert_deltas:
+            self.rounds_count += 1
+
+            direct_deltas, self._direct_deltas = self._direct_deltas, {}
+            revert_deltas, self._revert_deltas = self._revert_deltas, {}
+
+            logger.debug(
+                f'closure round {self.rounds_count}, tables with direct '
+                f'delta - {len(direct_deltas)}, tables with revert delta - '
+                f'{len(revert_deltas)}'
+            )
+
+            await self._scheduler.map(
+                chain(
+                    (
+                        self._pass_direct_edge(
+                            table=table,
+                            column=column,
+                            delta=delta,
+                        )
+                        for table, delta in direct_deltas.items()
+                        for column in self._get_direct_columns(table)
+                    ),
+                    (
+                        self._pass_revert_edge(
+                            revert_table=revert_table,
+                            revert_column=revert_column,
+                            delta=delta,
+                        )
+                        for table, delta in revert_deltas.items()
+                        for revert_table, revert_column in self._get_revert_edges(table)  # noqa
+                    ),
+                )
+            )
+
+            for table in chain(direct_deltas.keys(), revert_deltas.keys()):
+                table.is_checked = True
+
+            del direct_deltas
+            del revert_deltas
+
+
+class ServerSideClosureEngine(BaseClosureEngine):
+    """
+    Движок вычисления замыкания записей таблиц по внешним ключам на стороне
+    базы-донора
+
+    Для каждой таблицы в отдельной схеме базы-донора создается
+    нежурналируемая таблица среза с идентификаторами записей и номером
+    раунда их добавления. Связи обходятся запросами INSERT ... SELECT ...
+    JOIN по записям среза, добавленным в предыдущем раунде, поэтому
+    идентификаторы не передаются между базой-донором и Databaser.
+    Вычисление заканчивается, когда в раунде не добавлено ни одной записи.
+    Порядок обхода связей совпадает с ClosureEngine
+    """
+
+    # Префикс имени схемы среза. Имя схемы уникально для каждого запуска,
+    # чтобы одновременные запуски по одной базе-донору не удаляли таблицы
+    # среза друг друга
+    SCHEMA_PREFIX = 'databaser_slice'
+
+    def __init__(
+        self,
+        src_database: SrcDatabase,
+        scheduler: TaskScheduler,
+        key_column_values: Set[int],
+    ):
+        super().__init__()
+
+        self._src_database = src_database
+        self._scheduler = scheduler
+        self._key_column_values = key_column_values
+
+        self.schema = f'{self.SCHEMA_PREFIX}_{uuid4().hex}'
+
+        # Таблицы, для которых созданы таблицы среза
+        self._slice_tables: Set[DBTable] = set()
+        # Таблицы, записи которых добавлены в предыдущем раунде
+        self._new_tables: Set[DBTable] = set()
+        # Таблицы, для которых обходятся обратные связи, и таблицы, обход
+        # обратных связей которых включен в предыдущем раунде
+        self._revert_tables: Set[DBTable] = set()
+        self._new_revert_tables: Set[DBTable] = set()
+
+        # Количество записей таблиц в срезе
+        self.tables_counts: Dict[DBTable, int] = defaultdict(int)
+
+    async def _execute(
+        self,
+        sql: str,
+        *parameters,
+    ) -> int:
+        """
+        Выполнение запроса добавления записей в срез. Возвращает количество
+        добавленных записей из статуса выполнения команды
+        """
+        async with self._scheduler.slot():
+            async with self._src_database.connection_pool.acquire() as connection:  # noqa
+                status = await connection.execute(sql, *parameters)
+
+        return get_status_rows_count(status)
+
+    async def _create_slice_table(
+        self,
+        table: DBTable,
+    ):
+        async with self._src_database.connection_pool.acquire() as connection:
+            await connection.execute(
+                SQLRepository.get_create_slice_table_sql(
+                    schema=self.schema,
+                    table=table,
+                )
+            )
+
+        self._slice_tables.add(table)
+
+    async def prepare(
+        self,
+        tables: Iterable[DBTable],
+    ):
+        """
+        Создание схемы и таблиц среза для таблиц с первичным ключом
+        """
+        async with self._src_database.connection_pool.acquire() as connection:
+            await connection.execute(
+                SQLRepository.get_create_slice_schema_sql(
+                    schema=self.schema,
+                )
+            )
+
+        await self._scheduler.map(
+            self._create_slice_table(table)
+            for table in tables if
+            table.primary_key is not None
+        )
+
+    async def drop(self):
+        """
+        Удаление схемы с таблицами среза
+        """
+        async with self._src_database.connection_pool.acquire() as connection:
+            await connection.execute(
+                SQLRepository.get_drop_slice_schema_sql(
+                    schema=self.schema,
+                )
+            )
+
+    def _add_inserted(
+        self,
+        table: DBTable,
+        inserted_count: int,
+    ):
+        if inserted_count:
+            self.tables_counts[table] += inserted_count
+            self._new_tables.add(table)
+
+    async def add_seeds(
+        self,
+        table: DBTable,
+    ):
+        """
+        Добавление в срез начальных записей таблицы с ключевой колонкой. Для
+        таблицы обходятся обратные связи
+        """
+        if table not in self._slice_tables:
+            return
+
+        inserted_count = await self._execute(
+            SQLRepository.get_insert_slice_seeds_sql(
+                schema=self.schema,
+                table=table,
+                key_column_values=self._key_column_values,
+            )
+        )
+
+        table.is_checked = True
+
+        if inserted_count:
+            self._add_inserted(table, inserted_count)
+            self._revert_tables.add(table)
+            self._new_revert_tables.add(table)
+
+    async def _pass_direct_edge(
+        self,
+        table: DBTable,
+        column: DBColumn,
+    ):
+        """
+        Обход прямой связи по записям среза предыдущего раунда
+        """
+        inserted_count = await self._execute(
+            SQLRepository.get_insert_slice_direct_edge_sql(
+                schema=self.schema,
+                table=table,
+                column=column,
+            ),
+            self.rounds_count - 1,
+            self.rounds_count - 1,
+            self.rounds_count,
+        )
+
+        self._add_inserted(column.constraint_table, inserted_count)
+
+    async def _pass_revert_edge(
+        self,
+        table: DBTable,
+        revert_table: DBTable,
+        revert_column: DBColumn,
+        from_round: int,
+    ):
+        """
+        Обход обратной связи по записям среза, начиная с раунда from_round.
+        Если ссылающиеся записи найдены, то для ссылающейся таблицы
+        включается обход обратных связей
+        """
+        async with self._scheduler.slot():
+            async with self._src_database.connection_pool.acquire() as connection:  # noqa
+                found_count, inserted_count = await connection.fetchrow(
+                    SQLRepository.get_insert_slice_revert_edge_sql(
+                        schema=self.schema,
+                        table=table,
+                        revert_table=revert_table,
+                        revert_column=revert_column,
+                    ),
+                    from_round,
+                    self.rounds_count - 1,
+                    self.rounds_count,
+                )
+
+        self._add_inserted(revert_table, inserted_count)
+
+        if found_count:
+            revert_table.is_checked = True
+
+            if revert_table not in self._revert_tables:
+                # найденные записи могли быть добавлены ранее по прямым
+                # связям, поэтому таблица обходится в следующем раунде даже
+                # без добавленных записей
+                self._revert_tables.add(revert_table)
+                self._new_revert_tables.add(revert_table)
+                self._new_tables.add(revert_table)
+
+    async def _pass_target_edges(
+        self,
+        edges: List[Callable[[], Awaitable[None]]],
+    ):
+        """
+        Последовательный обход связей, добавляющих записи в одну таблицу
+        среза. Параллельные вставки пересекающихся идентификаторов в одну
+        таблицу могут приводить к взаимным блокировкам
+        """
+        for edge in edges:
+            await edge()
+
+    def _get_round_edges(
+        self,
+        new_tables: Set[DBTable],
+        new_revert_tables: Set[DBTable],
+    ) -> Dict[DBTable, List[Callable[[], Awaitable[None]]]]:
+        """
+        Связи раунда, сгруппированные по таблицам, в которые добавляются
+        записи
+        """
+        target_edges = defaultdict(list)
+
+        for table in new_tables:
+            for column in self._get_direct_columns(table):
+                column.constraint_table.is_checked = True
+
+                if column.constraint_table in self._slice_tables:
+                    target_edges[column.constraint_table].append(
+                        partial(self._pass_direct_edge, table, column)
+                    )
+
+        for table in new_tables & self._revert_tables:
+            # при включении обхода обратных связей обходятся все записи
+            # среза таблицы
+            from_round = (
+                0 if
+                table in new_revert_tables else
+                self.rounds_count - 1
+            )
+
+            for revert_table, revert_column in self._get_revert_edges(table):
+                if revert_table in self._slice_tables:
+                    target_edges[revert_table].append(
+                        partial(
+                            self._pass_revert_edge,
+                            table,
+                            revert_table,
+                            revert_column,
+                            from_round,
+                        )
+                    )
+
+        return target_edges
+
+    async def run(self):
+        """
+        Вычисление замыкания до неподвижной точки
+        """
+        while self._new_tables:
+            self.rounds_count += 1
+
+            new_tables, self._new_tables = self._new_tables, set()
+            new_revert_tables, self._new_revert_tables = (
+                self._new_revert_tables,
+                set(),
+            )
+
+            target_edges = self._get_round_edges(
+                new_tables=new_tables,
+                new_revert_tables=new_revert_tables,
+            )
+
+            logger.debug(
+                f'server side closure round {self.rounds_count}, tables with '
+                f'new records - {len(new_tables)}, tables with new records of '
+                f'round - {len(target_edges)}'
+            )
+
+            await self._scheduler.map(
+                self._pass_target_edges(edges)
+                for edges in target_edges.values()
+            )
+
+            for table in new_tables:
+                table.is_checked = True
@@ -63,6 +63,73 @@ class StagesEnum:
     }
 
 
+class LookupStrategiesEnum:
+    """
+    Strategies of getting table column values by sets of identifiers
+    """
+    LITERAL = 'literal'
+    ARRAY = 'array'
+    TEMP_TABLE = 'temp_table'
+    FULL_SCAN = 'full_scan'
+    AUTO = 'auto'
+
+    values = {
+        LITERAL: 'Identifiers inlined into query as IN-lists',
+        ARRAY: 'Identifiers bound to parametrized query as typed arrays',
+        TEMP_TABLE: 'Identifiers copied into session temporary tables',
+        FULL_SCAN: 'Table records filtered by identifiers on client side',
+        AUTO: 'Strategy chosen by lookups planner for every lookup',
+    }
+
+
+class CountersModesEnum:
+    """
+    Modes of filling tables records counters
+    """
+    EXACT = 'exact'
+    ESTIMATE = 'estimate'
+
+    values = {
+        EXACT: 'Records are counted by count(*) of every table',
+        ESTIMATE: (
+            'Records counts are estimated by catalog statistics, exact counts '
+            'are fetched only for borderline tables'
+        ),
+    }
+
+
+class ClosureEnginesEnum:
+    """
+    Engines of computing closure of tables records by foreign keys
+    """
+    CLIENT = 'client'
+    SERVER = 'server'
+
+    values = {
+        CLIENT: 'Foreign keys are traversed by lookups of records ids sets',
+        SERVER: (
+            'Foreign keys are traversed by INSERT ... SELECT queries into '
+            'slice tables of source database'
+        ),
+    }
+
+
+class TransferStrategiesEnum:
+    """
+    Strategies of transferring tables records to destination database
+    """
+    FDW = 'fdw'
+    COPY = 'copy'
+
+    values = {
+        FDW: 'Records are inserted from foreign tables of postgres_fdw',
+        COPY: (
+            'Records are piped by binary COPY from source database to '
+            'destination database'
+        ),
+    }
+
+
 class LogLevelEnum:
     NOTSET = 'NOTSET'
     DEBUG = 'DEBUG'
@@ -0,0 +1,390 @@
+import json
+from typing import (
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import asyncpg
+from prettytable import (
+    PrettyTable,
+)
+
+from databaser.core.db_entities import (
+    DBTable,
+    DstDatabase,
+    SrcDatabase,
+)
+from databaser.core.helpers import (
+    logger,
+)
+from databaser.core.repositories import (
+    SQLRepository,
+)
+from databaser.settings import (
+    EXCLUDED_TABLES,
+    FULL_TRANSFER_TABLES,
+    KEY_TABLE_NAME,
+    TABLES_WITH_GENERIC_FOREIGN_KEY,
+)
+
+
+class TableSliceEstimation(NamedTuple):
+    """
+    Estimation of table records, which will be transferred
+    """
+    table_name: str
+    rows_count: int
+    full_count: int
+    row_width: int
+    source: str
+
+    @property
+    def size(self) -> int:
+        return self.rows_count * self.row_width
+
+
+class SliceEstimator:
+    """
+    Estimator of size of data slice without collecting of records ids and
+    transferring
+
+    Counts of records of tables with key column are estimated by planner of
+    source database by EXPLAIN of lookups of SQLRepository. Counts of other
+    tables are propagated through foreign keys proportionally to parts of
+    estimated tables, distinct values of foreign keys columns are taken into
+    account by pg_stats. Width of records is sum of average widths of columns
+    from pg_stats
+    """
+
+    # Size of header of record
+    TUPLE_HEADER_SIZE = 24
+    # Limit of passes of propagation of estimations through foreign keys
+    MAX_PROPAGATION_PASSES = 20
+
+    def __init__(
+        self,
+        src_database: SrcDatabase,
+        dst_database: DstDatabase,
+        key_column_values: Set[int],
+    ):
+        self._src_database = src_database
+        self._dst_database = dst_database
+        self._key_column_values = key_column_values
+
+        self._rows_counts: Dict[str, int] = {}
+        self._sources: Dict[str, str] = {}
+        self._rows_widths: Dict[str, int] = {}
+        # Fractions of distinct values of columns, received from pg_stats
+        self._distinct_fractions: Dict[Tuple[str, str], float] = {}
+
+    async def _explain(
+        self,
+        sql: str,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Estimated count and width of records returned by query
+        """
+        async with self._src_database.connection_pool.acquire() as connection:
+            try:
+                plan = await connection.fetchval(
+                    SQLRepository.get_explain_sql(sql=sql)
+                )
+            except asyncpg.PostgresError as e:
+                logger.warning(f'{str(e)} --- {sql} --- _explain')
+
+                return
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return int(plan[0]['Plan']['Plan Rows']), int(plan[0]['Plan']['Plan Width'])  # noqa
+
+    async def _load_statistics(self):
+        """
+        Loading average widths of records and fractions of distinct values
+        of columns from pg_stats
+        """
+        records = await self._src_database.fetch_raw_sql(
+            SQLRepository.get_columns_statistics_sql()
+        )
+
+        for table_name, column_name, avg_width, n_distinct in records:
+            if table_name not in self._dst_database.tables:
+                continue
+
+            self._rows_widths[table_name] = (
+                self._rows_widths.get(table_name, self.TUPLE_HEADER_SIZE) +
+                (avg_width or 0)
+            )
+
+            full_count = self._dst_database.tables[table_name].full_count
+
+            if n_distinct is None:
+                continue
+            elif n_distinct < 0:
+                distinct_fraction = -n_distinct
+            elif full_count:
+                distinct_fraction = n_distinct / full_count
+            else:
+                continue
+
+            self._distinct_fractions[(table_name, column_name)] = min(
+                distinct_fraction,
+                1.0,
+            )
+
+    def _set_rows_count(
+        self,
+        table: DBTable,
+        rows_count: float,
+        source: str,
+    ):
+        self._rows_counts[table.name] = int(min(rows_count, table.full_count))
+        self._sources[table.name] = source
+
+    def _get_fraction(
+        self,
+        table: DBTable,
+    ) -> Optional[float]:
+        """
+        Part of table records in slice
+        """
+        if table.name not in self._rows_counts:
+            return
+
+        if not table.full_count:
+            return 1.0
+
+        return self._rows_counts[table.name] / table.full_count
+
+    async def _estimate_tables_with_key_column(self):
+        """
+        Estimation of tables with key column by EXPLAIN of lookups
+        """
+        for table in self._dst_database.tables_with_key_column:
+            if (
+                table.name in EXCLUDED_TABLES or
+                table.name in self._rows_counts
+            ):
+                continue
+
+            lookups_sql = await SQLRepository.get_table_column_values_sql(
+                table=table,
+                column=table.primary_key,
+                key_column_values=self._key_column_values,
+            )
+
+            rows_count = 0
+            for lookup_sql in lookups_sql:
+                explain_result = await self._explain(lookup_sql)
+
+                if explain_result:
+                    rows_count += explain_result[0]
+
+            self._set_rows_count(table, rows_count, 'explain')
+
+    def _estimate_table_by_relations(
+        self,
+        table: DBTable,
+    ) -> Optional[float]:
+        """
+        Estimation of table records count by estimated related tables
+        """
+        estimations = []
+
+        # записи таблицы, ссылающиеся на записи собранных таблиц
+        fk_fractions = [
+            self._get_fraction(fk_column.constraint_table)
+            for fk_column in table.highest_priority_fk_columns if
+            fk_column.constraint_table.name != table.name
+        ]
+        fk_fractions = [f for f in fk_fractions if f is not None]
+
+        if fk_fractions:
+            estimations.append(table.full_count * min(fk_fractions))
+
+        # записи таблицы, на которые ссылаются записи собранных таблиц
+        for revert_table, revert_columns in table.revert_foreign_tables.items():  # noqa
+            if (
+                revert_table.name == table.name or
+                revert_table.name not in self._rows_counts
+            ):
+                continue
+
+            for revert_column in revert_columns:
+                distinct_fraction = self._distinct_fractions.get(
+                    (revert_table.name, revert_column.name),
+                    1.0,
+                )
+
+                estimations.append(
+                    self._rows_counts[revert_table.name] * distinct_fraction
+                )
+
+        if estimations:
+            return max(estimations)
+
+    def _propagate_estimations(self):
+        """
+        Propagation of estimations through foreign keys until estimations
+        stop changing
+        """
+        fixed_tables_names = set(self._rows_counts.keys())
+
+        tables = [
+            table
+            for table in self._dst_database.tables_without_generics if
+            table.name not in fixed_tables_names and
+            table.name not in EXCLUDED_TABLES
+        ]
+
+        for _ in range(self.MAX_PROPAGATION_PASSES):
+            is_changed = False
+
+            for table in tables:
+                rows_count = self._estimate_table_by_relations(table)
+
+                if (
+                    rows_count is not None and
+                    int(min(rows_count, table.full_count)) != self._rows_counts.get(table.name)  # noqa
+                ):
+                    self._set_rows_count(table, rows_count, 'relations')
+                    is_changed = True
+
+            if not is_changed:
+                break
+
+        # таблицы, не связанные с собранными таблицами, переносятся целиком
+        for table in tables:
+            if table.name not in self._rows_counts:
+                self._set_rows_count(table, table.full_count, 'all')
+
+    def _estimate_generic_tables(self):
+        """
+        Estimation of generic tables by total part of estimated tables
+        """
+        estimated_rows_count = sum(self._rows_counts.values())
+        estimated_full_count = sum(
+            self._dst_database.tables[table_name].full_count
+            for table_name in self._rows_counts
+        )
+
+        fraction = (
+            estimated_rows_count / estimated_full_count if
+            estimated_full_count else
+            1.0
+        )
+
+        for table_name in set(TABLES_WITH_GENERIC_FOREIGN_KEY).difference(EXCLUDED_TABLES):  # noqa
+            table = self._dst_database.tables.get(table_name)
+
+            if table:
+                self._set_rows_count(
+                    table,
+                    table.full_count * fraction,
+                    'generic',
+                )
+
+    async def estimate(self) -> List[TableSliceEstimation]:
+        """
+        Estimation of slice. Tables are sorted by estimated size descending
+        """
+        logger.info('start estimating slice..')
+
+        await self._load_statistics()
+
+        key_table = self._dst_database.tables.get(KEY_TABLE_NAME)
+        if key_table:
+            self._set_rows_count(
+                key_table,
+                len(self._key_column_values),
+                'key values',
+            )
+
+        for table_name in FULL_TRANSFER_TABLES:
+            table = self._dst_database.tables.get(table_name)
+
+            if table:
+                self._set_rows_count(table, table.full_count, 'full transfer')
+
+        await self._estimate_tables_with_key_column()
+
+        self._propagate_estimations()
+        self._estimate_generic_tables()
+
+        estimations = [
+            TableSliceEstimation(
+                table_name=table_name,
+                rows_count=rows_count,
+                full_count=self._dst_database.tables[table_name].full_count,
+                row_width=self._rows_widths.get(
+                    table_name,
+                    self.TUPLE_HEADER_SIZE,
+                ),
+                source=self._sources[table_name],
+            )
+            for table_name, rows_count in self._rows_counts.items()
+        ]
+
+        estimations.sort(key=lambda e: e.size, reverse=True)
+
+        logger.info('estimating slice finished.')
+
+        return estimations
+
+    @staticmethod
+    def print_estimations(
+        estimations: List[TableSliceEstimation],
+    ):
+        """
+        Print estimations of tables ranked by expected size
+        """
+        total_size = sum(e.size for e in estimations)
+
+        result_table = PrettyTable()
+
+        result_table.field_names = [
+            'Table',
+            'Rows',
+            'Full count',
+            'Rows, %',
+            'Row width',
+            'Size, MB',
+            'Size, %',
+            'Source',
+        ]
+
+        for estimation in estimations:
+            result_table.add_row(
+                (
+                    estimation.table_name,
+                    estimation.rows_count,
+                    estimation.full_count,
+                    round(
+                        estimation.rows_count / estimation.full_count * 100
+                        if estimation.full_count else
+                        0,
+                        2,
+                    ),
+                    estimation.row_width,
+                    round(estimation.size / 1024 ** 2, 2),
+                    round(
+                        estimation.size / total_size * 100
+                        if total_size else
+                        0,
+                        2,
+                    ),
+                    estimation.source,
+                )
+            )
+
+        logger.info(result_table)
+        logger.info(
+            f'estimated slice rows - '
+            f'{sum(e.rows_count for e in estimations)}, size - '
+            f'{round(total_size / 1024 ** 2, 2)} MB'
+        )
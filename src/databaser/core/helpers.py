@@ -19,6 +19,7 @@ from itertools import (
 )
 from typing import (
     Any,
+    Hashable,
     Iterable,
     List,
     Tuple,
@@ -129,6 +130,150 @@ def topological_sort(
     return Results(ordered, cyclic)
 
 
+def get_strongly_connected_components(
+    nodes: Iterable[Hashable],
+    dependency_pairs: Iterable[Tuple[Hashable, Hashable]],
+) -> List[List[Hashable]]:
+    """
+    Поиск компонент сильной связности графа зависимостей алгоритмом Тарьяна
+
+    Узлы, входящие в пары зависимостей, но отсутствующие в nodes, также
+    попадают в компоненты
+
+    Args:
+        nodes: узлы графа
+        dependency_pairs: пары (узел, узел от которого он зависит)
+
+    Returns:
+        Список компонент, каждая из которых является списком узлов.
+        Компоненты перечислены так, что зависимости компоненты находятся
+        раньше нее
+    """
+    dependency_pairs = list(dependency_pairs)
+    nodes = list(dict.fromkeys(chain(nodes, *dependency_pairs)))
+
+    graph = defaultdict(list)
+    for node, dependency in dependency_pairs:
+        graph[node].append(dependency)
+
+    next_index = 0
+    indexes = {}
+    low_links = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in nodes:
+        if root in indexes:
+            continue
+
+        indexes[root] = low_links[root] = next_index
+        next_index += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        # обход в глубину без рекурсии, для исключения превышения глубины
+        # рекурсии на больших схемах
+        work = [(root, iter(graph[root]))]
+
+        while work:
+            node, dependencies = work[-1]
+
+            for dependency in dependencies:
+                if dependency not in indexes:
+                    indexes[dependency] = low_links[dependency] = next_index
+                    next_index += 1
+                    stack.append(dependency)
+                    on_stack.add(dependency)
+
+                    work.append((dependency, iter(graph[dependency])))
+
+                    break
+                elif dependency in on_stack:
+                    low_links[node] = min(low_links[node], indexes[dependency])
+            else:
+                work.pop()
+
+                if work:
+                    parent = work[-1][0]
+                    low_links[parent] = min(low_links[parent], low_links[node])
+
+                if low_links[node] == indexes[node]:
+                    component = []
+
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+
+                        if member == node:
+                            break
+
+                    components.append(component)
+
+    return components
+
+
+def get_dependency_levels(
+    nodes: Iterable[Hashable],
+    dependency_pairs: Iterable[Tuple[Hashable, Hashable]],
+) -> List[List[Hashable]]:
+    """
+    Разбиение узлов ацикличного графа зависимостей на уровни
+
+    Узлы одного уровня не зависят друг от друга, а все их зависимости
+    находятся на предыдущих уровнях. Зависимости от узлов, не входящих в
+    nodes, считаются выполненными. Узлы, входящие в циклы, в уровни не
+    попадают
+
+    Args:
+        nodes: узлы графа
+        dependency_pairs: пары (узел, узел от которого он зависит)
+
+    Returns:
+        Список уровней узлов
+    """
+    nodes = list(nodes)
+    nodes_set = set(nodes)
+
+    dependencies = defaultdict(set)
+    for node, dependency in dependency_pairs:
+        if node in nodes_set and dependency in nodes_set and node != dependency:
+            dependencies[node].add(dependency)
+
+    dependents = defaultdict(list)
+    for node, node_dependencies in dependencies.items():
+        for dependency in node_dependencies:
+            dependents[dependency].append(node)
+
+    remaining_dependencies_counts = {
+        node: len(dependencies[node])
+        for node in nodes
+    }
+
+    levels = []
+    level = [
+        node
+        for node in nodes if
+        not remaining_dependencies_counts[node]
+    ]
+
+    while level:
+        levels.append(level)
+
+        next_level = []
+        for node in level:
+            for dependent in dependents[node]:
+                remaining_dependencies_counts[dependent] -= 1
+
+                if not remaining_dependencies_counts[dependent]:
+                    next_level.append(dependent)
+
+        level = next_level
+
+    return levels
+
+
 def make_chunks(
     iterable: Iterable[Any],
     size: int,
@@ -152,6 +297,14 @@ def make_chunks(
         )
 
 
+def get_status_rows_count(status: str) -> int:
+    """
+    Получение количества обработанных строк из статуса выполнения команды,
+    например, "INSERT 0 70000" или "COPY 70000"
+    """
+    return int(status.split()[-1])
+
+
 def deep_getattr(object_, attribute_: str, default=None):
     """
     Получить значение атрибута с любого уровня цепочки вложенных объектов.
@@ -178,7 +331,8 @@ def get_str_environ_parameter(
     default: str = '',
 ) -> str:
     """
-    Получение значения параметра из переменных окружения, имеющего строковое значение
+    Получение значения параметра из переменных окружения, имеющего строковое значение.
+    Пустое значение заменяется значением по-умолчанию
 
     Args:
         name: имя переменной окружения
@@ -187,7 +341,7 @@ def get_str_environ_parameter(
     Returns:
         Полученное значение
     """
-    return os.environ.get(name, default).strip()
+    return os.environ.get(name, '').strip() or default
 
 
 def get_int_environ_parameter(
@@ -195,7 +349,8 @@ def get_int_environ_parameter(
     default: int = 0,
 ) -> int:
     """
-    Получение значения параметра из переменных окружения, имеющего целочисленное значение
+    Получение значения параметра из переменных окружения, имеющего целочисленное значение.
+    Пустое значение заменяется значением по-умолчанию
 
     Args:
         name: имя переменной окружения
@@ -204,7 +359,9 @@ def get_int_environ_parameter(
     Returns:
         Полученное значение
     """
-    return int(os.environ.get(name, default))
+    parameter_value = os.environ.get(name, '').strip()
+
+    return int(parameter_value) if parameter_value else default
 
 
 def get_bool_environ_parameter(
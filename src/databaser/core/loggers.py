@@ -40,6 +40,11 @@ class StatisticManager:
         self._time_indications = defaultdict(list)
         self._memory_usage_indications = defaultdict(list)
 
+        # Планировщики задач, показатели которых выводятся в статистике
+        self._schedulers = {}
+        # Кеши, показатели которых выводятся в статистике
+        self._caches = {}
+
     def set_indication_time(self, stage):
         """
         Фиксация времени этапа
@@ -71,6 +76,36 @@ class StatisticManager:
                     f"{self._memory_usage_indications[stage]}"
                 )
 
+    def register_scheduler(self, name: str, scheduler):
+        """
+        Регистрация планировщика задач для вывода его показателей
+        """
+        self._schedulers[name] = scheduler
+
+    def print_schedulers_statistic(self):
+        """
+        Печать показателей планировщиков задач
+        """
+        for name, scheduler in self._schedulers.items():
+            logger.info(
+                f"{name} scheduler --- {scheduler.get_statistic()}"
+            )
+
+    def register_cache(self, name: str, cache):
+        """
+        Регистрация кеша для вывода его показателей
+        """
+        self._caches[name] = cache
+
+    def print_caches_statistic(self):
+        """
+        Печать показателей кешей
+        """
+        for name, cache in self._caches.items():
+            logger.info(
+                f"{name} cache --- {cache.get_statistic()}"
+            )
+
     def print_records_transfer_statistic(self):
         """
         Печать статистики перенесенных записей в целевую базу данных
@@ -1,13 +1,14 @@
 import asyncio
-from copy import (
-    copy,
-)
 from datetime import (
     datetime,
 )
 from typing import (
+    Callable,
+    Dict,
     List,
+    Optional,
     Set,
+    Tuple,
     Type,
 )
 
@@ -17,11 +18,16 @@ from asyncpg import (
     UndefinedFunctionError,
 )
 
+from databaser.core.caches import (
+    FilesCache,
+    LookupsCache,
+)
 from databaser.core.collectors import (
     BaseCollector,
     FullTransferCollector,
     GenericTablesCollector,
     KeyTableCollector,
+    ServerSideTablesWithKeyColumnSiblingsCollector,
     SortedByDependencyTablesCollector,
     TablesWithKeyColumnSiblingsCollector,
 )
@@ -31,8 +37,15 @@ from databaser.core.db_entities import (
     SrcDatabase,
 )
 from databaser.core.enums import (
+    ClosureEnginesEnum,
+    CountersModesEnum,
+    DataTypesEnum,
+    LookupStrategiesEnum,
     StagesEnum,
 )
+from databaser.core.estimators import (
+    SliceEstimator,
+)
 from databaser.core.helpers import (
     DBConnectionParameters,
     logger,
@@ -42,9 +55,23 @@ from databaser.core.loggers import (
     StatisticManager,
     statistic_indexer,
 )
+from databaser.core.planners import (
+    LookupsPlanner,
+)
 from databaser.core.repositories import (
     SQLRepository,
 )
+from databaser.core.schedulers import (
+    TaskScheduler,
+)
+from databaser.core.snapshots import (
+    PKSnapshot,
+)
+from databaser.core.storages import (
+    BasePKStorage,
+    PKStoragesSpiller,
+    make_pk_storage,
+)
 from databaser.core.transporters import (
     Transporter,
 )
@@ -55,6 +82,10 @@ from databaser.core.wrappers import (
     PostgresFDWExtensionWrapper,
 )
 from databaser.settings import (
+    CACHE_DIRECTORY,
+    CLOSURE_ENGINE,
+    COLLECTORS_CONCURRENCY_LIMIT,
+    COUNTERS_MODE,
     DST_DB_HOST,
     DST_DB_NAME,
     DST_DB_PASSWORD,
@@ -62,15 +93,27 @@ from databaser.settings import (
     DST_DB_SCHEMA,
     DST_DB_USER,
     EXCLUDED_TABLES,
+    IS_BULK_LOAD_MODE,
+    IS_INCREMENTAL_MODE,
+    IS_LOAD_SNAPSHOT,
+    IS_PIPELINED_TRANSFER,
+    IS_PLAN_MODE,
+    IS_UNLOGGED_TABLES_LOAD,
     KEY_COLUMN_VALUES,
     KEY_TABLE_HIERARCHY_COLUMN_NAME,
+    KEY_TABLE_HIERARCHY_WITH_DESCENDANTS,
     KEY_TABLE_NAME,
+    LOOKUP_STRATEGY,
+    LOOKUPS_CACHE_SIZE,
+    PKS_MEMORY_LIMIT,
+    SNAPSHOT_DIRECTORY,
     SRC_DB_HOST,
     SRC_DB_NAME,
     SRC_DB_PASSWORD,
     SRC_DB_PORT,
     SRC_DB_SCHEMA,
     SRC_DB_USER,
+    STATEMENT_CACHE_SIZE,
     TEST_MODE,
 )
 
@@ -83,8 +126,26 @@ class DatabaserManager:
     def __init__(
         self,
         *args,
+        is_plan_mode: bool = False,
+        is_incremental_mode: bool = False,
         **kwargs,
     ):
+        # Dry run mode, where only size of data slice is estimated
+        self._is_plan_mode = is_plan_mode or IS_PLAN_MODE
+        # Mode of adding records of new key values to existing slice
+        self._is_incremental_mode = is_incremental_mode or IS_INCREMENTAL_MODE
+
+        if self._is_incremental_mode and not SNAPSHOT_DIRECTORY:
+            raise ValueError(
+                'You must send snapshot directory for incremental mode!'
+            )
+
+        if self._is_incremental_mode and IS_LOAD_SNAPSHOT:
+            raise ValueError(
+                'Incremental mode and loading snapshot can not be used '
+                'together!'
+            )
+
         self._src_db_connection_parameters = DBConnectionParameters(
             host=SRC_DB_HOST,
             port=SRC_DB_PORT,
@@ -117,53 +178,39 @@ class DatabaserManager:
 
         self._key_column_values = set(KEY_COLUMN_VALUES)
 
-    async def _get_key_table_parents_values(
+    async def _get_key_table_hierarchy_values(
         self,
-        key_table_primary_key_name: str,
-        key_table_primary_key_value: int,
-    ):
+        key_table: DBTable,
+    ) -> List[int]:
         """
-        Get hierarchy of key table records by parent_id
+        Get ancestors and, if it is needed, descendants of key table records
+        by one recursive query
         """
+        get_key_table_hierarchy_values_sql = (
+            SQLRepository.get_key_table_hierarchy_values_sql(
+                key_table_name=key_table.name,
+                primary_key=key_table.primary_key,
+                hierarchy_column_name=KEY_TABLE_HIERARCHY_COLUMN_NAME,
+            )
+        )
+
         async with self._src_database.connection_pool.acquire() as connection:
-            get_key_table_parents_values_sql = f"""
-                with recursive hierarchy("{key_table_primary_key_name}", "{KEY_TABLE_HIERARCHY_COLUMN_NAME}", "level") as (
-                    select "{KEY_TABLE_NAME}"."{key_table_primary_key_name}", 
-                        "{KEY_TABLE_NAME}"."{KEY_TABLE_HIERARCHY_COLUMN_NAME}", 
-                        0 
-                    from "{KEY_TABLE_NAME}" 
-                    where "{KEY_TABLE_NAME}"."{key_table_primary_key_name}" = {key_table_primary_key_value}
-        
-                    union all
-        
-                    select
-                        "{KEY_TABLE_NAME}"."{key_table_primary_key_name}",
-                        "{KEY_TABLE_NAME}"."{KEY_TABLE_HIERARCHY_COLUMN_NAME}",
-                        "hierarchy"."level" + 1
-                    from "{KEY_TABLE_NAME}" 
-                    join "hierarchy" on "{KEY_TABLE_NAME}"."{key_table_primary_key_name}" = "hierarchy"."{KEY_TABLE_HIERARCHY_COLUMN_NAME}"
-                )
-                select "{KEY_TABLE_NAME}"."{key_table_primary_key_name}" {key_table_primary_key_name} 
-                from "{KEY_TABLE_NAME}" 
-                join "hierarchy" on "{KEY_TABLE_NAME}"."{key_table_primary_key_name}" = "hierarchy"."{key_table_primary_key_name}"
-                where "{KEY_TABLE_NAME}"."{key_table_primary_key_name}" <> {key_table_primary_key_value}
-                order by "hierarchy"."level" desc;
-            """
-
-            records = await connection.fetch(get_key_table_parents_values_sql)
-
-            self._key_column_values.update(
-                [
-                    record.get('id')
-                    for record in records
-                ]
+            records = await connection.fetch(
+                get_key_table_hierarchy_values_sql,
+                list(self._key_column_values),
+                KEY_TABLE_HIERARCHY_WITH_DESCENDANTS,
             )
 
-            del get_key_table_parents_values_sql
+        return [
+            record[0]
+            for record in records
+        ]
 
     async def _build_key_column_values_hierarchical_structure(self):
         """
-        Building tree of hierarchy key table records by parent_id column
+        Building tree of hierarchy key table records by parent_id column.
+        Result is cached in files cache by key values and version of key
+        table
         """
         logger.info("build tree of enterprises for transfer process")
 
@@ -172,19 +219,45 @@ class DatabaserManager:
             column_name=KEY_TABLE_HIERARCHY_COLUMN_NAME,
         )
 
-        if hierarchy_column:
-            coroutines = [
-                asyncio.create_task(
-                    self._get_key_table_parents_values(
-                        key_table_primary_key_name=key_table.primary_key.name,
-                        key_table_primary_key_value=key_column_value,
+        if hierarchy_column and self._key_column_values:
+            files_cache = FilesCache(
+                directory=CACHE_DIRECTORY,
+            )
+
+            async with self._src_database.connection_pool.acquire() as connection:  # noqa
+                key_table_version = await connection.fetchrow(
+                    SQLRepository.get_table_version_sql(
+                        table_name=key_table.name,
                     )
                 )
-                for key_column_value in copy(self._key_column_values)
+
+            cache_key = [
+                key_table.name,
+                KEY_TABLE_HIERARCHY_COLUMN_NAME,
+                KEY_TABLE_HIERARCHY_WITH_DESCENDANTS,
+                sorted(self._key_column_values),
+                list(key_table_version),
             ]
 
-            if coroutines:
-                await asyncio.wait(coroutines)
+            hierarchy_values = files_cache.get(
+                name='key_table_hierarchy',
+                key=cache_key,
+            )
+
+            if hierarchy_values is None:
+                hierarchy_values = await self._get_key_table_hierarchy_values(
+                    key_table=key_table,
+                )
+
+                files_cache.set(
+                    name='key_table_hierarchy',
+                    key=cache_key,
+                    value=hierarchy_values,
+                )
+            else:
+                logger.info('tree of enterprises is taken from cache')
+
+            self._key_column_values.update(hierarchy_values)
 
         logger.info(
             f"transferring enterprises - "
@@ -231,23 +304,347 @@ class DatabaserManager:
 
             del count_table_records_sql
 
-    async def _set_tables_counters(self):
+    async def _set_table_estimated_counters(
+        self,
+        table_name: str,
+        estimated_count: int,
+    ):
+        """
+        Filling table max pk and estimated count of records. Max pk is
+        received by backward scan of primary key index
+        """
+        table = self._dst_database.tables[table_name]
+
+        table.full_count = estimated_count
+        table.is_full_count_estimated = True
+
+        if (
+            table.primary_key is not None and
+            table.primary_key.data_type in DataTypesEnum.NUMERAL
+        ):
+            async with self._src_database.connection_pool.acquire() as connection:  # noqa
+                max_pk = await connection.fetchval(
+                    SQLRepository.get_max_pk_sql(
+                        primary_key=table.primary_key,
+                    )
+                )
+
+            if max_pk is not None:
+                table.max_pk = int(max_pk)
+        elif table.full_count:
+            table.max_pk = table.full_count + 100000
+
+        logger.debug(
+            f"table {table_name} with estimated count {table.full_count}, "
+            f"max pk - {table.max_pk}"
+        )
+
+    async def _set_tables_counters(
+        self,
+        counters_mode: str = COUNTERS_MODE,
+    ):
         logger.info(
             'start filling tables max pk and count of records..'
         )
 
-        coroutines = [
-            asyncio.create_task(
-                self._set_table_counters(table_name)
-            )
-            for table_name in sorted(self._dst_database.tables.keys())
-        ]
+        if counters_mode == CountersModesEnum.ESTIMATE:
+            async with self._src_database.connection_pool.acquire() as connection:  # noqa
+                estimated_counts = await connection.fetch(
+                    SQLRepository.get_estimated_tables_counts_sql(),
+                    list(self._dst_database.tables.keys()),
+                )
+
+            coroutines = [
+                asyncio.create_task(
+                    self._set_table_estimated_counters(
+                        table_name=table_name,
+                        estimated_count=estimated_count,
+                    )
+                )
+                for table_name, estimated_count in estimated_counts if
+                table_name in self._dst_database.tables
+            ]
+        else:
+            coroutines = [
+                asyncio.create_task(
+                    self._set_table_counters(table_name)
+                )
+                for table_name in sorted(self._dst_database.tables.keys())
+            ]
 
         if coroutines:
             await asyncio.wait(coroutines)
 
         logger.info('finished filling tables max pk and count of records.')
 
+    async def _estimate_slice(self):
+        """
+        Dry run, which estimates size of data slice without collecting of
+        records ids and transferring
+        """
+        await self._build_key_column_values_hierarchical_structure()
+
+        # оценка не должна выполнять count(*) всех таблиц базы-донора,
+        # поэтому количества записей всегда берутся из статистики каталога
+        async with statistic_indexer(
+            self._statistic_manager,
+            StagesEnum.FILLING_TABLES_ROWS_COUNTS,
+        ):
+            await self._set_tables_counters(
+                counters_mode=CountersModesEnum.ESTIMATE,
+            )
+
+        estimator = SliceEstimator(
+            src_database=self._src_database,
+            dst_database=self._dst_database,
+            key_column_values=self._key_column_values,
+        )
+
+        estimations = await estimator.estimate()
+
+        estimator.print_estimations(estimations)
+
+        self._statistic_manager.print_stages_indications()
+
+    async def _get_source_lsn(self) -> Optional[str]:
+        """
+        Current WAL position of source database
+        """
+        async with self._src_database.connection_pool.acquire() as connection:
+            try:
+                return await connection.fetchval(
+                    SQLRepository.get_current_lsn_sql()
+                )
+            except asyncpg.PostgresError as e:
+                logger.warning(f'{str(e)} --- _get_source_lsn')
+
+    def _set_pks_spiller(self):
+        """
+        Setting keeper of memory budget of tables pks storages
+        """
+        if PKS_MEMORY_LIMIT:
+            DBTable.pks_spiller = PKStoragesSpiller(
+                memory_limit=PKS_MEMORY_LIMIT * 1024 ** 2,
+                directory=CACHE_DIRECTORY,
+            )
+
+            self._statistic_manager.register_cache(
+                name='pks spiller',
+                cache=DBTable.pks_spiller,
+            )
+
+    async def _collect(
+        self,
+        on_table_ready: Optional[Callable[[DBTable], None]] = None,
+    ) -> Optional[str]:
+        """
+        Collecting records identifiers of tables. Returns LSN of source
+        database at the beginning of collecting
+
+        Args:
+            on_table_ready: callback for tables, records identifiers of which
+                are final
+        """
+        async with statistic_indexer(
+            self._statistic_manager,
+            StagesEnum.FILLING_TABLES_ROWS_COUNTS,
+        ):
+            await self._set_tables_counters()
+
+        source_lsn = await self._get_source_lsn()
+
+        collector_manager = CollectorManager(
+            src_database=self._src_database,
+            dst_database=self._dst_database,
+            statistic_manager=self._statistic_manager,
+            key_column_values=self._key_column_values,
+            on_table_ready=on_table_ready,
+        )
+        await asyncio.wait(
+            [
+                asyncio.create_task(
+                    collector_manager.manage()
+                ),
+            ]
+        )
+
+        return source_lsn
+
+    def _save_snapshot(
+        self,
+        key_column_values: Set[int],
+        source_lsn: Optional[str],
+    ):
+        """
+        Saving collected records identifiers of tables to snapshot
+        """
+        PKSnapshot(
+            directory=SNAPSHOT_DIRECTORY,
+        ).save(
+            dst_database=self._dst_database,
+            key_column_values=key_column_values,
+            source_lsn=source_lsn,
+        )
+
+    def _load_increment(
+        self,
+    ) -> Tuple[Set[int], Dict[str, BasePKStorage]]:
+        """
+        Loading slice transferred earlier from snapshot before collecting of
+        records identifiers of new key values. Only new key values are left
+        for collecting and transferring
+
+        Identifiers of existing slice are put to tables and are marked as
+        known, so collectors traverse only records, which are reachable from
+        new key values and are absent in slice
+
+        Returns:
+            All key values of extended slice and identifiers of tables of
+            slice transferred earlier
+        """
+        manifest, transferred_tables_pks = PKSnapshot(
+            directory=SNAPSHOT_DIRECTORY,
+        ).load_tables_pks(
+            dst_database=self._dst_database,
+        )
+
+        transferred_key_column_values = set(manifest['key_column_values'])
+        all_key_column_values = (
+            self._key_column_values | transferred_key_column_values
+        )
+
+        self._key_column_values = self._key_column_values.difference(
+            transferred_key_column_values
+        )
+
+        if not self._key_column_values:
+            logger.info('slice already contains all key values')
+
+            return all_key_column_values, transferred_tables_pks
+
+        logger.info(
+            f'new key values - '
+            f'{make_str_from_iterable(sorted(self._key_column_values))}'
+        )
+
+        for table_name, transferred_pks in transferred_tables_pks.items():
+            table = self._dst_database.tables[table_name]
+
+            # копия, т.к. идентификаторы снимка не должны изменяться
+            table.need_transfer_pks = make_pk_storage(
+                column=table.primary_key,
+                pks=transferred_pks,
+            )
+            table.known_pks = transferred_pks
+
+        return all_key_column_values, transferred_tables_pks
+
+    async def _collect_increment(
+        self,
+        all_key_column_values: Set[int],
+        transferred_tables_pks: Dict[str, BasePKStorage],
+    ):
+        """
+        Collecting records identifiers of new key values for adding to
+        existing slice
+
+        Snapshot is replaced by snapshot of extended slice, and only
+        difference is left for transferring
+        """
+        if not self._key_column_values:
+            return
+
+        source_lsn = await self._collect()
+
+        # разность вычисляется до сохранения снимка, т.к. файлы снимка
+        # заменяются идентификаторами расширенного среза
+        new_tables_pks = {
+            table_name: table.new_need_transfer_pks
+            for table_name, table in self._dst_database.tables.items() if
+            table_name in transferred_tables_pks
+        }
+
+        self._save_snapshot(
+            key_column_values=all_key_column_values,
+            source_lsn=source_lsn,
+        )
+
+        for table_name, new_pks in new_tables_pks.items():
+            table = self._dst_database.tables[table_name]
+
+            table.need_transfer_pks = new_pks
+            table.known_pks = None
+
+        del new_tables_pks
+
+    def _load_snapshot(self):
+        """
+        Loading records identifiers of tables from snapshot instead of
+        collecting
+        """
+        manifest = PKSnapshot(
+            directory=SNAPSHOT_DIRECTORY,
+        ).load(
+            dst_database=self._dst_database,
+        )
+
+        self._key_column_values = set(manifest['key_column_values'])
+
+    async def _collect_and_transfer(self):
+        """
+        Collecting records identifiers of tables or loading them from
+        snapshot and transferring records
+        """
+        self._set_pks_spiller()
+
+        increment = None
+
+        # ключевые значения заменяются до создания Transporter
+        if IS_LOAD_SNAPSHOT:
+            self._load_snapshot()
+        elif self._is_incremental_mode:
+            increment = self._load_increment()
+
+        transporter = Transporter(
+            dst_database=self._dst_database,
+            src_database=self._src_database,
+            statistic_manager=self._statistic_manager,
+            key_column_values=self._key_column_values,
+        )
+
+        if self._is_incremental_mode:
+            await self._collect_increment(*increment)
+        elif not IS_LOAD_SNAPSHOT:
+            on_table_ready = None
+
+            if IS_PIPELINED_TRANSFER:
+                # таблицы с окончательными идентификаторами
+                # переносятся во время сбора
+                transporter.start()
+
+                on_table_ready = transporter.enqueue_table
+
+            try:
+                source_lsn = await self._collect(
+                    on_table_ready=on_table_ready,
+                )
+            except BaseException:
+                await transporter.cancel()
+
+                raise
+
+            if SNAPSHOT_DIRECTORY:
+                self._save_snapshot(
+                    key_column_values=self._key_column_values,
+                    source_lsn=source_lsn,
+                )
+
+        async with statistic_indexer(
+            self._statistic_manager,
+            StagesEnum.PREPARING_AND_TRANSFERRING_DATA,
+        ):
+            await transporter.transfer()
+
     async def _main(self):
         """
         Run async databaser
@@ -256,11 +653,18 @@ class DatabaserManager:
             self._dst_database.connection_str,
             min_size=30,
             max_size=40,
+            statement_cache_size=STATEMENT_CACHE_SIZE,
+            setup=(
+                DstDatabase.setup_bulk_load_session if
+                IS_BULK_LOAD_MODE else
+                None
+            ),
         ) as dst_pool:
             async with asyncpg.create_pool(
                 self._src_database.connection_str,
                 min_size=30,
                 max_size=40,
+                statement_cache_size=STATEMENT_CACHE_SIZE,
             ) as src_pool:
                 self._src_database.connection_pool = src_pool
                 self._dst_database.connection_pool = dst_pool
@@ -277,14 +681,23 @@ class DatabaserManager:
                     dst_database=self._dst_database,
                     dst_pool=dst_pool,
                 )
-                await asyncio.wait(
-                    [
-                        asyncio.create_task(
-                            fdw_wrapper.disable()
-                        ),
-                    ]
+
+                # при переносе всех таблиц по COPY расширение FDW не
+                # используется
+                is_fdw_required = (
+                    not self._is_plan_mode and
+                    Transporter.is_fdw_required()
                 )
 
+                if is_fdw_required:
+                    await asyncio.wait(
+                        [
+                            asyncio.create_task(
+                                fdw_wrapper.disable()
+                            ),
+                        ]
+                    )
+
                 await asyncio.wait(
                     [
                         asyncio.create_task(
@@ -303,81 +716,72 @@ class DatabaserManager:
                 ):
                     await self._dst_database.prepare_structure()
 
-                await self._dst_database.disable_triggers()
+                if self._is_plan_mode:
+                    await self._estimate_slice()
 
-                await asyncio.wait(
-                    [
-                        asyncio.create_task(
-                            self._build_key_column_values_hierarchical_structure()  # noqa
-                        ),
-                    ]
-                )
-                async with statistic_indexer(
-                    self._statistic_manager,
-                    StagesEnum.TRUNCATE_DST_DB_TABLES,
-                ):
-                    await self._dst_database.truncate_tables()
+                    return
+
+                # в режиме массовой загрузки триггеры не срабатывают только в
+                # сессиях пула благодаря session_replication_role
+                if not IS_BULK_LOAD_MODE:
+                    await self._dst_database.disable_triggers()
 
                 await asyncio.wait(
                     [
                         asyncio.create_task(
-                            fdw_wrapper.enable()
+                            self._build_key_column_values_hierarchical_structure()  # noqa
                         ),
                     ]
                 )
+                # в инкрементальном режиме перенесенные ранее записи
+                # сохраняются
+                if not self._is_incremental_mode:
+                    async with statistic_indexer(
+                        self._statistic_manager,
+                        StagesEnum.TRUNCATE_DST_DB_TABLES,
+                    ):
+                        await self._dst_database.truncate_tables()
+
+                if is_fdw_required:
+                    await asyncio.wait(
+                        [
+                            asyncio.create_task(
+                                fdw_wrapper.enable()
+                            ),
+                        ]
+                    )
 
-                async with statistic_indexer(
-                    self._statistic_manager,
-                    StagesEnum.FILLING_TABLES_ROWS_COUNTS,
-                ):
-                    await self._set_tables_counters()
+                # при ошибке сбора или переноса таблицы также возвращаются в
+                # журналируемый режим, иначе их данные теряются при сбое
+                try:
+                    if IS_UNLOGGED_TABLES_LOAD:
+                        await self._dst_database.set_tables_unlogged()
 
-                collector_manager = CollectorManager(
-                    src_database=self._src_database,
-                    dst_database=self._dst_database,
-                    statistic_manager=self._statistic_manager,
-                    key_column_values=self._key_column_values,
-                )
-                await asyncio.wait(
-                    [
-                        asyncio.create_task(
-                            collector_manager.manage()
-                        ),
-                    ]
-                )
+                    await self._collect_and_transfer()
+                finally:
+                    if IS_UNLOGGED_TABLES_LOAD:
+                        await self._dst_database.set_tables_logged()
 
-                transporter = Transporter(
-                    dst_database=self._dst_database,
-                    src_database=self._src_database,
-                    statistic_manager=self._statistic_manager,
-                    key_column_values=self._key_column_values,
-                )
+                if not IS_BULK_LOAD_MODE:
+                    await self._dst_database.enable_triggers()
 
-                async with statistic_indexer(
-                    self._statistic_manager,
-                    StagesEnum.PREPARING_AND_TRANSFERRING_DATA,
-                ):
+                if is_fdw_required:
                     await asyncio.wait(
                         [
                             asyncio.create_task(
-                                transporter.transfer()
+                                fdw_wrapper.disable()
                             ),
                         ]
                     )
 
-                await self._dst_database.enable_triggers()
-
-                await asyncio.wait(
-                    [
-                        asyncio.create_task(
-                            fdw_wrapper.disable()
-                        ),
-                    ]
-                )
-
                 self._statistic_manager.print_stages_indications()
+                self._statistic_manager.print_schedulers_statistic()
+                self._statistic_manager.print_caches_statistic()
                 self._statistic_manager.print_records_transfer_statistic()
 
+                if DBTable.pks_spiller is not None:
+                    DBTable.pks_spiller.clear()
+
                 if TEST_MODE:
                     validator_manager = ValidatorManager(
                         dst_database=self._dst_database,
@@ -423,19 +827,86 @@ class CollectorManager:
         dst_database: DstDatabase,
         statistic_manager: StatisticManager,
         key_column_values: Set[int],
+        on_table_ready: Optional[Callable[[DBTable], None]] = None,
     ):
         self._dst_database = dst_database
         self._src_database = src_database
         self._key_column_values = key_column_values
         self._statistic_manager = statistic_manager
+        self._on_table_ready = on_table_ready
+
+        # Общий для всех сборщиков планировщик запросов к базе-донору
+        self._scheduler = TaskScheduler(
+            limit=COLLECTORS_CONCURRENCY_LIMIT,
+        )
+        self._statistic_manager.register_scheduler(
+            name='collectors',
+            scheduler=self._scheduler,
+        )
+
+        # Общий для всех сборщиков кеш результатов запросов к базе-донору
+        self._lookups_cache = LookupsCache(
+            max_size=LOOKUPS_CACHE_SIZE,
+        )
+        self._statistic_manager.register_cache(
+            name='lookups',
+            cache=self._lookups_cache,
+        )
+
+        self._lookups_planner = LookupsPlanner(
+            strategy=LOOKUP_STRATEGY,
+            chunk_size=SQLRepository.CHUNK_SIZE,
+        )
+
+    async def _load_indexed_columns(self):
+        """
+        Loading columns of source database, which are leading columns of
+        indexes, for lookups planning
+        """
+        async with self._src_database.connection_pool.acquire() as connection:
+            records = await connection.fetch(
+                SQLRepository.get_select_indexed_columns_sql()
+            )
+
+        self._lookups_planner.set_indexed_columns(
+            (record[0], record[1])
+            for record in records
+        )
+
+        logger.info(f'loaded {len(records)} indexed columns')
+
+    def _get_collectors_classes(self) -> List[Type[BaseCollector]]:
+        """
+        Collectors classes with collector of tables with key column chosen
+        by closure engine
+        """
+        collectors_classes = list(self.collectors_classes)
+
+        if CLOSURE_ENGINE == ClosureEnginesEnum.SERVER:
+            collectors_classes[
+                collectors_classes.index(TablesWithKeyColumnSiblingsCollector)
+            ] = ServerSideTablesWithKeyColumnSiblingsCollector
+
+        return collectors_classes
 
     async def manage(self):
-        for collector_class in self.collectors_classes:
+        if LOOKUP_STRATEGY == LookupStrategiesEnum.AUTO:
+            await self._load_indexed_columns()
+
+        for collector_class in self._get_collectors_classes():
             collector = collector_class(
                 src_database=self._src_database,
                 dst_database=self._dst_database,
                 statistic_manager=self._statistic_manager,
                 key_column_values=self._key_column_values,
+                scheduler=self._scheduler,
+                lookups_cache=self._lookups_cache,
+                lookups_planner=self._lookups_planner,
+                on_table_ready=self._on_table_ready,
             )
 
             await collector.collect()
+
+        logger.info(
+            f'lookups strategies --- {self._lookups_planner.get_statistic()}'
+        )
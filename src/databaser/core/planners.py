@@ -0,0 +1,213 @@
+from math import (
+    ceil,
+    log2,
+)
+from typing import (
+    Dict,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from databaser.core.db_entities import (
+    DBColumn,
+    DBTable,
+)
+from databaser.core.enums import (
+    LookupStrategiesEnum,
+)
+from databaser.core.helpers import (
+    logger,
+)
+from databaser.settings import (
+    KEY_COLUMN_NAMES,
+)
+
+
+class LookupPlan(NamedTuple):
+    """
+    Chosen strategy of lookup and its estimated cost
+    """
+    strategy: str
+    cost: float
+
+
+class LookupsPlanner:
+    """
+    Planner choosing strategy of getting table column values by sets of
+    identifiers
+
+    Cost of every strategy is estimated by count of table records, count of
+    identifiers and availability of indexes of filtering columns. Costs are
+    measured in relative units, where one unit is cost of sequential reading
+    of one record on server side
+    """
+
+    # Cost of sequential reading of one record on server side
+    SEQ_ROW_COST = 1.0
+    # Cost of one level of index descent for one identifier
+    INDEX_PROBE_COST = 2.0
+    # Cost of transferring and filtering of one record on client side
+    CLIENT_ROW_COST = 5.0
+    # Cost of building hash of one identifier on server or client side
+    HASH_ID_COST = 0.2
+    # Costs of passing one identifier by strategies
+    LITERAL_ID_COST = 2.0
+    ARRAY_ID_COST = 0.5
+    COPY_ID_COST = 0.3
+    # Cost of round trip and planning of one query
+    QUERY_COST = 1000.0
+    # Cost of creating and analyzing of temporary table
+    TEMP_TABLE_COST = 5000.0
+
+    def __init__(
+        self,
+        strategy: str,
+        chunk_size: int,
+    ):
+        self._strategy = strategy
+        self._chunk_size = chunk_size
+
+        # Pairs of table name and column name, which are leading columns of
+        # indexes of source database
+        self._indexed_columns: Set[Tuple[str, str]] = set()
+
+        self.strategies_counts: Dict[str, int] = {
+            strategy_: 0
+            for strategy_ in LookupStrategiesEnum.values if
+            strategy_ != LookupStrategiesEnum.AUTO
+        }
+
+    def set_indexed_columns(
+        self,
+        indexed_columns: Iterable[Tuple[str, str]],
+    ):
+        """
+        Setting columns of source database tables, which are leading columns
+        of indexes
+        """
+        self._indexed_columns = set(indexed_columns)
+
+    def _is_indexed(
+        self,
+        table: DBTable,
+        column_name: str,
+    ) -> bool:
+        return (table.name, column_name) in self._indexed_columns
+
+    def _get_costs(
+        self,
+        rows_count: int,
+        ids_count: int,
+        driving_ids_count: int,
+        with_index: bool,
+    ) -> Dict[str, float]:
+        """
+        Estimation of costs of strategies
+        """
+        rows_count = max(rows_count, 1)
+        chunks_count = max(ceil(driving_ids_count / self._chunk_size), 1)
+
+        seq_scan_cost = rows_count * self.SEQ_ROW_COST
+
+        if with_index:
+            index_cost = (
+                ids_count * log2(rows_count + 1) * self.INDEX_PROBE_COST
+            )
+            chunks_lookup_cost = min(index_cost, chunks_count * seq_scan_cost)
+            join_lookup_cost = min(
+                index_cost,
+                seq_scan_cost + ids_count * self.HASH_ID_COST,
+            )
+        else:
+            chunks_lookup_cost = chunks_count * seq_scan_cost
+            join_lookup_cost = seq_scan_cost + ids_count * self.HASH_ID_COST
+
+        return {
+            LookupStrategiesEnum.LITERAL: (
+                ids_count * self.LITERAL_ID_COST +
+                chunks_count * self.QUERY_COST +
+                chunks_lookup_cost
+            ),
+            LookupStrategiesEnum.ARRAY: (
+                ids_count * self.ARRAY_ID_COST +
+                chunks_count * self.QUERY_COST +
+                chunks_lookup_cost
+            ),
+            LookupStrategiesEnum.TEMP_TABLE: (
+                ids_count * self.COPY_ID_COST +
+                self.TEMP_TABLE_COST +
+                self.QUERY_COST +
+                join_lookup_cost
+            ),
+            LookupStrategiesEnum.FULL_SCAN: (
+                self.QUERY_COST +
+                seq_scan_cost +
+                rows_count * self.CLIENT_ROW_COST +
+                ids_count * self.HASH_ID_COST
+            ),
+        }
+
+    def plan(
+        self,
+        table: DBTable,
+        column: DBColumn,
+        primary_key_values: Iterable[Union[int, str]] = (),
+        where_conditions_columns: Optional[Dict[str, Iterable[Union[int, str]]]] = None,  # noqa
+    ) -> LookupPlan:
+        """
+        Choosing strategy of lookup. If strategy is fixed by settings, then
+        it is used and only its cost is estimated
+        """
+        ids_counts = {}
+
+        if primary_key_values:
+            ids_counts[table.primary_key.name] = len(primary_key_values)
+
+        for c_name, c_ids in (where_conditions_columns or {}).items():
+            if c_name not in KEY_COLUMN_NAMES and c_ids:
+                ids_counts[c_name] = len(c_ids)
+
+        ids_count = sum(ids_counts.values())
+
+        costs = self._get_costs(
+            rows_count=table.full_count,
+            ids_count=ids_count,
+            driving_ids_count=max(ids_counts.values(), default=0),
+            with_index=any(
+                self._is_indexed(table, c_name)
+                for c_name in ids_counts
+            ),
+        )
+
+        if self._strategy != LookupStrategiesEnum.AUTO:
+            strategy = self._strategy
+        elif not ids_count:
+            # без наборов идентификаторов все стратегии выполняют один и тот
+            # же запрос
+            strategy = LookupStrategiesEnum.ARRAY
+        else:
+            strategy = min(costs, key=costs.get)
+
+        self.strategies_counts[strategy] += 1
+
+        logger.debug(
+            f'lookup plan of table "{table.name}", column "{column.name}" - '
+            f'{strategy}, estimated cost {costs[strategy]:.0f} (ids - '
+            f'{ids_count}, rows - {table.full_count}, costs - '
+            f'{ {s: round(c) for s, c in costs.items()} })'
+        )
+
+        return LookupPlan(
+            strategy=strategy,
+            cost=costs[strategy],
+        )
+
+    def get_statistic(self) -> Dict[str, int]:
+        """
+        Counts of lookups by chosen strategies
+        """
+        return dict(self.strategies_counts)
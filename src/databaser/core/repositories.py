@@ -1,10 +1,13 @@
-import copy
 from typing import (
+    Any,
+    Callable,
     Dict,
+    Hashable,
     Iterable,
     List,
     Optional,
     Set,
+    Tuple,
     Union,
 )
 
@@ -25,9 +28,51 @@ from databaser.settings import (
 )
 
 
+class PreparedStatementsRegistry:
+    """
+    Реестр текстов параметризованных запросов
+
+    Тексты запросов строятся один раз для каждой формы запроса и
+    переиспользуются, благодаря чему подготовленные выражения берутся из
+    кэша соединений asyncpg
+    """
+
+    def __init__(self):
+        self._statements: Dict[Hashable, str] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._statements)
+
+    def get(
+        self,
+        key: Hashable,
+        builder: Callable[[], str],
+    ) -> str:
+        """
+        Получение текста запроса по ключу формы запроса. Если запрос еще не
+        был построен, то он строится при помощи builder
+        """
+        statement = self._statements.get(key)
+
+        if statement is None:
+            self.misses += 1
+
+            statement = builder()
+            self._statements[key] = statement
+        else:
+            self.hits += 1
+
+        return statement
+
+
 class SQLRepository:
     CHUNK_SIZE = 60000
 
+    statements_registry = PreparedStatementsRegistry()
+
     CREATE_FDW_EXTENSION_SQL_TEMPLATE = (
         'CREATE EXTENSION postgres_fdw;'
     )
@@ -147,6 +192,16 @@ class SQLRepository:
 
     ENABLE_TRIGGERS_SQL_TEMPLATE = "update pg_trigger set tgenabled='O' ;"
 
+    BULK_LOAD_SESSION_SQL_TEMPLATE = """
+        set session_replication_role = replica;
+        set synchronous_commit = off;
+        {maintenance_work_mem_sql}
+    """
+
+    SET_TABLE_LOGGING_SQL_TEMPLATE = """
+        alter table "public"."{table_name}" set {logging};
+    """
+
     SERIAL_SEQUENCE_SQL_TEMPLATE = """
         select pg_get_serial_sequence('{table_name}', '{pk_column_name}');
     """
@@ -159,16 +214,208 @@ class SQLRepository:
         select "{constraint_column_name}"  from "{table_name}" {where_conditions};
     """
 
+    CREATE_TEMP_IDS_TABLE_SQL_TEMPLATE = """
+        create temporary table "{temp_table_name}" ("id" {data_type}) on commit drop;
+    """
+
+    ANALYZE_TABLE_SQL_TEMPLATE = """
+        analyze "{table_name}";
+    """
+
+    ARRAY_CONDITION_SQL_TEMPLATE = (
+        '"{column_name}" = any(${parameter_number}::{data_type}[])'
+    )
+
+    TEMP_IDS_TABLE_CONDITION_SQL_TEMPLATE = (
+        '"{column_name}" in (select "id" from "{temp_table_name}")'
+    )
+
+    SELECT_INDEXED_COLUMNS_SQL_TEMPLATE = """
+        select c.relname, a.attname
+        from pg_index i
+        join pg_class c on c.oid = i.indrelid
+        join pg_namespace n on n.oid = c.relnamespace
+        join pg_attribute a on (
+            a.attrelid = i.indrelid and
+            a.attnum = i.indkey[0]
+        )
+        where n.nspname = 'public' and i.indisvalid;
+    """
+
+    SELECT_TABLE_COLUMNS_VALUES_TEMPLATE = """
+        select {columns_names} from "{table_name}" {where_conditions};
+    """
+
+    SELECT_SAMPLED_TABLE_COLUMN_VALUES_SQL_TEMPLATE = """
+        select "{column_name}"
+        from "{table_name}" {table_sample}
+        {where_conditions}
+        order by "{column_name}"
+        {limit};
+    """
+
+    CURRENT_LSN_SQL_TEMPLATE = """
+        select (
+            case
+                when pg_is_in_recovery() then pg_last_wal_replay_lsn()
+                else pg_current_wal_lsn()
+            end
+        )::text;
+    """
+
+    EXPLAIN_SQL_TEMPLATE = """
+        explain (format json) {sql}
+    """
+
+    COLUMNS_STATISTICS_SQL_TEMPLATE = """
+        select "tablename", "attname", "avg_width", "n_distinct"
+        from pg_stats
+        where "schemaname" = 'public';
+    """
+
     COUNT_ALL_SQL_TEMPLATE = """
         select count(*), {max_pk_value_sql} from "{table_name}";
     """
 
+    COUNT_TABLE_RECORDS_SQL_TEMPLATE = """
+        select count(*) from "{table_name}";
+    """
+
+    ESTIMATED_TABLES_COUNTS_SQL_TEMPLATE = """
+        select
+            c.relname,
+            greatest(c.reltuples::bigint, coalesce(s.n_live_tup, 0))
+        from pg_class c
+        left join pg_stat_user_tables s on s.relid = c.oid
+        where c.oid in (
+            select to_regclass(quote_ident(table_name))
+            from unnest($1::text[]) table_name
+        );
+    """
+
+    MAX_PK_SQL_TEMPLATE = """
+        select "{primary_key_name}"
+        from "{table_name}"
+        where "{primary_key_name}" is not null
+        order by "{primary_key_name}" desc
+        limit 1;
+    """
+
     TRANSFER_SQL_TEMPLATE = """
         insert into "public"."{table_name}" ({selection_params_commas})
         select {selection_params_commas}
         from "tmp_src_schema"."{table_name}" 
+        where {pk_condition_sql};"""
+
+    COPY_SELECT_RECORDS_SQL_TEMPLATE = """
+        select {selection_params_commas}
+        from "{src_schema}"."{table_name}"
         where {pk_condition_sql}
-        returning "{primary_key}";"""
+    """
+
+    KEY_TABLE_HIERARCHY_VALUES_SQL_TEMPLATE = """
+        with recursive ancestors("{primary_key_name}", "{hierarchy_column_name}") as (
+            select k."{primary_key_name}", k."{hierarchy_column_name}"
+            from "{key_table_name}" k
+            where k."{primary_key_name}" = any($1::{data_type}[])
+
+            union
+
+            select k."{primary_key_name}", k."{hierarchy_column_name}"
+            from "{key_table_name}" k
+            join ancestors a on k."{primary_key_name}" = a."{hierarchy_column_name}"
+        ),
+        descendants("{primary_key_name}") as (
+            select k."{primary_key_name}"
+            from "{key_table_name}" k
+            where k."{primary_key_name}" = any($1::{data_type}[]) and $2::boolean
+
+            union
+
+            select k."{primary_key_name}"
+            from "{key_table_name}" k
+            join descendants d on k."{hierarchy_column_name}" = d."{primary_key_name}"
+        )
+        select "{primary_key_name}" from ancestors
+        union
+        select "{primary_key_name}" from descendants;
+    """
+
+    TABLE_VERSION_SQL_TEMPLATE = """
+        select max(xmin::text::bigint), count(*) from "{table_name}";
+    """
+
+    GENERIC_TABLE_PKS_BY_PAIRS_SQL_TEMPLATE = """
+        select t."{primary_key_name}"
+        from "{table_name}" t
+        join unnest(
+            $1::{content_type_id_data_type}[],
+            $2::{object_id_data_type}[]
+        ) as p("content_type_id", "object_id") on (
+            t."{content_type_id_name}" = p."content_type_id" and
+            t."{object_id_name}" = p."object_id"
+        ) {where_conditions};
+    """
+
+    GENERIC_TABLE_PKS_WITHOUT_OBJECT_SQL_TEMPLATE = """
+        select t."{primary_key_name}"
+        from "{table_name}" t
+        where t."{content_type_id_name}" = any($1::{content_type_id_data_type}[])
+            and t."{object_id_name}" isnull{key_column_condition};
+    """
+
+    CREATE_SLICE_SCHEMA_SQL_TEMPLATE = """
+        create schema "{schema}";
+    """
+
+    DROP_SLICE_SCHEMA_SQL_TEMPLATE = """
+        drop schema if exists "{schema}" cascade;
+    """
+
+    CREATE_SLICE_TABLE_SQL_TEMPLATE = """
+        create unlogged table "{schema}"."{table_name}" (
+            "id" {data_type} primary key,
+            "round" integer not null
+        );
+    """
+
+    INSERT_SLICE_SEEDS_SQL_TEMPLATE = """
+        insert into "{schema}"."{table_name}" ("id", "round")
+        select "{primary_key_name}", 0
+        from "public"."{table_name}"
+        {where_conditions}
+        on conflict do nothing;
+    """
+
+    INSERT_SLICE_DIRECT_EDGE_SQL_TEMPLATE = """
+        insert into "{schema}"."{constraint_table_name}" ("id", "round")
+        select t."{column_name}", $3::integer
+        from "public"."{table_name}" t
+        join "{schema}"."{table_name}" s on s."id" = t."{primary_key_name}"
+        where s."round" between $1 and $2 and t."{column_name}" is not null
+        on conflict do nothing;
+    """
+
+    INSERT_SLICE_REVERT_EDGE_SQL_TEMPLATE = """
+        with found as (
+            select r."{revert_primary_key_name}" as "id"
+            from "public"."{revert_table_name}" r
+            join "{schema}"."{table_name}" s on s."id" = r."{revert_column_name}"
+            where s."round" between $1 and $2
+        ),
+        inserted as (
+            insert into "{schema}"."{revert_table_name}" ("id", "round")
+            select "id", $3::integer
+            from found
+            on conflict do nothing
+            returning 1
+        )
+        select (select count(*) from found), (select count(*) from inserted);
+    """
+
+    SELECT_SLICE_PKS_SQL_TEMPLATE = """
+        select "id" from "{schema}"."{table_name}";
+    """
 
     CONTENT_TYPE_TABLE_SQL_TEMPLATE = """
         select "table_name", "app_label", "model"
@@ -325,6 +572,37 @@ class SQLRepository:
         """
         return cls.ENABLE_TRIGGERS_SQL_TEMPLATE
 
+    @classmethod
+    def get_bulk_load_session_sql(
+        cls,
+        maintenance_work_mem: str = '',
+    ):
+        """
+        Запрос настройки сессии для массовой загрузки данных. Триггеры, в том
+        числе проверки внешних ключей, не срабатывают только в этой сессии
+        """
+        return cls.BULK_LOAD_SESSION_SQL_TEMPLATE.format(
+            maintenance_work_mem_sql=(
+                f"set maintenance_work_mem = '{maintenance_work_mem}';" if
+                maintenance_work_mem else
+                ''
+            ),
+        )
+
+    @classmethod
+    def get_set_table_logging_sql(
+        cls,
+        table_name: str,
+        is_logged: bool,
+    ):
+        """
+        Запрос переключения журналирования таблицы
+        """
+        return cls.SET_TABLE_LOGGING_SQL_TEMPLATE.format(
+            table_name=table_name,
+            logging='logged' if is_logged else 'unlogged',
+        )
+
     @classmethod
     def get_serial_sequence_sql(
         cls,
@@ -356,10 +634,15 @@ class SQLRepository:
         primary_key_values: Iterable[Union[int, str]] = (),
         where_conditions_columns: Optional[Dict[str, Set[Union[int, str]]]] = None,  # noqa
         is_revert=False,
+        is_parametrized=False,
     ) -> list:
         """
         Метод получения запроса получения идентификаторов таблицы с указанием
         условий
+
+        При is_parametrized=True возвращается список пар из текста запроса
+        и списка параметров, наборы идентификаторов в которых передаются
+        типизированными массивами
         """
         if LOG_LEVEL == LogLevelEnum.DEBUG:
             logger.debug(
@@ -384,129 +667,280 @@ class SQLRepository:
                     del v_list
                     del condition_str
 
-        where_conditions_combinations = []
+        # условия колонок в виде пар из колонки и ее идентификаторов, если
+        # идентификаторов нет, то вместо них передается None
+        where_conditions = []
 
         if where_conditions_columns:
-            where_conditions = []
-
             for c_name, c_ids in where_conditions_columns.items():
                 if c_name in KEY_COLUMN_NAMES:
                     continue
 
                 condition_column = await table.get_column_by_name(c_name)
 
-                if c_ids:
-                    if is_revert:
-                        w_cond_tmpl = "{c_name} in ({c_ids})"
-                    else:
-                        w_cond_tmpl = (
-                            "({c_name} in ({c_ids}) or {c_name} isnull)"
-                        )
-
-                    ids_chunks = make_chunks(
-                        iterable=c_ids,
-                        size=cls.CHUNK_SIZE,
-                        is_list=True,
-                    )
+                where_conditions.append(
+                    (condition_column, list(c_ids) if c_ids else None)
+                )
 
-                    tmp_where_conditions = []
-                    for ids_chunk in ids_chunks:
-                        ids_str = cls._get_ids_str_by_column_type(
-                            column=condition_column,
-                            ids=ids_chunk,
-                        )
-
-                        if ids_str:
-                            tmp_where_conditions.append(
-                                w_cond_tmpl.format(
-                                    c_name=c_name,
-                                    c_ids=ids_str,
-                                )
-                            )
-
-                    where_conditions.append(tmp_where_conditions)
-                else:
-                    where_conditions.append([f"{c_name} isnull"])
-
-            if where_conditions:
-                # необходимо скомбинировать все условия следующему алгоритму:
-                # выделяются все списки условий, длина которых == 1, из тех
-                # списков, у которых длина более 1, нужно составлять комбинации
-                # после того, как комбинации будут составлены к ним нужно
-                # добросить одиночные условия
-
-                single_conditions = list(
-                    filter(lambda cond: len(cond) == 1, where_conditions)
+        where_conditions_chunks = cls._get_where_conditions_chunks(
+            where_conditions=where_conditions,
+        )
+
+        sql_result_list = []
+        for where_conditions_chunk in where_conditions_chunks:
+            if is_parametrized:
+                sql_result = cls._select_table_column_values_part_parametrized_sql(  # noqa
+                    table=table,
+                    column=column,
+                    key_column_values=key_column_values,
+                    primary_key_values=primary_key_values,
+                    where_conditions=where_conditions_chunk,
+                    is_revert=is_revert,
+                )
+            else:
+                sql_result = cls._select_table_column_values_part_sql(
+                    table=table,
+                    column=column,
+                    key_column_values=key_column_values,
+                    primary_key_values=primary_key_values,
+                    where_conditions=cls._get_literal_where_conditions(
+                        where_conditions=where_conditions_chunk,
+                        is_revert=is_revert,
+                    ),
                 )
 
-                single_conditions_values = [
-                    cond[0] for cond in single_conditions
-                ]
+            if sql_result:
+                sql_result_list.append(sql_result)
 
-                if len(single_conditions) == len(where_conditions):
-                    where_conditions_combinations.append(
-                        single_conditions_values
-                    )
-                else:
-                    multiple_conditions = list(
-                        filter(lambda cond: len(cond) > 1, where_conditions)
-                    )
+        del where_conditions[:]
 
-                    for index, cond_list in enumerate(multiple_conditions):
-                        if index == 0:
-                            where_conditions_combinations = [
-                                [cond] for cond in cond_list
-                            ]
-                            continue
+        return sql_result_list
 
-                        where_cond_copy = copy.deepcopy(
-                            where_conditions_combinations
-                        )
-                        for idx, c in enumerate(cond_list):
-                            if idx == 0:
-                                for w_c in where_conditions_combinations:
-                                    w_c.append(c)
-                                continue
+    @classmethod
+    def _get_where_conditions_chunks(
+        cls,
+        where_conditions: List[Tuple[Any, Optional[List[Union[int, str]]]]],
+    ) -> Iterable[List[Tuple[Any, Optional[List[Union[int, str]]]]]]:
+        """
+        Разбиение условий на части по колонке с наибольшим количеством
+        идентификаторов. Идентификаторы остальных колонок передаются целиком,
+        поэтому количество запросов растет линейно от количества
+        идентификаторов, а не как произведение количеств частей колонок
+        """
+        if not where_conditions:
+            return [[]]
 
-                            wcc2 = copy.deepcopy(where_cond_copy)
-                            for w_c in wcc2:
-                                w_c.append(c)
+        driving_index = max(
+            range(len(where_conditions)),
+            key=lambda index: len(where_conditions[index][1] or ()),
+        )
+        driving_column, driving_ids = where_conditions[driving_index]
+
+        if not driving_ids:
+            return [where_conditions]
+
+        return (
+            [
+                *where_conditions[:driving_index],
+                (driving_column, ids_chunk),
+                *where_conditions[driving_index + 1:],
+            ]
+            for ids_chunk in make_chunks(
+                iterable=driving_ids,
+                size=cls.CHUNK_SIZE,
+                is_list=True,
+            )
+        )
 
-                            where_conditions_combinations.extend(wcc2)
+    @classmethod
+    def is_literal_lookup_bounded(
+        cls,
+        primary_key_values: Iterable[Union[int, str]] = (),
+        where_conditions_columns: Optional[Dict[str, Iterable[Union[int, str]]]] = None,  # noqa
+    ) -> bool:
+        """
+        Проверка, что при перечислении идентификаторов в запросе ни один
+        набор, передаваемый целиком, не превышает размера части. На части
+        делится только наибольший набор колонок условий, идентификаторы
+        первичного ключа и остальных колонок встраиваются в каждый запрос
+        """
+        ids_counts = sorted(
+            (
+                len(c_ids)
+                for c_name, c_ids in (where_conditions_columns or {}).items()
+                if c_name not in KEY_COLUMN_NAMES and c_ids
+            ),
+            reverse=True,
+        )
 
-                    del multiple_conditions[:]
+        inlined_ids_counts = [len(primary_key_values or ()), *ids_counts[1:]]
 
-                    for comb in where_conditions_combinations:
-                        comb.extend(single_conditions_values)
+        return max(inlined_ids_counts) <= cls.CHUNK_SIZE
 
-            del where_conditions[:]
+    @classmethod
+    def _get_literal_where_conditions(
+        cls,
+        where_conditions: Iterable[Tuple[Any, Optional[List[Union[int, str]]]]],
+        is_revert=False,
+    ) -> List[str]:
+        """
+        Формирование условий с перечислением идентификаторов из вариантов
+        условий колонок
+        """
+        if is_revert:
+            w_cond_tmpl = "{c_name} in ({c_ids})"
+        else:
+            w_cond_tmpl = "({c_name} in ({c_ids}) or {c_name} isnull)"
 
-        sql_result_list = []
-        if where_conditions_combinations:
-            for where_conditions in where_conditions_combinations:
-                sql_result = cls._select_table_column_values_part_sql(
-                    table=table,
-                    column=column,
-                    key_column_values=key_column_values,
-                    primary_key_values=primary_key_values,
-                    where_conditions=where_conditions,
+        literal_where_conditions = []
+
+        for condition_column, ids_chunk in where_conditions:
+            if ids_chunk:
+                literal_where_conditions.append(
+                    w_cond_tmpl.format(
+                        c_name=condition_column.name,
+                        c_ids=cls._get_ids_str_by_column_type(
+                            column=condition_column,
+                            ids=ids_chunk,
+                        ),
+                    )
                 )
-                if sql_result:
-                    sql_result_list.append(sql_result)
-        else:
-            sql_result = cls._select_table_column_values_part_sql(
+            else:
+                literal_where_conditions.append(
+                    f"{condition_column.name} isnull"
+                )
+
+        return literal_where_conditions
+
+    @classmethod
+    def _select_table_column_values_part_parametrized_sql(
+        cls,
+        table,
+        column,
+        key_column_values: Set[int],
+        primary_key_values: Iterable[Union[int, str]] = (),
+        where_conditions: Iterable[Tuple[Any, Optional[List[Union[int, str]]]]] = (),  # noqa
+        is_revert=False,
+    ) -> Tuple[str, List[List[Union[int, str]]]]:
+        """
+        Формирование параметризованного запроса и его параметров. Текст
+        запроса зависит только от формы условий, поэтому переиспользуется
+        для всех частей идентификаторов
+        """
+        parameters = []
+        conditions_shape = []
+
+        for condition_column, ids_chunk in where_conditions:
+            conditions_shape.append(
+                (
+                    condition_column.name,
+                    condition_column.data_type,
+                    bool(ids_chunk),
+                )
+            )
+
+            if ids_chunk:
+                parameters.append(list(ids_chunk))
+
+        with_primary_key = bool(primary_key_values)
+        if with_primary_key:
+            parameters.append(list(primary_key_values))
+
+        with_key_column = bool(table.with_key_column and key_column_values)
+        if with_key_column:
+            parameters.append(list(key_column_values))
+
+        statement_key = (
+            table.name,
+            column.name,
+            tuple(conditions_shape),
+            with_primary_key,
+            with_key_column,
+            is_revert,
+        )
+
+        result_sql = cls.statements_registry.get(
+            key=statement_key,
+            builder=lambda: cls._build_table_column_values_parametrized_sql(
                 table=table,
                 column=column,
-                key_column_values=key_column_values,
-                primary_key_values=primary_key_values,
+                conditions_shape=conditions_shape,
+                with_primary_key=with_primary_key,
+                with_key_column=with_key_column,
+                is_revert=is_revert,
+            ),
+        )
+
+        return result_sql, parameters
+
+    @classmethod
+    def _build_table_column_values_parametrized_sql(
+        cls,
+        table,
+        column,
+        conditions_shape: Iterable[Tuple[str, str, bool]],
+        with_primary_key: bool,
+        with_key_column: bool,
+        is_revert=False,
+    ) -> str:
+        """
+        Построение текста параметризованного запроса получения
+        идентификаторов таблицы по форме условий
+        """
+        where_conditions = []
+        parameter_number = 0
+
+        for c_name, data_type, with_ids in conditions_shape:
+            if with_ids:
+                parameter_number += 1
+
+                condition_sql = cls.ARRAY_CONDITION_SQL_TEMPLATE.format(
+                    column_name=c_name,
+                    parameter_number=parameter_number,
+                    data_type=data_type,
+                )
+
+                if not is_revert:
+                    condition_sql = f'({condition_sql} or "{c_name}" isnull)'
+            else:
+                condition_sql = f'"{c_name}" isnull'
+
+            where_conditions.append(condition_sql)
+
+        if with_primary_key:
+            parameter_number += 1
+
+            where_conditions.append(
+                cls.ARRAY_CONDITION_SQL_TEMPLATE.format(
+                    column_name=table.primary_key.name,
+                    parameter_number=parameter_number,
+                    data_type=table.primary_key.data_type,
+                )
             )
 
-            if sql_result:
-                sql_result_list.append(sql_result)
+        if with_key_column:
+            parameter_number += 1
+
+            key_column = table.key_column
+            key_column_condition_sql = cls.ARRAY_CONDITION_SQL_TEMPLATE.format(
+                column_name=key_column.name,
+                parameter_number=parameter_number,
+                data_type=key_column.data_type,
+            )
 
-        del where_conditions_combinations[:]
+            where_conditions.append(
+                f'({key_column_condition_sql} or "{key_column.name}" isnull)'
+            )
 
-        return sql_result_list
+        where_conditions_str = ""
+        if where_conditions:
+            where_conditions_str = f'where {" and ".join(where_conditions)}'
+
+        return cls.SELECT_TABLE_COLUMN_VALUES_TEMPLATE.format(
+            constraint_column_name=column.name,
+            table_name=table.name,
+            where_conditions=where_conditions_str,
+        )
 
     @classmethod
     def _select_table_column_values_part_sql(
@@ -549,23 +983,18 @@ class SQLRepository:
             else:
                 where_conditions_str = pk_condition_sql
 
-        if table.with_key_column:
-            key_column = table.key_column
-
-            logger.debug(f"find key_column - {key_column.name}")
+        key_column_ids_sql = cls._get_key_column_condition_sql(
+            table=table,
+            key_column_values=key_column_values,
+        )
 
-            if key_column_values:
-                key_column_ids_sql = (
-                    f"{key_column.name} in ({make_str_from_iterable(key_column_values)}) or "
-                    f"{key_column.name} isnull"
+        if key_column_ids_sql:
+            if where_conditions_str:
+                where_conditions_str = " ".join(
+                    [where_conditions_str, "and", key_column_ids_sql]
                 )
-
-                if where_conditions_str:
-                    where_conditions_str = " ".join(
-                        [where_conditions_str, "and", key_column_ids_sql]
-                    )
-                else:
-                    where_conditions_str = key_column_ids_sql
+            else:
+                where_conditions_str = key_column_ids_sql
 
         if where_conditions_str:
             where_conditions_str = f"where {where_conditions_str}"
@@ -586,6 +1015,165 @@ class SQLRepository:
 
         return result_sql
 
+    @staticmethod
+    def _get_key_column_condition_sql(
+        table,
+        key_column_values: Set[int],
+    ) -> Optional[str]:
+        """
+        Возвращает условие фильтрации записей таблицы по ключевой колонке
+        """
+        if table.with_key_column and key_column_values:
+            key_column = table.key_column
+
+            logger.debug(f"find key_column - {key_column.name}")
+
+            return (
+                f"({key_column.name} in ({make_str_from_iterable(key_column_values)}) or "
+                f"{key_column.name} isnull)"
+            )
+
+    @classmethod
+    def get_create_temp_ids_table_sql(
+        cls,
+        temp_table_name: str,
+        column,
+    ):
+        """
+        Запрос создания временной таблицы для идентификаторов, удаляемой по
+        окончании транзакции
+        """
+        return cls.CREATE_TEMP_IDS_TABLE_SQL_TEMPLATE.format(
+            temp_table_name=temp_table_name,
+            data_type=column.data_type,
+        )
+
+    @classmethod
+    def get_analyze_table_sql(
+        cls,
+        table_name: str,
+    ):
+        return cls.ANALYZE_TABLE_SQL_TEMPLATE.format(
+            table_name=table_name,
+        )
+
+    @classmethod
+    def get_table_column_values_by_temp_tables_sql(
+        cls,
+        table,
+        column,
+        key_column_values: Set[int],
+        primary_key_temp_table_name: Optional[str] = None,
+        where_conditions_temp_tables: Optional[Dict[str, Optional[str]]] = None,  # noqa
+        is_revert=False,
+    ) -> str:
+        """
+        Метод получения запроса получения идентификаторов таблицы, где наборы
+        идентификаторов условий предварительно скопированы во временные
+        таблицы. Для колонки условия без идентификаторов вместо имени
+        временной таблицы передается None
+        """
+        where_conditions = []
+
+        for c_name, temp_table_name in (where_conditions_temp_tables or {}).items():  # noqa
+            if temp_table_name:
+                condition_sql = cls.TEMP_IDS_TABLE_CONDITION_SQL_TEMPLATE.format(
+                    column_name=c_name,
+                    temp_table_name=temp_table_name,
+                )
+
+                if not is_revert:
+                    condition_sql = f'({condition_sql} or "{c_name}" isnull)'
+            else:
+                condition_sql = f'"{c_name}" isnull'
+
+            where_conditions.append(condition_sql)
+
+        if primary_key_temp_table_name:
+            where_conditions.append(
+                cls.TEMP_IDS_TABLE_CONDITION_SQL_TEMPLATE.format(
+                    column_name=table.primary_key.name,
+                    temp_table_name=primary_key_temp_table_name,
+                )
+            )
+
+        key_column_ids_sql = cls._get_key_column_condition_sql(
+            table=table,
+            key_column_values=key_column_values,
+        )
+
+        if key_column_ids_sql:
+            where_conditions.append(key_column_ids_sql)
+
+        where_conditions_str = ""
+        if where_conditions:
+            where_conditions_str = f'where {" and ".join(where_conditions)}'
+
+        result_sql = cls.SELECT_TABLE_COLUMN_VALUES_TEMPLATE.format(
+            constraint_column_name=column.name,
+            table_name=table.name,
+            where_conditions=where_conditions_str,
+        )
+
+        logger.debug(result_sql)
+
+        return result_sql
+
+    @classmethod
+    def get_table_column_values_full_scan_sql(
+        cls,
+        table,
+        column,
+        key_column_values: Set[int],
+        filter_columns_names: Iterable[str] = (),
+        null_columns_names: Iterable[str] = (),
+    ) -> str:
+        """
+        Метод получения запроса получения значений колонки таблицы вместе со
+        значениями колонок фильтрации. Фильтрация по наборам идентификаторов
+        производится на стороне клиента, на стороне сервера остаются только
+        условия без идентификаторов и условие ключевой колонки
+        """
+        columns_names = ", ".join(
+            f'"{c_name}"'
+            for c_name in (column.name, *filter_columns_names)
+        )
+
+        where_conditions = [
+            f'"{c_name}" isnull'
+            for c_name in null_columns_names
+        ]
+
+        key_column_ids_sql = cls._get_key_column_condition_sql(
+            table=table,
+            key_column_values=key_column_values,
+        )
+
+        if key_column_ids_sql:
+            where_conditions.append(key_column_ids_sql)
+
+        where_conditions_str = ""
+        if where_conditions:
+            where_conditions_str = f'where {" and ".join(where_conditions)}'
+
+        result_sql = cls.SELECT_TABLE_COLUMNS_VALUES_TEMPLATE.format(
+            columns_names=columns_names,
+            table_name=table.name,
+            where_conditions=where_conditions_str,
+        )
+
+        logger.debug(result_sql)
+
+        return result_sql
+
+    @classmethod
+    def get_select_indexed_columns_sql(cls):
+        """
+        Запрос получения таблиц и колонок, являющихся первыми колонками
+        индексов
+        """
+        return cls.SELECT_INDEXED_COLUMNS_SQL_TEMPLATE
+
     @staticmethod
     def _get_ids_str_by_column_type(
         column,
@@ -622,32 +1210,124 @@ class SQLRepository:
             max_pk_value_sql=max_pk_value_sql,
         )
 
+    @classmethod
+    def get_sampled_table_column_values_sql(
+        cls,
+        table,
+        column,
+        key_column_values: Set[int],
+        sample_percent: int = 0,
+        rows_limit: int = 0,
+    ) -> str:
+        """
+        Запрос получения выборки значений колонки таблицы. Записи выбираются
+        при помощи TABLESAMPLE с постоянным зерном и ограничиваются
+        количеством с сортировкой по колонке, поэтому выборка повторяема
+        """
+        table_sample = ''
+        if 0 < sample_percent < 100:
+            table_sample = (
+                f'tablesample bernoulli ({sample_percent}) repeatable (0)'
+            )
+
+        key_column_ids_sql = cls._get_key_column_condition_sql(
+            table=table,
+            key_column_values=key_column_values,
+        )
+
+        result_sql = cls.SELECT_SAMPLED_TABLE_COLUMN_VALUES_SQL_TEMPLATE.format(  # noqa
+            column_name=column.name,
+            table_name=table.name,
+            table_sample=table_sample,
+            where_conditions=(
+                f'where {key_column_ids_sql}' if key_column_ids_sql else ''
+            ),
+            limit=f'limit {rows_limit}' if rows_limit > 0 else '',
+        )
+
+        logger.debug(result_sql)
+
+        return result_sql
+
+    @classmethod
+    def get_current_lsn_sql(cls):
+        """
+        Запрос получения текущей позиции журнала предзаписи базы данных
+        """
+        return cls.CURRENT_LSN_SQL_TEMPLATE
+
+    @classmethod
+    def get_explain_sql(
+        cls,
+        sql: str,
+    ):
+        """
+        Запрос получения плана выполнения запроса в формате JSON без его
+        выполнения
+        """
+        return cls.EXPLAIN_SQL_TEMPLATE.format(
+            sql=sql.strip().rstrip(';'),
+        )
+
+    @classmethod
+    def get_columns_statistics_sql(cls):
+        """
+        Запрос получения средней ширины и количества различных значений
+        колонок таблиц из статистики
+        """
+        return cls.COLUMNS_STATISTICS_SQL_TEMPLATE
+
+    @classmethod
+    def get_count_table_records_sql(
+        cls,
+        table_name: str,
+    ):
+        """
+        Exact count of table records
+        """
+        return cls.COUNT_TABLE_RECORDS_SQL_TEMPLATE.format(
+            table_name=table_name,
+        )
+
+    @classmethod
+    def get_estimated_tables_counts_sql(cls):
+        """
+        Estimated counts of tables records by catalog statistics. Names of
+        tables are passed by first parameter
+        """
+        return cls.ESTIMATED_TABLES_COUNTS_SQL_TEMPLATE
+
+    @classmethod
+    def get_max_pk_sql(
+        cls,
+        primary_key,
+    ):
+        """
+        Max value of primary key, received by index backward scan
+        """
+        return cls.MAX_PK_SQL_TEMPLATE.format(
+            table_name=primary_key.table_name,
+            primary_key_name=primary_key.name,
+        )
+
     @classmethod
     def get_transfer_records_sql(
         cls,
         table,
         connection_params_str,
-        primary_key_ids,
     ):
         """
-        Формирование запроса на импорт данных
+        Формирование запроса на импорт данных. Идентификаторы переносимых
+        записей передаются первым параметром запроса в виде массива
         """
         logger.debug(
             f"get transfer records sql \n table name - {table.name}"
         )
 
-        if table.primary_key.data_type in ["integer"]:
-            primary_key_ids_str = ', '.join(
-                map(str, primary_key_ids)
-            )
-        else:
-            primary_key_ids_str = ', '.join(
-                map(lambda pk: f'\'{pk}\'', primary_key_ids)
-            )
-
-        pk_condition_sql = (
-            f'"tmp_src_schema"."{table.name}"."{table.primary_key.name}" in '
-            f'({primary_key_ids_str})'
+        pk_condition_sql = cls.ARRAY_CONDITION_SQL_TEMPLATE.format(
+            column_name=table.primary_key.name,
+            parameter_number=1,
+            data_type=table.primary_key.data_type,
         )
 
         transfer_sql = cls.TRANSFER_SQL_TEMPLATE.format(
@@ -657,12 +1337,190 @@ class SQLRepository:
             selection_params_with_types=(
                 table.get_columns_list_with_types_str_commas()
             ),
-            primary_key=table.primary_key.name,
-            pk_condition_sql=pk_condition_sql,
+            pk_condition_sql=f'"tmp_src_schema"."{table.name}".{pk_condition_sql}',
         )
 
         return transfer_sql
 
+    @classmethod
+    def get_key_table_hierarchy_values_sql(
+        cls,
+        key_table_name: str,
+        primary_key,
+        hierarchy_column_name: str,
+    ):
+        """
+        Возвращает параметризованный sql получения идентификаторов предков и,
+        при необходимости, потомков записей ключевой таблицы одним
+        рекурсивным запросом. Идентификаторы записей передаются массивом
+        первым параметром, признак получения потомков - вторым
+        """
+        return cls.KEY_TABLE_HIERARCHY_VALUES_SQL_TEMPLATE.format(
+            key_table_name=key_table_name,
+            primary_key_name=primary_key.name,
+            hierarchy_column_name=hierarchy_column_name,
+            data_type=primary_key.data_type,
+        )
+
+    @classmethod
+    def get_table_version_sql(
+        cls,
+        table_name: str,
+    ):
+        """
+        Возвращает sql получения максимального номера транзакции, изменившей
+        записи таблицы, и количества записей. Используется для определения
+        изменения таблицы
+        """
+        return cls.TABLE_VERSION_SQL_TEMPLATE.format(
+            table_name=table_name,
+        )
+
+    @classmethod
+    def get_copy_select_records_sql(
+        cls,
+        table,
+        src_schema: str,
+    ):
+        """
+        Формирование запроса выборки переносимых записей из базы-донора для
+        COPY. Идентификаторы записей передаются первым параметром запроса в
+        виде массива
+        """
+        pk_condition_sql = cls.ARRAY_CONDITION_SQL_TEMPLATE.format(
+            column_name=table.primary_key.name,
+            parameter_number=1,
+            data_type=table.primary_key.data_type,
+        )
+
+        return cls.COPY_SELECT_RECORDS_SQL_TEMPLATE.format(
+            selection_params_commas=table.get_columns_list_str_commas(),
+            src_schema=src_schema,
+            table_name=table.name,
+            pk_condition_sql=pk_condition_sql,
+        )
+
+    @classmethod
+    def get_create_slice_schema_sql(
+        cls,
+        schema: str,
+    ):
+        """
+        Возвращает sql создания схемы таблиц среза запуска в базе-доноре
+        """
+        return cls.CREATE_SLICE_SCHEMA_SQL_TEMPLATE.format(
+            schema=schema,
+        )
+
+    @classmethod
+    def get_drop_slice_schema_sql(
+        cls,
+        schema: str,
+    ):
+        """
+        Возвращает sql удаления схемы таблиц среза
+        """
+        return cls.DROP_SLICE_SCHEMA_SQL_TEMPLATE.format(
+            schema=schema,
+        )
+
+    @classmethod
+    def get_create_slice_table_sql(
+        cls,
+        schema: str,
+        table,
+    ):
+        """
+        Возвращает sql создания нежурналируемой таблицы среза, хранящей
+        идентификаторы записей таблицы и номер раунда их добавления
+        """
+        return cls.CREATE_SLICE_TABLE_SQL_TEMPLATE.format(
+            schema=schema,
+            table_name=table.name,
+            data_type=table.primary_key.data_type,
+        )
+
+    @classmethod
+    def get_insert_slice_seeds_sql(
+        cls,
+        schema: str,
+        table,
+        key_column_values: Set[int],
+    ):
+        """
+        Возвращает sql добавления в срез начальных записей таблицы с ключевой
+        колонкой
+        """
+        key_column_ids_sql = cls._get_key_column_condition_sql(
+            table=table,
+            key_column_values=key_column_values,
+        )
+
+        return cls.INSERT_SLICE_SEEDS_SQL_TEMPLATE.format(
+            schema=schema,
+            table_name=table.name,
+            primary_key_name=table.primary_key.name,
+            where_conditions=(
+                f'where {key_column_ids_sql}' if key_column_ids_sql else ''
+            ),
+        )
+
+    @classmethod
+    def get_insert_slice_direct_edge_sql(
+        cls,
+        schema: str,
+        table,
+        column,
+    ):
+        """
+        Возвращает sql добавления в срез записей внешней таблицы, на которые
+        ссылаются записи среза таблицы. Границы раундов записей среза и
+        номер текущего раунда передаются параметрами
+        """
+        return cls.INSERT_SLICE_DIRECT_EDGE_SQL_TEMPLATE.format(
+            schema=schema,
+            table_name=table.name,
+            primary_key_name=table.primary_key.name,
+            column_name=column.name,
+            constraint_table_name=column.constraint_table.name,
+        )
+
+    @classmethod
+    def get_insert_slice_revert_edge_sql(
+        cls,
+        schema: str,
+        table,
+        revert_table,
+        revert_column,
+    ):
+        """
+        Возвращает sql добавления в срез записей таблицы, ссылающихся на
+        записи среза таблицы. Возвращает количество найденных и добавленных
+        записей. Границы раундов записей среза и номер текущего раунда
+        передаются параметрами
+        """
+        return cls.INSERT_SLICE_REVERT_EDGE_SQL_TEMPLATE.format(
+            schema=schema,
+            table_name=table.name,
+            revert_table_name=revert_table.name,
+            revert_primary_key_name=revert_table.primary_key.name,
+            revert_column_name=revert_column.name,
+        )
+
+    @classmethod
+    def get_select_slice_pks_sql(
+        cls,
+        schema: str,
+        table,
+    ):
+        """
+        Возвращает sql получения идентификаторов записей среза таблицы
+        """
+        return cls.SELECT_SLICE_PKS_SQL_TEMPLATE.format(
+            schema=schema,
+            table_name=table.name,
+        )
+
     @classmethod
     def get_content_type_table_sql(cls):
         """
@@ -671,6 +1529,64 @@ class SQLRepository:
         """
         return cls.CONTENT_TYPE_TABLE_SQL_TEMPLATE
 
+    @classmethod
+    def get_generic_table_pks_without_object_sql(
+        cls,
+        table,
+        content_type_id_column,
+        object_id_column,
+        key_column_values: Set[int],
+    ) -> str:
+        """
+        Возвращает параметризованный запрос получения идентификаторов записей
+        таблицы с generic key без object_id по массиву content_type_id
+        """
+        key_column_ids_sql = cls._get_key_column_condition_sql(
+            table=table,
+            key_column_values=key_column_values,
+        )
+
+        return cls.GENERIC_TABLE_PKS_WITHOUT_OBJECT_SQL_TEMPLATE.format(
+            primary_key_name=table.primary_key.name,
+            table_name=table.name,
+            content_type_id_name=content_type_id_column.name,
+            content_type_id_data_type=content_type_id_column.data_type,
+            object_id_name=object_id_column.name,
+            key_column_condition=(
+                f' and {key_column_ids_sql}' if key_column_ids_sql else ''
+            ),
+        )
+
+    @classmethod
+    def get_generic_table_pks_by_pairs_sql(
+        cls,
+        table,
+        content_type_id_column,
+        object_id_column,
+        key_column_values: Set[int],
+    ) -> str:
+        """
+        Возвращает параметризованный запрос получения идентификаторов записей
+        таблицы с generic key по парам content_type_id и object_id,
+        передаваемым двумя массивами одинаковой длины
+        """
+        key_column_ids_sql = cls._get_key_column_condition_sql(
+            table=table,
+            key_column_values=key_column_values,
+        )
+
+        return cls.GENERIC_TABLE_PKS_BY_PAIRS_SQL_TEMPLATE.format(
+            primary_key_name=table.primary_key.name,
+            table_name=table.name,
+            content_type_id_name=content_type_id_column.name,
+            content_type_id_data_type=content_type_id_column.data_type,
+            object_id_name=object_id_column.name,
+            object_id_data_type=object_id_column.data_type,
+            where_conditions=(
+                f'where {key_column_ids_sql}' if key_column_ids_sql else ''
+            ),
+        )
+
     @classmethod
     def get_content_type_sql(cls):
         """
@@ -0,0 +1,429 @@
+import asyncio
+import time
+from contextlib import (
+    asynccontextmanager,
+)
+from heapq import (
+    heappop,
+    heappush,
+)
+from itertools import (
+    count,
+)
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from databaser.core.helpers import (
+    logger,
+)
+
+
+class TaskScheduler:
+    """
+    Планировщик задач с ограничением количества одновременно выполняемых
+    задач
+
+    Задачи, ожидающие освобождения слота, выполняются в порядке приоритета.
+    Приоритет - кортеж, меньшие значения которого выполняются раньше
+
+    Количество задач, созданных map на всех уровнях вложенности, ограничено
+    TASKS_LIMIT_RATIO лимитами. При достижении ограничения вложенный map
+    выполняет корутины в своей задаче по одной, поэтому количество
+    созданных задач и удерживаемых ими частей идентификаторов не растет с
+    глубиной вложенности
+    """
+
+    # Отношение ограничения количества созданных map задач к лимиту
+    TASKS_LIMIT_RATIO = 2
+
+    def __init__(
+        self,
+        limit: int,
+    ):
+        self._limit = max(limit, 1)
+        self._in_flight = 0
+        self._waiters: List[Tuple[tuple, int, asyncio.Future]] = []
+        self._counter = count()
+        # Количество незавершенных задач, созданных map
+        self._tasks_count = 0
+
+        self.submitted_count = 0
+        self.waited_count = 0
+        self.max_queue_depth = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def _acquire(
+        self,
+        priority: tuple,
+    ):
+        """
+        Получение слота выполнения задачи
+        """
+        self.submitted_count += 1
+
+        if self._in_flight < self._limit and not self._waiters:
+            self._in_flight += 1
+
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heappush(self._waiters, (priority, next(self._counter), future))
+
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+
+        started = time.monotonic()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # если слот уже был передан задаче, то его нужно освободить
+            if future.done() and not future.cancelled():
+                self._release()
+
+            raise
+
+        wait_time = time.monotonic() - started
+
+        self.waited_count += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def _release(self):
+        """
+        Освобождение слота. Слот передается ожидающей задаче с наивысшим
+        приоритетом
+        """
+        while self._waiters:
+            _, _, future = heappop(self._waiters)
+
+            if not future.done():
+                future.set_result(None)
+
+                return
+
+        self._in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: tuple = (),
+    ):
+        """
+        Контекстный менеджер выполнения задачи в слоте планировщика
+        """
+        await self._acquire(priority)
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _on_task_done(
+        self,
+        task: asyncio.Task,
+    ):
+        self._tasks_count -= 1
+
+    @staticmethod
+    async def _run_inline(
+        coroutine: Awaitable,
+    ):
+        """
+        Выполнение корутины в текущей задаче. Как и у задач map, ошибка
+        корутины не прерывает выполнение остальных корутин
+        """
+        try:
+            await coroutine
+        except Exception:
+            logger.exception('error of coroutine executed by map')
+
+    async def map(
+        self,
+        coroutines: Iterable[Awaitable],
+        window: Optional[int] = None,
+    ):
+        """
+        Выполнение корутин с ограничением количества одновременно созданных
+        задач. Корутины берутся из итерируемого объекта по мере освобождения
+        места, поэтому ожидающие части данных не удерживаются в памяти.
+        При достижении общего ограничения задач корутины выполняются в
+        текущей задаче
+        """
+        window = window or self._limit
+        pending = set()
+
+        for coroutine in coroutines:
+            if len(pending) >= window:
+                _, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+            if self._tasks_count >= self._limit * self.TASKS_LIMIT_RATIO:
+                await self._run_inline(coroutine)
+
+                continue
+
+            task = asyncio.create_task(coroutine)
+            task.add_done_callback(self._on_task_done)
+
+            self._tasks_count += 1
+
+            pending.add(task)
+
+        if pending:
+            await asyncio.wait(pending)
+
+    def get_statistic(self) -> Dict[str, Union[int, float]]:
+        """
+        Показатели работы планировщика
+        """
+        return {
+            'limit': self._limit,
+            'tasks': self._tasks_count,
+            'submitted': self.submitted_count,
+            'waited': self.waited_count,
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'total_wait_time': round(self.total_wait_time, 3),
+            'avg_wait_time': round(
+                self.total_wait_time / self.waited_count
+                if self.waited_count else
+                0,
+                3,
+            ),
+            'max_wait_time': round(self.max_wait_time, 3),
+        }
+
+
+class WorkItemsScheduler:
+    """
+    Планировщик элементов работы, выполняемых фиксированным количеством
+    исполнителей
+
+    Элементы работы - части данных групп (например, части идентификаторов
+    таблиц). Каждый освободившийся исполнитель берет следующую часть группы
+    с наибольшей оставшейся оценкой стоимости, поэтому крупные группы
+    начинают обрабатываться первыми и обрабатываются параллельно, а в конце
+    не остается одной долго обрабатываемой группы
+
+    Группы могут добавляться во время работы исполнителей. Исполнители
+    ожидают новые группы, пока планировщик не закрыт
+    """
+
+    def __init__(
+        self,
+        workers_count: int,
+        process: Callable[[Hashable, Any], Awaitable],
+        on_group_finished: Optional[Callable[[Hashable], Any]] = None,
+    ):
+        self._workers_count = max(workers_count, 1)
+        self._process = process
+        self._on_group_finished = on_group_finished
+
+        # Куча групп по убыванию оставшейся стоимости
+        self._groups: List[Tuple[float, int, Hashable]] = []
+        self._counter = count()
+
+        self._chunks: Dict[Hashable, Iterator] = {}
+        self._chunks_counts: Dict[Hashable, int] = {}
+        self._chunk_costs: Dict[Hashable, float] = {}
+        # Количество обрабатываемых частей группы
+        self._in_flight: Dict[Hashable, int] = {}
+
+        # Событие добавления групп или закрытия планировщика
+        self._changed = asyncio.Event()
+        self._is_closed = False
+
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+        self.workers_busy_times: List[float] = [0.0] * self._workers_count
+        self.workers_items_counts: List[int] = [0] * self._workers_count
+
+    def add(
+        self,
+        group: Hashable,
+        chunks: Iterable,
+        chunks_count: int,
+        chunk_cost: float,
+    ):
+        """
+        Добавление группы с частями данных и оценкой стоимости одной части
+        """
+        if not chunks_count:
+            return
+
+        self._chunks[group] = iter(chunks)
+        self._chunks_counts[group] = chunks_count
+        self._chunk_costs[group] = chunk_cost
+        self._in_flight[group] = 0
+
+        heappush(
+            self._groups,
+            (-chunks_count * chunk_cost, next(self._counter), group),
+        )
+
+        self._changed.set()
+
+    def close(self):
+        """
+        Закрытие планировщика. После обработки добавленных групп исполнители
+        завершаются
+        """
+        self._is_closed = True
+        self._changed.set()
+
+    def _take(self) -> Optional[Tuple[Hashable, Any]]:
+        """
+        Получение следующей части группы с наибольшей оставшейся стоимостью
+        """
+        while self._groups:
+            _, _, group = heappop(self._groups)
+
+            chunk = next(self._chunks[group], None)
+
+            if chunk is None:
+                # части закончились раньше оценки их количества
+                self._chunks_counts[group] = 0
+                self._check_group_finished(group)
+
+                continue
+
+            self._chunks_counts[group] -= 1
+            self._in_flight[group] += 1
+
+            if self._chunks_counts[group] > 0:
+                heappush(
+                    self._groups,
+                    (
+                        -self._chunks_counts[group] * self._chunk_costs[group],
+                        next(self._counter),
+                        group,
+                    ),
+                )
+
+            return group, chunk
+
+    def _check_group_finished(
+        self,
+        group: Hashable,
+    ):
+        if (
+            not self._in_flight[group] and
+            self._chunks_counts[group] <= 0 and
+            self._on_group_finished is not None
+        ):
+            self._on_group_finished(group)
+
+    async def _work(
+        self,
+        worker_index: int,
+    ):
+        """
+        Исполнитель, обрабатывающий части, пока они есть или пока
+        планировщик не закрыт
+        """
+        while True:
+            item = self._take()
+
+            if item is None:
+                if self._is_closed:
+                    break
+
+                self._changed.clear()
+                await self._changed.wait()
+
+                continue
+
+            group, chunk = item
+
+            started = time.monotonic()
+
+            try:
+                await self._process(group, chunk)
+            finally:
+                self.workers_busy_times[worker_index] += (
+                    time.monotonic() - started
+                )
+                self.workers_items_counts[worker_index] += 1
+
+            del chunk
+
+            self._in_flight[group] -= 1
+            self._check_group_finished(group)
+
+    async def run(self):
+        """
+        Обработка всех частей до закрытия планировщика. При ошибке обработки
+        части остальные исполнители останавливаются
+        """
+        self._started = time.monotonic()
+
+        workers = [
+            asyncio.create_task(self._work(worker_index))
+            for worker_index in range(self._workers_count)
+        ]
+
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+
+            raise
+        finally:
+            self._finished = time.monotonic()
+
+    def get_statistic(self) -> Dict[str, Union[int, float, List[float]]]:
+        """
+        Показатели работы планировщика. Загрузка исполнителя - доля времени
+        работы планировщика, в течение которой исполнитель обрабатывал части
+        """
+        total_time = (
+            (self._finished or time.monotonic()) - self._started
+            if self._started is not None else
+            0
+        )
+
+        utilizations = [
+            round(busy_time / total_time, 3) if total_time else 0
+            for busy_time in self.workers_busy_times
+        ]
+
+        return {
+            'workers': self._workers_count,
+            'items': sum(self.workers_items_counts),
+            'total_time': round(total_time, 3),
+            'avg_utilization': round(
+                sum(utilizations) / len(utilizations),
+                3,
+            ),
+            'min_utilization': min(utilizations),
+            'workers_utilizations': utilizations,
+            'workers_items': list(self.workers_items_counts),
+        }
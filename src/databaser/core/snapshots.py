@@ -0,0 +1,261 @@
+import json
+import os
+from datetime import (
+    datetime,
+)
+from hashlib import (
+    blake2b,
+)
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+
+from databaser.core.db_entities import (
+    DBTable,
+    DstDatabase,
+)
+from databaser.core.helpers import (
+    logger,
+)
+from databaser.core.storages import (
+    ArrayPKStorage,
+    BasePKStorage,
+    SetPKStorage,
+)
+
+
+def get_schema_fingerprint(
+    dst_database: DstDatabase,
+) -> str:
+    """
+    Fingerprint of structure of destination database tables, which is used
+    for checking compatibility of snapshot with database
+    """
+    digest = blake2b(digest_size=16)
+
+    for table_name in sorted(dst_database.tables.keys()):
+        table = dst_database.tables[table_name]
+
+        digest.update(f'{table_name}\x00'.encode())
+
+        for column_name in sorted(table.columns.keys()):
+            column = table.columns[column_name]
+
+            digest.update(
+                '\x00'.join(
+                    (
+                        column.name,
+                        column.data_type,
+                        ','.join(sorted(column.constraint_type)),
+                        getattr(column.constraint_table, 'name', ''),
+                    )
+                ).encode()
+            )
+
+    return digest.hexdigest()
+
+
+class PKSnapshot:
+    """
+    Snapshot of collected tables records identifiers stored in directory
+
+    Identifiers of every table are stored in separate file. Integer
+    identifiers are stored in .npy-files as sorted int64 arrays, which are
+    memory-mapped on loading, other identifiers are stored in JSON-files.
+    Manifest contains key values, schema fingerprint, LSN of source database
+    at the beginning of collecting and tables counters
+    """
+
+    MANIFEST_FILE_NAME = 'manifest.json'
+    VERSION = 1
+
+    def __init__(
+        self,
+        directory: str,
+    ):
+        self._directory = directory
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self._directory, self.MANIFEST_FILE_NAME)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def _save_table(
+        self,
+        table: DBTable,
+    ) -> Dict[str, Any]:
+        """
+        Saving identifiers of table to file. File is written to temporary
+        file and renamed, so memory-mapped identifiers of replaced snapshot
+        remain valid
+        """
+        pks = table.need_transfer_pks
+
+        if isinstance(pks, ArrayPKStorage):
+            file_name = f'{table.name}.npy'
+        else:
+            file_name = f'{table.name}.json'
+
+        file_path = os.path.join(self._directory, file_name)
+        tmp_file_path = f'{file_path}.tmp'
+
+        if isinstance(pks, ArrayPKStorage):
+            with open(tmp_file_path, 'wb') as pks_file:
+                np.save(pks_file, pks.array)
+        else:
+            with open(tmp_file_path, 'w') as pks_file:
+                json.dump(list(pks), pks_file, default=str)
+
+        os.replace(tmp_file_path, file_path)
+
+        return {
+            'file': file_name,
+            'count': len(pks),
+            'full_count': table.full_count,
+            'max_pk': table.max_pk,
+        }
+
+    def _load_table_pks(
+        self,
+        table_manifest: Dict[str, Any],
+    ) -> BasePKStorage:
+        """
+        Loading identifiers of table from file
+        """
+        file_path = os.path.join(self._directory, table_manifest['file'])
+
+        if file_path.endswith('.npy'):
+            pks: BasePKStorage = ArrayPKStorage.from_sorted_array(
+                np.load(file_path, mmap_mode='r')
+            )
+        else:
+            with open(file_path) as pks_file:
+                pks = SetPKStorage(json.load(pks_file))
+
+        return pks
+
+    def save(
+        self,
+        dst_database: DstDatabase,
+        key_column_values: Set[int],
+        source_lsn: Optional[str],
+    ):
+        """
+        Saving identifiers of all tables with manifest. Manifest is written
+        last, so partially saved snapshot is not loaded
+        """
+        logger.info(f'start saving snapshot to "{self._directory}"..')
+
+        os.makedirs(self._directory, exist_ok=True)
+
+        if self.exists():
+            os.remove(self.manifest_path)
+
+        tables_manifests = {
+            table.name: self._save_table(table)
+            for table in dst_database.tables.values() if
+            table.need_transfer_pks
+        }
+
+        manifest = {
+            'version': self.VERSION,
+            'created': datetime.now().isoformat(),
+            'key_column_values': sorted(key_column_values),
+            'schema_fingerprint': get_schema_fingerprint(dst_database),
+            'source_lsn': source_lsn,
+            'tables': tables_manifests,
+        }
+
+        tmp_manifest_path = f'{self.manifest_path}.tmp'
+
+        with open(tmp_manifest_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+        os.replace(tmp_manifest_path, self.manifest_path)
+
+        logger.info(
+            f'snapshot of {len(tables_manifests)} tables saved, source lsn - '
+            f'{source_lsn}'
+        )
+
+    def load_manifest(self) -> Dict[str, Any]:
+        with open(self.manifest_path) as manifest_file:
+            return json.load(manifest_file)
+
+    def _load_checked_manifest(
+        self,
+        dst_database: DstDatabase,
+    ) -> Dict[str, Any]:
+        """
+        Loading manifest with checking its compatibility with database
+        """
+        logger.info(f'start loading snapshot from "{self._directory}"..')
+
+        manifest = self.load_manifest()
+
+        if manifest['version'] != self.VERSION:
+            raise ValueError(
+                f'Unsupported snapshot version "{manifest["version"]}"!'
+            )
+
+        if manifest['schema_fingerprint'] != get_schema_fingerprint(dst_database):  # noqa
+            raise ValueError(
+                'Snapshot is made for database with another structure!'
+            )
+
+        return manifest
+
+    def load(
+        self,
+        dst_database: DstDatabase,
+    ) -> Dict[str, Any]:
+        """
+        Loading identifiers of tables from snapshot. Snapshot must be made
+        for database with the same structure
+        """
+        manifest = self._load_checked_manifest(dst_database)
+
+        for table_name, table_manifest in manifest['tables'].items():
+            table = dst_database.tables[table_name]
+
+            table.need_transfer_pks = self._load_table_pks(table_manifest)
+            table.full_count = table_manifest['full_count']
+            table.max_pk = table_manifest['max_pk']
+            table.is_ready_for_transferring = True
+
+        logger.info(
+            f'snapshot of {len(manifest["tables"])} tables loaded, created - '
+            f'{manifest["created"]}, source lsn - {manifest["source_lsn"]}'
+        )
+
+        return manifest
+
+    def load_tables_pks(
+        self,
+        dst_database: DstDatabase,
+    ) -> Tuple[Dict[str, Any], Dict[str, BasePKStorage]]:
+        """
+        Loading manifest and identifiers of tables from snapshot without
+        changing of tables. Used for getting already transferred identifiers
+        """
+        manifest = self._load_checked_manifest(dst_database)
+
+        tables_pks = {
+            table_name: self._load_table_pks(table_manifest)
+            for table_name, table_manifest in manifest['tables'].items()
+        }
+
+        logger.info(
+            f'pks of {len(tables_pks)} tables loaded from snapshot, created - '
+            f'{manifest["created"]}, source lsn - {manifest["source_lsn"]}'
+        )
+
+        return manifest, tables_pks
@@ -0,0 +1,514 @@
+import os
+import shutil
+import tempfile
+from abc import (
+    ABCMeta,
+    abstractmethod,
+)
+from collections import (
+    OrderedDict,
+)
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Union,
+)
+
+import numpy as np
+
+from databaser.core.enums import (
+    DataTypesEnum,
+)
+from databaser.core.helpers import (
+    logger,
+    make_chunks,
+)
+
+if TYPE_CHECKING:
+    from databaser.core.db_entities import (
+        DBColumn,
+    )
+
+
+class BasePKStorage(metaclass=ABCMeta):
+    """
+    Base class of storages of tables records identifiers
+    """
+
+    # Size of parts for iterating by storage identifiers
+    ITERATION_CHUNK_SIZE = 65536
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} @count="{len(self)}">'
+
+    def __str__(self):
+        return self.__repr__()
+
+    @property
+    @abstractmethod
+    def memory_size(self) -> int:
+        """
+        Approximate size of identifiers resident in memory in bytes
+        """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Count of unique identifiers
+        """
+
+    @abstractmethod
+    def __bool__(self) -> bool:
+        """
+        Storage contains identifiers
+        """
+
+    @abstractmethod
+    def __contains__(self, pk: Union[int, str]) -> bool:
+        """
+        Membership check of identifier
+        """
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Union[int, str]]:
+        """
+        Iterating by identifiers
+        """
+
+    @abstractmethod
+    def update(
+        self,
+        pks: Iterable[Union[int, str]],
+    ):
+        """
+        Union of storage with identifiers
+        """
+
+    @abstractmethod
+    def missing(
+        self,
+        pks: Iterable[Union[int, str]],
+    ) -> 'BasePKStorage':
+        """
+        Return new storage with identifiers of pks, which are absent in the
+        storage
+        """
+
+    @abstractmethod
+    def difference(
+        self,
+        pks: Iterable[Union[int, str]],
+    ) -> 'BasePKStorage':
+        """
+        Return new storage with identifiers of the storage, which are absent
+        in pks
+        """
+
+    @abstractmethod
+    def chunks(
+        self,
+        size: int,
+    ) -> Iterator[List[Union[int, str]]]:
+        """
+        Iterating by lists of identifiers with specified size
+        """
+
+
+class SetPKStorage(BasePKStorage):
+    """
+    Storage of identifiers based on Python set. Used for text, uuid and other
+    not integer primary keys
+    """
+
+    __slots__ = (
+        '_pks',
+    )
+
+    # Approximate size of one identifier with set entry in bytes
+    ITEM_SIZE = 80
+
+    def __init__(
+        self,
+        pks: Iterable[Union[int, str]] = (),
+    ):
+        self._pks: Set[Union[int, str]] = set(pks)
+
+    @property
+    def memory_size(self):
+        return len(self._pks) * self.ITEM_SIZE
+
+    def __len__(self):
+        return len(self._pks)
+
+    def __bool__(self):
+        return bool(self._pks)
+
+    def __contains__(self, pk):
+        return pk in self._pks
+
+    def __iter__(self):
+        return iter(self._pks)
+
+    def update(self, pks):
+        self._pks.update(pks)
+
+    def missing(self, pks):
+        return SetPKStorage(
+            pk
+            for pk in pks if
+            pk not in self._pks
+        )
+
+    def difference(self, pks):
+        return SetPKStorage(self._pks.difference(pks))
+
+    def chunks(self, size):
+        return make_chunks(
+            iterable=self._pks,
+            size=size,
+            is_list=True,
+        )
+
+
+class ArrayPKStorage(BasePKStorage):
+    """
+    Storage of integer identifiers based on sorted NumPy int64 array
+
+    Added identifiers are accumulated in pending parts and merged into sorted
+    array when pending parts are large enough or when storage is read.
+    Sorted array can be spilled to run file on disk, then it is merged back
+    on demand, and iterating by chunks reads memory-mapped run file
+    """
+
+    __slots__ = (
+        '_array',
+        '_pending',
+        '_pending_count',
+        '_run_path',
+        '_run_count',
+    )
+
+    # Minimal count of pending identifiers for merging
+    MERGE_THRESHOLD = 1000000
+
+    def __init__(
+        self,
+        pks: Iterable[int] = (),
+    ):
+        self._array: np.ndarray = np.empty(0, dtype=np.int64)
+        self._pending: List[np.ndarray] = []
+        self._pending_count = 0
+
+        # Run file of spilled sorted array and count of its identifiers
+        self._run_path: Optional[str] = None
+        self._run_count = 0
+
+        self.update(pks)
+
+    @classmethod
+    def from_sorted_array(
+        cls,
+        array: np.ndarray,
+    ) -> 'ArrayPKStorage':
+        """
+        Creating storage from sorted array of unique identifiers without
+        copying
+        """
+        storage = cls()
+        storage._array = array
+
+        return storage
+
+    @staticmethod
+    def to_array(
+        pks: Iterable[int],
+    ) -> np.ndarray:
+        """
+        Converting identifiers to int64 array
+        """
+        if isinstance(pks, ArrayPKStorage):
+            array = pks.array
+        elif isinstance(pks, np.ndarray):
+            array = pks.astype(np.int64, copy=False)
+        else:
+            array = np.fromiter(pks, dtype=np.int64)
+
+        return array
+
+    @staticmethod
+    def _isin_sorted(
+        values: np.ndarray,
+        sorted_array: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Vectorized membership mask of values in sorted array
+        """
+        if not sorted_array.size:
+            return np.zeros(values.size, dtype=bool)
+
+        indexes = np.searchsorted(sorted_array, values)
+        indexes[indexes == sorted_array.size] = 0
+
+        return sorted_array[indexes] == values
+
+    @property
+    def is_spilled(self) -> bool:
+        """
+        Sorted array is spilled to run file
+        """
+        return self._run_path is not None
+
+    def _load_run(self):
+        """
+        Loading spilled sorted array back to memory and removing run file
+        """
+        if self._run_path is not None:
+            self._array = np.load(self._run_path)
+
+            os.remove(self._run_path)
+
+            self._run_path = None
+            self._run_count = 0
+
+    def _merge(self):
+        """
+        Merging pending parts into sorted array
+        """
+        self._load_run()
+
+        if self._pending:
+            self._array = np.unique(
+                np.concatenate([self._array, *self._pending])
+            )
+            self._pending = []
+            self._pending_count = 0
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        Sorted array of unique identifiers
+        """
+        self._merge()
+
+        return self._array
+
+    @property
+    def memory_size(self):
+        size = self._pending_count
+
+        # memory-mapped arrays are not resident and are evicted by OS
+        if not isinstance(self._array, np.memmap):
+            size += self._array.size
+
+        return size * self._array.itemsize
+
+    def spill(
+        self,
+        path: str,
+    ):
+        """
+        Spilling sorted array to run file. Path of run file must be unique,
+        because chunks of previous run file can be read yet
+        """
+        array = self.array
+
+        if not array.size or isinstance(array, np.memmap):
+            return
+
+        np.save(path, array)
+
+        self._array = np.empty(0, dtype=np.int64)
+        self._run_path = path
+        self._run_count = array.size
+
+    def __len__(self):
+        if self._run_path is not None and not self._pending_count:
+            return self._run_count
+
+        return self.array.size
+
+    def __bool__(self):
+        return bool(
+            self._array.size or
+            self._pending_count or
+            self._run_count
+        )
+
+    def __contains__(self, pk):
+        return bool(
+            self._isin_sorted(
+                np.array([pk], dtype=np.int64),
+                self.array,
+            )[0]
+        )
+
+    def __iter__(self):
+        for chunk in self.chunks(self.ITERATION_CHUNK_SIZE):
+            yield from chunk
+
+    def update(self, pks):
+        array = self.to_array(pks)
+
+        if array.size:
+            self._pending.append(array)
+            self._pending_count += array.size
+
+            if self._pending_count >= max(self.MERGE_THRESHOLD, self._array.size):  # noqa
+                self._merge()
+
+    def missing(self, pks):
+        array = np.unique(self.to_array(pks))
+
+        return ArrayPKStorage.from_sorted_array(
+            array[~self._isin_sorted(array, self.array)]
+        )
+
+    def difference(self, pks):
+        array = self.array
+
+        return ArrayPKStorage.from_sorted_array(
+            array[~self._isin_sorted(array, np.unique(self.to_array(pks)))]
+        )
+
+    def chunks(self, size):
+        if self._run_path is not None and not self._pending_count:
+            # run file is removed only after loading, mapped file remains
+            # readable after removing
+            array = np.load(self._run_path, mmap_mode='r')
+        else:
+            array = self.array
+
+        for index in range(0, array.size, size):
+            yield array[index:index + size].tolist()
+
+
+class PKStoragesSpiller:
+    """
+    Keeper of memory budget of tables identifiers storages
+
+    Storages are registered on every access and are ordered by recency of
+    access. When total size of resident identifiers exceeds memory limit,
+    storages of least recently accessed tables are spilled to sorted run
+    files in temporary directory. Spilled storages are merged back on demand
+    """
+
+    # Count of accesses between checks of memory budget
+    CHECK_INTERVAL = 100
+
+    def __init__(
+        self,
+        memory_limit: int,
+        directory: Optional[str] = None,
+    ):
+        self._memory_limit = memory_limit
+        self._directory = tempfile.mkdtemp(
+            prefix='databaser_pks_',
+            dir=directory or None,
+        )
+
+        self._storages: OrderedDict = OrderedDict()
+        self._accesses_count = 0
+        self._runs_count = 0
+
+        self.spills = 0
+        self.spilled_size = 0
+
+    def touch(
+        self,
+        name: str,
+        storage: BasePKStorage,
+    ):
+        """
+        Registration of access to storage of table
+        """
+        self._storages[name] = storage
+        self._storages.move_to_end(name)
+
+        self._accesses_count += 1
+
+        if not self._accesses_count % self.CHECK_INTERVAL:
+            self.check()
+
+    def check(self):
+        """
+        Spilling of storages of least recently accessed tables until memory
+        budget is kept. Storage of most recently accessed table is not
+        spilled
+        """
+        sizes = {
+            name: storage.memory_size
+            for name, storage in self._storages.items()
+        }
+        total_size = sum(sizes.values())
+
+        if total_size <= self._memory_limit:
+            return
+
+        for name in list(self._storages.keys())[:-1]:
+            if total_size <= self._memory_limit:
+                break
+
+            storage = self._storages[name]
+
+            if not isinstance(storage, ArrayPKStorage) or not sizes[name]:
+                continue
+
+            self._runs_count += 1
+
+            storage.spill(
+                os.path.join(self._directory, f'{self._runs_count}.npy')
+            )
+
+            total_size -= sizes[name]
+
+            self.spills += 1
+            self.spilled_size += sizes[name]
+
+            logger.debug(
+                f'pks of table "{name}" spilled, size - {sizes[name]}'
+            )
+
+    def get_statistic(self) -> Dict[str, int]:
+        """
+        Indicators of spiller work
+        """
+        return {
+            'memory_limit': self._memory_limit,
+            'memory_size': sum(
+                storage.memory_size
+                for storage in self._storages.values()
+            ),
+            'storages': len(self._storages),
+            'spilled_storages': sum(
+                isinstance(storage, ArrayPKStorage) and storage.is_spilled
+                for storage in self._storages.values()
+            ),
+            'spills': self.spills,
+            'spilled_size': self.spilled_size,
+        }
+
+    def clear(self):
+        """
+        Removing directory of run files
+        """
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+
+def make_pk_storage(
+    column: Optional['DBColumn'] = None,
+    pks: Iterable[Union[int, str]] = (),
+) -> BasePKStorage:
+    """
+    Creating storage of identifiers of column values by column data type
+    """
+    if column is not None and column.data_type in DataTypesEnum.NUMERAL:
+        storage = ArrayPKStorage(pks)
+    else:
+        storage = SetPKStorage(pks)
+
+    return storage
@@ -1,11 +1,17 @@
 import asyncio
+from math import (
+    ceil,
+)
 from typing import (
+    AsyncIterator,
     List,
+    Optional,
     Set,
     Union,
 )
 
 from asyncpg import (
+    InvalidBinaryRepresentationError,
     NotNullViolationError,
     NumericValueOutOfRangeError,
     PostgresError,
@@ -20,10 +26,11 @@ from databaser.core.db_entities import (
 )
 from databaser.core.enums import (
     StagesEnum,
+    TransferStrategiesEnum,
 )
 from databaser.core.helpers import (
+    get_status_rows_count,
     logger,
-    make_chunks,
 )
 from databaser.core.loggers import (
     StatisticManager,
@@ -32,6 +39,15 @@ from databaser.core.loggers import (
 from databaser.core.repositories import (
     SQLRepository,
 )
+from databaser.core.schedulers import (
+    WorkItemsScheduler,
+)
+from databaser.settings import (
+    COPY_TRANSFER_TABLES,
+    FDW_TRANSFER_TABLES,
+    TRANSFER_STRATEGY,
+    TRANSFER_WORKERS_COUNT,
+)
 
 
 class Transporter:
@@ -41,6 +57,10 @@ class Transporter:
     """
     CHUNK_SIZE = 70000
 
+    # Limit of count of data parts of binary COPY buffered between source
+    # and destination databases
+    COPY_BUFFER_SIZE = 64
+
     def __init__(
         self,
         dst_database: DstDatabase,
@@ -52,57 +72,215 @@ class Transporter:
         self._src_database = src_database
         self.key_column_ids = key_column_values
         self._structured_ent_ids = None
-        # словарь с названиями таблиц и идентификаторами импортированных записей
-        self._transfer_progress_dict = {}
         self.filling_tables = set()
         self._statistic_manager = statistic_manager
 
         self.content_type_table = {}
 
-    async def _transfer_table_data(self, table):
+        self._scheduler: Optional[WorkItemsScheduler] = None
+        self._scheduler_task: Optional[asyncio.Task] = None
+        # таблицы, переданные планировщику переноса
+        self._enqueued_tables: Set[DBTable] = set()
+
+    def _get_chunk_cost(
+        self,
+        table: DBTable,
+    ) -> float:
         """
-        Перенос данных таблицы
+        Estimated cost of transferring of table records chunk, proportional
+        to count of records and count of columns
         """
+        return (
+            min(len(table.need_transfer_pks), self.CHUNK_SIZE) *
+            max(len(table.columns), 1)
+        )
+
+    def _on_table_transferred(
+        self,
+        table: DBTable,
+    ):
         logger.info(
-            f"start transferring table \"{table.name}\", "
-            f"need to import - {len(table.need_transfer_pks)}"
+            f"finished transferring table \"{table.name}\""
         )
 
-        need_import_ids_chunks = make_chunks(
-            iterable=table.need_transfer_pks,
-            size=self.CHUNK_SIZE,
+    @staticmethod
+    def get_transfer_strategy(
+        table_name: str,
+    ) -> str:
+        """
+        Strategy of transferring of table records
+        """
+        if table_name in COPY_TRANSFER_TABLES:
+            strategy = TransferStrategiesEnum.COPY
+        elif table_name in FDW_TRANSFER_TABLES:
+            strategy = TransferStrategiesEnum.FDW
+        else:
+            strategy = TRANSFER_STRATEGY
+
+        return strategy
+
+    @staticmethod
+    def is_fdw_required() -> bool:
+        """
+        Records of some tables are transferred by FDW
+        """
+        return (
+            TRANSFER_STRATEGY == TransferStrategiesEnum.FDW or
+            bool(FDW_TRANSFER_TABLES)
         )
 
-        for need_import_ids_chunk in need_import_ids_chunks:
-            await self._transfer_chunk_table_data(
+    async def _transfer_chunk_table_data(
+        self,
+        table: DBTable,
+        need_import_ids_chunk: List[Union[int, str]],
+    ):
+        """
+        Порционный перенос данных таблицы в целевую БД выбранной для таблицы
+        стратегией
+        """
+        if self.get_transfer_strategy(table.name) == TransferStrategiesEnum.COPY:  # noqa
+            await self._copy_chunk_table_data(
+                table=table,
+                need_import_ids_chunk=need_import_ids_chunk,
+            )
+        else:
+            await self._insert_chunk_table_data(
                 table=table,
                 need_import_ids_chunk=need_import_ids_chunk,
             )
 
-        logger.info(
-            f"finished transferring table \"{table.name}\""
+    async def _read_copy_data(
+        self,
+        table: DBTable,
+        need_import_ids_chunk: List[Union[int, str]],
+        buffer: asyncio.Queue,
+    ):
+        """
+        Reading records of source database table by binary COPY into buffer.
+        End of data is marked by None. Error of reading is put into buffer,
+        so it is raised in destination COPY and its data is rolled back
+        """
+        copy_select_sql = SQLRepository.get_copy_select_records_sql(
+            table=table,
+            src_schema=self._src_database.db_connection_parameters.schema,
         )
 
-    async def _transfer_chunk_table_data(
+        try:
+            async with self._src_database.connection_pool.acquire() as connection:  # noqa
+                await connection.copy_from_query(
+                    copy_select_sql,
+                    list(need_import_ids_chunk),
+                    output=buffer.put,
+                    format='binary',
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await buffer.put(e)
+
+            return
+
+        await buffer.put(None)
+
+    @staticmethod
+    async def _iterate_copy_buffer(
+        buffer: asyncio.Queue,
+    ) -> AsyncIterator[bytes]:
+        while True:
+            data = await buffer.get()
+
+            if data is None:
+                break
+
+            if isinstance(data, Exception):
+                raise data
+
+            yield data
+
+    async def _copy_chunk_table_data(
         self,
         table: DBTable,
         need_import_ids_chunk: List[Union[int, str]],
     ):
         """
-        Порционный перенос данных таблицы в целевую БД
+        Порционный перенос данных таблицы в целевую БД по binary COPY.
+        Данные передаются из базы-донора в целевую БД через ограниченный
+        буфер без разбора записей
+        """
+        logger.info(f'copy chunk table data - "{table.name}"')
+
+        buffer = asyncio.Queue(maxsize=self.COPY_BUFFER_SIZE)
+
+        reader = asyncio.create_task(
+            self._read_copy_data(
+                table=table,
+                need_import_ids_chunk=need_import_ids_chunk,
+                buffer=buffer,
+            )
+        )
+
+        async with self._dst_database.connection_pool.acquire() as connection:
+            try:
+                status = await connection.copy_to_table(
+                    table.name,
+                    source=self._iterate_copy_buffer(buffer),
+                    columns=[
+                        column.name
+                        for column in sorted(
+                            table.columns.values(),
+                            key=lambda c: c.ordinal_position,
+                        )
+                    ],
+                    schema_name='public',
+                    format='binary',
+                )
+            except (
+                UndefinedColumnError,
+                NotNullViolationError,
+                PostgresSyntaxError,
+                NumericValueOutOfRangeError,
+                InvalidBinaryRepresentationError,
+            ) as e:
+                reader.cancel()
+
+                raise PostgresError(
+                    f'{str(e)}, table - {table.name} --- '
+                    f'_copy_chunk_table_data'
+                )
+            except BaseException:
+                reader.cancel()
+
+                raise
+
+        await reader
+
+        table.transferred_pks_count += get_status_rows_count(status)
+
+    async def _insert_chunk_table_data(
+        self,
+        table: DBTable,
+        need_import_ids_chunk: List[Union[int, str]],
+    ):
+        """
+        Порционный перенос данных таблицы в целевую БД через FDW
         """
         transfer_sql = SQLRepository.get_transfer_records_sql(
             table=table,
             connection_params_str=self._src_database.connection_str,
-            primary_key_ids=need_import_ids_chunk,
         )
 
         logger.info(f'transfer chunk table data - "{table.name}"')
 
-        transferred_ids = None
         async with self._dst_database.connection_pool.acquire() as connection:
             try:
-                transferred_ids = await connection.fetch(transfer_sql)
+                # количество перенесенных записей берется из статуса
+                # выполнения команды без получения идентификаторов
+                transferred_count = get_status_rows_count(
+                    await connection.execute(
+                        transfer_sql,
+                        list(need_import_ids_chunk),
+                    )
+                )
             except (
                 UndefinedColumnError,
                 NotNullViolationError,
@@ -114,30 +292,84 @@ class Transporter:
                     f'sql - {transfer_sql} --- _transfer_chunk_table_data'
                 )
 
-        if transferred_ids:
-            table.transferred_pks_count += len(transferred_ids)
+        table.transferred_pks_count += transferred_count
 
         del transfer_sql
-        del transferred_ids
 
-    async def _transfer_collecting_data(self):
+    def start(self):
         """
-        Физический импорт данных в целевую БД из БД-донора
+        Запуск исполнителей переноса. Таблицы переносятся по мере их
+        добавления в очередь, в том числе во время сбора идентификаторов
+
+        Части идентификаторов таблиц переносятся ограниченным количеством
+        исполнителей, начиная с таблиц с наибольшей оставшейся оценкой
+        стоимости переноса
         """
         logger.info("start transferring data to target db...")
 
-        need_imported_tables = filter(
-            lambda table: table.need_transfer_pks,
-            self._dst_database.tables.values(),
+        self._scheduler = WorkItemsScheduler(
+            workers_count=TRANSFER_WORKERS_COUNT,
+            process=self._transfer_chunk_table_data,
+            on_group_finished=self._on_table_transferred,
+        )
+        self._statistic_manager.register_scheduler(
+            name='transfer',
+            scheduler=self._scheduler,
+        )
+
+        self._scheduler_task = asyncio.create_task(self._scheduler.run())
+
+    def enqueue_table(
+        self,
+        table: DBTable,
+    ):
+        """
+        Добавление в очередь переноса таблицы, идентификаторы записей которой
+        больше не изменяются
+        """
+        if table in self._enqueued_tables or not table.need_transfer_pks:
+            return
+
+        self._enqueued_tables.add(table)
+
+        need_transfer_pks_count = len(table.need_transfer_pks)
+
+        logger.info(
+            f"table \"{table.name}\" need to import - "
+            f"{need_transfer_pks_count}"
         )
 
-        coroutines = [
-            self._transfer_table_data(table)
-            for table in need_imported_tables
-        ]
+        self._scheduler.add(
+            group=table,
+            chunks=table.need_transfer_pks.chunks(self.CHUNK_SIZE),
+            chunks_count=ceil(need_transfer_pks_count / self.CHUNK_SIZE),
+            chunk_cost=self._get_chunk_cost(table),
+        )
+
+    async def cancel(self):
+        """
+        Остановка исполнителей переноса, например, при ошибке сбора
+        идентификаторов
+        """
+        if self._scheduler_task is not None and not self._scheduler_task.done():  # noqa
+            self._scheduler_task.cancel()
 
-        if coroutines:
-            await asyncio.gather(*coroutines)
+            await asyncio.gather(self._scheduler_task, return_exceptions=True)
+
+    async def _transfer_collecting_data(self):
+        """
+        Физический импорт данных в целевую БД из БД-донора. Таблицы, не
+        добавленные в очередь во время сбора, добавляются в конце
+        """
+        if self._scheduler is None:
+            self.start()
+
+        for table in self._dst_database.tables.values():
+            self.enqueue_table(table)
+
+        self._scheduler.close()
+
+        await self._scheduler_task
 
         logger.info("finished transferring data to target db!")
 
@@ -157,13 +389,8 @@ class Transporter:
             self._statistic_manager,
             StagesEnum.TRANSFERRING_COLLECTED_DATA
         ):
-            await asyncio.wait(
-                [
-                    asyncio.create_task(
-                        self._transfer_collecting_data()
-                    ),
-                ]
-            )
+            # ошибки исполнителей переноса должны прерывать перенос
+            await self._transfer_collecting_data()
 
         async with statistic_indexer(
             self._statistic_manager,
@@ -1,7 +1,11 @@
 import logging
 
 from databaser.core.enums import (
+    ClosureEnginesEnum,
+    CountersModesEnum,
     LogLevelEnum,
+    LookupStrategiesEnum,
+    TransferStrategiesEnum,
 )
 from databaser.core.helpers import (
     add_file_handler_logger,
@@ -69,6 +73,12 @@ DST_DB_PASSWORD = get_str_environ_parameter(
     name='DATABASER_DST_DB_PASSWORD',
 )
 
+# Size of prepared statements cache of each connection of pools
+STATEMENT_CACHE_SIZE = get_int_environ_parameter(
+    name='DATABASER_STATEMENT_CACHE_SIZE',
+    default=1000,
+)
+
 # Test mode parameters
 TEST_MODE = get_bool_environ_parameter(
     name='DATABASER_TEST_MODE',
@@ -90,6 +100,9 @@ KEY_COLUMN_VALUES = get_iterable_environ_parameter(
 KEY_TABLE_HIERARCHY_COLUMN_NAME = get_str_environ_parameter(
     name='DATABASER_KEY_TABLE_HIERARCHY_COLUMN_NAME',
 )
+KEY_TABLE_HIERARCHY_WITH_DESCENDANTS = get_bool_environ_parameter(
+    name='DATABASER_KEY_TABLE_HIERARCHY_WITH_DESCENDANTS',
+)
 
 EXCLUDED_TABLES = get_extensible_iterable_environ_parameter(
     name='DATABASER_EXCLUDED_TABLES',
@@ -139,3 +152,165 @@ if not any(
 VALIDATE_DATA_BEFORE_TRANSFERRING = get_bool_environ_parameter(
     name='VALIDATE_DATA_BEFORE_TRANSFERRING',
 )
+
+# Transferring records params. Strategy of transferring can be changed for
+# tables by lists of tables transferred by COPY and by FDW
+TRANSFER_STRATEGY = get_str_environ_parameter(
+    name='DATABASER_TRANSFER_STRATEGY',
+    default=TransferStrategiesEnum.FDW,
+)
+
+if TRANSFER_STRATEGY not in TransferStrategiesEnum.values:
+    raise ValueError(f'Unknown transfer strategy "{TRANSFER_STRATEGY}"!')
+
+COPY_TRANSFER_TABLES = get_iterable_environ_parameter(
+    name='DATABASER_COPY_TRANSFER_TABLES',
+)
+FDW_TRANSFER_TABLES = get_iterable_environ_parameter(
+    name='DATABASER_FDW_TRANSFER_TABLES',
+)
+
+# Count of simultaneously transferring chunks of tables records
+TRANSFER_WORKERS_COUNT = get_int_environ_parameter(
+    name='DATABASER_TRANSFER_WORKERS_COUNT',
+    default=20,
+)
+
+# Transferring of tables with final records ids during collecting of other
+# tables. Generic tables are transferred after collecting
+IS_PIPELINED_TRANSFER = get_bool_environ_parameter(
+    name='DATABASER_IS_PIPELINED_TRANSFER',
+)
+
+# Bulk loading mode of destination database. Sessions of destination
+# database pool are set up with session_replication_role = replica instead
+# of global disabling of triggers, synchronous_commit = off and
+# maintenance_work_mem
+IS_BULK_LOAD_MODE = get_bool_environ_parameter(
+    name='DATABASER_IS_BULK_LOAD_MODE',
+)
+BULK_LOAD_MAINTENANCE_WORK_MEM = get_str_environ_parameter(
+    name='DATABASER_BULK_LOAD_MAINTENANCE_WORK_MEM',
+    default='1GB',
+)
+# Switching of destination database tables to unlogged for loading and back
+# to logged after transferring
+IS_UNLOGGED_TABLES_LOAD = get_bool_environ_parameter(
+    name='DATABASER_IS_UNLOGGED_TABLES_LOAD',
+)
+
+# Collecting records ids params
+LOOKUP_STRATEGY = get_str_environ_parameter(
+    name='DATABASER_LOOKUP_STRATEGY',
+    default=LookupStrategiesEnum.ARRAY,
+)
+
+if LOOKUP_STRATEGY not in LookupStrategiesEnum.values:
+    raise ValueError(f'Unknown lookup strategy "{LOOKUP_STRATEGY}"!')
+
+# Limit of simultaneously executing lookups of collectors
+COLLECTORS_CONCURRENCY_LIMIT = get_int_environ_parameter(
+    name='DATABASER_COLLECTORS_CONCURRENCY_LIMIT',
+    default=40,
+)
+
+# Limit of simultaneously preparing tables of one dependency level
+SORTED_TABLES_LEVEL_CONCURRENCY = get_int_environ_parameter(
+    name='DATABASER_SORTED_TABLES_LEVEL_CONCURRENCY',
+    default=10,
+)
+
+# Limit of count of identifiers stored in cache of lookups results. Zero
+# disables caching
+LOOKUPS_CACHE_SIZE = get_int_environ_parameter(
+    name='DATABASER_LOOKUPS_CACHE_SIZE',
+    default=5000000,
+)
+
+# Limit of memory of collected records identifiers in megabytes. When limit
+# is exceeded, identifiers of least recently used tables are spilled to
+# files in temporary directory. Zero disables spilling
+PKS_MEMORY_LIMIT = get_int_environ_parameter(
+    name='DATABASER_PKS_MEMORY_LIMIT',
+)
+
+# Engine of computing closure of records of tables with key column and
+# their siblings by foreign keys
+CLOSURE_ENGINE = get_str_environ_parameter(
+    name='DATABASER_CLOSURE_ENGINE',
+    default=ClosureEnginesEnum.CLIENT,
+)
+
+if CLOSURE_ENGINE not in ClosureEnginesEnum.values:
+    raise ValueError(f'Unknown closure engine "{CLOSURE_ENGINE}"!')
+
+# Mode of filling tables records counters
+COUNTERS_MODE = get_str_environ_parameter(
+    name='DATABASER_COUNTERS_MODE',
+    default=CountersModesEnum.EXACT,
+)
+
+if COUNTERS_MODE not in CountersModesEnum.values:
+    raise ValueError(f'Unknown counters mode "{COUNTERS_MODE}"!')
+
+# Dry run mode, which estimates size of data slice without collecting and
+# transferring of records
+IS_PLAN_MODE = get_bool_environ_parameter(
+    name='DATABASER_IS_PLAN_MODE',
+)
+
+# Sampling of initial records of tables for lightweight slices. Records are
+# sampled by TABLESAMPLE BERNOULLI with percent of records and limited by
+# count with ordering by primary key. Zero values disable sampling
+SAMPLE_PERCENT = get_int_environ_parameter(
+    name='DATABASER_SAMPLE_PERCENT',
+)
+SAMPLE_ROWS_LIMIT = get_int_environ_parameter(
+    name='DATABASER_SAMPLE_ROWS_LIMIT',
+)
+
+if not 0 <= SAMPLE_PERCENT <= 100:
+    raise ValueError('Sample percent must be between 0 and 100!')
+
+if CLOSURE_ENGINE == ClosureEnginesEnum.SERVER and (
+    SAMPLE_PERCENT or SAMPLE_ROWS_LIMIT
+):
+    raise ValueError('Sampling is not supported by server closure engine!')
+
+# Directory of files cache of results, which are reused by repeated runs.
+# Empty value disables files cache
+CACHE_DIRECTORY = get_str_environ_parameter(
+    name='DATABASER_CACHE_DIRECTORY',
+)
+
+# Directory of snapshot of collected records identifiers. If directory is
+# set, snapshot is saved after collecting
+SNAPSHOT_DIRECTORY = get_str_environ_parameter(
+    name='DATABASER_SNAPSHOT_DIRECTORY',
+)
+# Loading records identifiers from snapshot instead of collecting
+IS_LOAD_SNAPSHOT = get_bool_environ_parameter(
+    name='DATABASER_IS_LOAD_SNAPSHOT',
+)
+
+if IS_LOAD_SNAPSHOT and not SNAPSHOT_DIRECTORY:
+    raise ValueError('You must send snapshot directory for loading snapshot!')
+
+# Incremental mode, where records of new key values are added to existing
+# slice. Snapshot of existing slice is taken from snapshot directory and is
+# replaced by snapshot of extended slice, tables are not truncated
+IS_INCREMENTAL_MODE = get_bool_environ_parameter(
+    name='DATABASER_IS_INCREMENTAL_MODE',
+)
+
+if IS_INCREMENTAL_MODE and IS_LOAD_SNAPSHOT:
+    raise ValueError(
+        'Incremental mode and loading snapshot can not be used together!'
+    )
+
+# Collecting records of generic tables by one lookup of all pairs of
+# content types and objects ids
+IS_BATCHED_GENERIC_TABLES = get_bool_environ_parameter(
+    name='DATABASER_IS_BATCHED_GENERIC_TABLES',
+    default=True,
+)
@@ -1,7 +1,25 @@
+import argparse
+
 from databaser.core.managers import (
     DatabaserManager,
 )
 
 if __name__ == '__main__':
-    manager = DatabaserManager()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--plan',
+        action='store_true',
+        help='estimate size of data slice without collecting and transferring',
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='add records of new key values to existing slice from snapshot',
+    )
+    arguments = parser.parse_args()
+
+    manager = DatabaserManager(
+        is_plan_mode=arguments.plan,
+        is_incremental_mode=arguments.incremental,
+    )
     manager.manage()
@@ -0,0 +1,9 @@
+import os
+
+# настройки проверяют наличие параметров подключения при импорте, тестам
+# база данных не нужна
+os.environ.setdefault('DATABASER_SRC_DB_HOST', 'localhost')
+os.environ.setdefault('DATABASER_DST_DB_HOST', 'localhost')
+os.environ.setdefault('DATABASER_KEY_TABLE_NAME', 'key_table')
+os.environ.setdefault('DATABASER_KEY_COLUMN_NAMES', 'key_id')
+os.environ.setdefault('DATABASER_KEY_COLUMN_VALUES', '1')
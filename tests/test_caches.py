@@ -0,0 +1,138 @@
+from databaser.core.caches import (
+    FilesCache,
+    LookupsCache,
+)
+from databaser.core.storages import (
+    ArrayPKStorage,
+    SetPKStorage,
+)
+
+
+def test_fingerprint_does_not_depend_on_ids_order():
+    cache = LookupsCache(max_size=10)
+
+    fingerprint = cache.make_fingerprint(
+        table_name='table',
+        column_name='column',
+        primary_key_values=[3, 1, 2],
+        where_conditions_columns={'a': [2, 1], 'b': ['y', 'x']},
+    )
+
+    assert fingerprint == cache.make_fingerprint(
+        table_name='table',
+        column_name='column',
+        primary_key_values=ArrayPKStorage([1, 2, 3]),
+        where_conditions_columns={'b': SetPKStorage(['x', 'y']), 'a': [1, 2]},
+    )
+
+
+def test_fingerprint_distinguishes_lookups():
+    cache = LookupsCache(max_size=10)
+
+    fingerprint = cache.make_fingerprint('table', 'column', [1, 2])
+
+    assert fingerprint != cache.make_fingerprint('table', 'column', [1, 3])
+    assert fingerprint != cache.make_fingerprint('table', 'other', [1, 2])
+    assert fingerprint != cache.make_fingerprint(
+        'table', 'column', [1, 2], is_revert=True,
+    )
+    assert fingerprint != cache.make_fingerprint('table', 'column', ['1', '2'])
+    # разделитель исключает совпадение разных наборов строк
+    assert cache.make_fingerprint('table', 'column', ['ab', 'c']) != (
+        cache.make_fingerprint('table', 'column', ['a', 'bc'])
+    )
+
+
+def test_lookups_cache_evicts_least_recently_used():
+    cache = LookupsCache(max_size=4)
+
+    cache.set(b'first', ArrayPKStorage([1, 2]))
+    cache.set(b'second', ArrayPKStorage([3, 4]))
+
+    assert cache.get(b'first') is not None
+
+    cache.set(b'third', ArrayPKStorage([5]))
+
+    assert cache.get(b'second') is None
+    assert list(cache.get(b'first')) == [1, 2]
+    assert list(cache.get(b'third')) == [5]
+
+    statistic = cache.get_statistic()
+
+    assert statistic['size'] == 3
+    assert statistic['evictions'] == 1
+    assert statistic['hits'] == 3
+    assert statistic['misses'] == 1
+
+
+def test_lookups_cache_skips_too_large_results():
+    cache = LookupsCache(max_size=2)
+
+    cache.set(b'large', ArrayPKStorage([1, 2, 3]))
+
+    assert cache.get(b'large') is None
+
+
+def test_lookups_cache_keeps_empty_results_in_negative_cache(monkeypatch):
+    monkeypatch.setattr(LookupsCache, 'NEGATIVE_CACHE_SIZE', 1)
+
+    cache = LookupsCache(max_size=1)
+
+    cache.set(b'first', ArrayPKStorage())
+    cache.set(b'second', SetPKStorage())
+
+    assert cache.get(b'first') is None
+
+    result = cache.get(b'second')
+
+    assert result is not None
+    assert not result
+
+    statistic = cache.get_statistic()
+
+    assert statistic['size'] == 0
+    assert statistic['negative_results'] == 1
+    assert statistic['negative_hits'] == 1
+
+
+def test_lookups_cache_disabled():
+    cache = LookupsCache(max_size=0)
+
+    cache.set(b'first', ArrayPKStorage([1]))
+    cache.set(b'second', ArrayPKStorage())
+
+    assert not cache.is_enabled
+    assert cache.get(b'first') is None
+    assert cache.get(b'second') is None
+
+
+def test_files_cache(tmp_path):
+    cache = FilesCache(str(tmp_path / 'cache'))
+
+    assert cache.get('tables', {'schema': 1}) is None
+
+    cache.set('tables', {'schema': 1}, ['table'])
+
+    assert cache.get('tables', {'schema': 1}) == ['table']
+    assert cache.get('tables', {'schema': 2}) is None
+    assert not list((tmp_path / 'cache').glob('*.tmp'))
+
+
+def test_files_cache_damaged_file(tmp_path):
+    cache = FilesCache(str(tmp_path))
+
+    cache.set('tables', 'key', ['table'])
+
+    for file_path in tmp_path.iterdir():
+        file_path.write_text('{')
+
+    assert cache.get('tables', 'key') is None
+
+
+def test_files_cache_disabled():
+    cache = FilesCache('')
+
+    cache.set('tables', 'key', ['table'])
+
+    assert not cache.is_enabled
+    assert cache.get('tables', 'key') is None
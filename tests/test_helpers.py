@@ -0,0 +1,147 @@
+import pytest
+
+from databaser.core.helpers import (
+    get_dependency_levels,
+    get_int_environ_parameter,
+    get_status_rows_count,
+    get_str_environ_parameter,
+    get_strongly_connected_components,
+    make_chunks,
+)
+
+
+def test_strongly_connected_components_order():
+    components = get_strongly_connected_components(
+        nodes=['c', 'b', 'a'],
+        dependency_pairs=[('c', 'b'), ('b', 'a')],
+    )
+
+    # зависимости компоненты находятся раньше нее
+    assert components == [['a'], ['b'], ['c']]
+
+
+def test_strongly_connected_components_cycles():
+    components = get_strongly_connected_components(
+        nodes=['a', 'b', 'c', 'd'],
+        dependency_pairs=[
+            ('a', 'b'),
+            ('b', 'a'),
+            ('c', 'a'),
+            ('d', 'd'),
+        ],
+    )
+
+    assert sorted(map(sorted, components)) == [['a', 'b'], ['c'], ['d']]
+    assert components.index(['c']) > next(
+        index
+        for index, component in enumerate(components) if
+        'a' in component
+    )
+
+
+def test_strongly_connected_components_adds_dependency_nodes():
+    components = get_strongly_connected_components(
+        nodes=['a'],
+        dependency_pairs=[('a', 'b')],
+    )
+
+    assert components == [['b'], ['a']]
+
+
+def test_strongly_connected_components_deep_graph():
+    nodes = list(range(10000))
+
+    components = get_strongly_connected_components(
+        nodes=nodes,
+        dependency_pairs=zip(nodes[1:], nodes),
+    )
+
+    assert components == [[node] for node in nodes]
+
+
+def test_dependency_levels():
+    levels = get_dependency_levels(
+        nodes=['a', 'b', 'c', 'd'],
+        dependency_pairs=[
+            ('b', 'a'),
+            ('c', 'a'),
+            ('d', 'b'),
+            ('d', 'c'),
+            # зависимости от узлов вне графа считаются выполненными
+            ('a', 'x'),
+            # зависимость от самого себя не учитывается
+            ('b', 'b'),
+        ],
+    )
+
+    assert levels == [['a'], ['b', 'c'], ['d']]
+
+
+def test_dependency_levels_omit_cycles():
+    levels = get_dependency_levels(
+        nodes=['a', 'b', 'c', 'd'],
+        dependency_pairs=[
+            ('b', 'c'),
+            ('c', 'b'),
+            ('d', 'b'),
+        ],
+    )
+
+    assert levels == [['a']]
+
+
+@pytest.mark.parametrize(
+    'is_list',
+    (True, False),
+)
+def test_make_chunks(is_list):
+    chunks = [
+        list(chunk)
+        for chunk in make_chunks(range(7), size=3, is_list=is_list)
+    ]
+
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_make_chunks_of_empty():
+    assert list(make_chunks([], size=3)) == []
+
+
+@pytest.mark.parametrize(
+    'status, rows_count',
+    (
+        ('INSERT 0 70000', 70000),
+        ('COPY 70000', 70000),
+        ('UPDATE 0', 0),
+    ),
+)
+def test_get_status_rows_count(status, rows_count):
+    assert get_status_rows_count(status) == rows_count
+
+
+def test_get_int_environ_parameter(monkeypatch):
+    monkeypatch.setenv('DATABASER_TEST_INT', ' 10 ')
+
+    assert get_int_environ_parameter('DATABASER_TEST_INT', 5) == 10
+
+    monkeypatch.setenv('DATABASER_TEST_INT', '')
+
+    assert get_int_environ_parameter('DATABASER_TEST_INT', 5) == 5
+
+    monkeypatch.delenv('DATABASER_TEST_INT')
+
+    assert get_int_environ_parameter('DATABASER_TEST_INT', 5) == 5
+
+
+def test_get_str_environ_parameter(monkeypatch):
+    monkeypatch.setenv('DATABASER_TEST_STR', ' array ')
+
+    assert get_str_environ_parameter('DATABASER_TEST_STR', 'set') == 'array'
+
+    monkeypatch.setenv('DATABASER_TEST_STR', ' ')
+
+    assert get_str_environ_parameter('DATABASER_TEST_STR', 'set') == 'set'
+
+    monkeypatch.delenv('DATABASER_TEST_STR')
+
+    assert get_str_environ_parameter('DATABASER_TEST_STR', 'set') == 'set'
@@ -0,0 +1,148 @@
+import pytest
+
+from databaser.core.db_entities import (
+    DBColumn,
+    DBTable,
+)
+from databaser.core.enums import (
+    ConstraintTypesEnum,
+    LookupStrategiesEnum,
+)
+from databaser.core.planners import (
+    LookupsPlanner,
+)
+
+
+def make_table(full_count):
+    table = DBTable('table')
+    table.full_count = full_count
+
+    for column in (
+        DBColumn(
+            column_name='id',
+            table_name='table',
+            data_type='integer',
+            ordinal_position=1,
+            constraint_type=ConstraintTypesEnum.PRIMARY_KEY,
+        ),
+        DBColumn(
+            column_name='parent_id',
+            table_name='table',
+            data_type='integer',
+            ordinal_position=2,
+        ),
+    ):
+        table.columns[column.name] = column
+
+    return table
+
+
+def plan(planner, table, ids_count):
+    return planner.plan(
+        table=table,
+        column=table.columns['id'],
+        where_conditions_columns={
+            'parent_id': list(range(ids_count)),
+        },
+    )
+
+
+def test_fixed_strategy_is_used():
+    planner = LookupsPlanner(
+        strategy=LookupStrategiesEnum.TEMP_TABLE,
+        chunk_size=1000,
+    )
+
+    lookup_plan = plan(planner, make_table(full_count=10), ids_count=1)
+
+    assert lookup_plan.strategy == LookupStrategiesEnum.TEMP_TABLE
+    assert planner.get_statistic()[LookupStrategiesEnum.TEMP_TABLE] == 1
+
+
+def test_array_strategy_without_ids():
+    planner = LookupsPlanner(
+        strategy=LookupStrategiesEnum.AUTO,
+        chunk_size=1000,
+    )
+
+    lookup_plan = plan(planner, make_table(full_count=10), ids_count=0)
+
+    assert lookup_plan.strategy == LookupStrategiesEnum.ARRAY
+
+
+def test_full_scan_of_small_table():
+    planner = LookupsPlanner(
+        strategy=LookupStrategiesEnum.AUTO,
+        chunk_size=1000,
+    )
+
+    lookup_plan = plan(planner, make_table(full_count=10), ids_count=1000)
+
+    assert lookup_plan.strategy == LookupStrategiesEnum.FULL_SCAN
+
+
+def test_array_strategy_with_index():
+    planner = LookupsPlanner(
+        strategy=LookupStrategiesEnum.AUTO,
+        chunk_size=1000,
+    )
+    planner.set_indexed_columns([('table', 'parent_id')])
+
+    lookup_plan = plan(planner, make_table(full_count=1000000), ids_count=10)
+
+    assert lookup_plan.strategy == LookupStrategiesEnum.ARRAY
+
+
+def test_temp_table_strategy_without_index():
+    planner = LookupsPlanner(
+        strategy=LookupStrategiesEnum.AUTO,
+        chunk_size=1000,
+    )
+
+    lookup_plan = plan(
+        planner,
+        make_table(full_count=1000000),
+        ids_count=100000,
+    )
+
+    assert lookup_plan.strategy == LookupStrategiesEnum.TEMP_TABLE
+
+
+def test_key_columns_are_not_counted():
+    planner = LookupsPlanner(
+        strategy=LookupStrategiesEnum.AUTO,
+        chunk_size=1000,
+    )
+    table = make_table(full_count=10)
+
+    lookup_plan = planner.plan(
+        table=table,
+        column=table.columns['id'],
+        where_conditions_columns={
+            # значения ключевой колонки из настроек тестов
+            'key_id': list(range(1000)),
+        },
+    )
+
+    assert lookup_plan.strategy == LookupStrategiesEnum.ARRAY
+
+
+@pytest.mark.parametrize('full_count', (0, 10, 10000, 10000000))
+@pytest.mark.parametrize('ids_count', (1, 100, 10000, 1000000))
+@pytest.mark.parametrize('is_indexed', (True, False))
+def test_literal_strategy_is_not_chosen_automatically(
+    full_count,
+    ids_count,
+    is_indexed,
+):
+    planner = LookupsPlanner(
+        strategy=LookupStrategiesEnum.AUTO,
+        chunk_size=1000,
+    )
+
+    if is_indexed:
+        planner.set_indexed_columns([('table', 'parent_id')])
+
+    lookup_plan = plan(planner, make_table(full_count), ids_count)
+
+    assert lookup_plan.strategy != LookupStrategiesEnum.LITERAL
@@ -0,0 +1,209 @@
+import asyncio
+
+from databaser.core.schedulers import (
+    TaskScheduler,
+    WorkItemsScheduler,
+)
+
+
+def test_task_scheduler_limit_and_priority():
+    async def main():
+        scheduler = TaskScheduler(limit=1)
+        blocker = asyncio.Event()
+        order = []
+        max_in_flight = 0
+
+        async def work(name, priority, wait=False):
+            nonlocal max_in_flight
+
+            async with scheduler.slot(priority):
+                max_in_flight = max(max_in_flight, scheduler.in_flight)
+                order.append(name)
+
+                if wait:
+                    await blocker.wait()
+
+        first = asyncio.create_task(work('first', (0,), wait=True))
+        await asyncio.sleep(0)
+
+        tasks = [
+            asyncio.create_task(work('low', (2,))),
+            asyncio.create_task(work('high', (1,))),
+            asyncio.create_task(work('lowest', (3,))),
+        ]
+        await asyncio.sleep(0)
+
+        assert scheduler.queue_depth == 3
+
+        blocker.set()
+        await asyncio.gather(first, *tasks)
+
+        assert order == ['first', 'high', 'low', 'lowest']
+        assert max_in_flight == 1
+        assert scheduler.in_flight == 0
+        assert scheduler.get_statistic()['waited'] == 3
+
+    asyncio.run(main())
+
+
+def test_task_scheduler_releases_slot_of_cancelled_waiter():
+    async def main():
+        scheduler = TaskScheduler(limit=1)
+        blocker = asyncio.Event()
+
+        async def work():
+            async with scheduler.slot():
+                await blocker.wait()
+
+        first = asyncio.create_task(work())
+        await asyncio.sleep(0)
+
+        waiter = asyncio.create_task(work())
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        blocker.set()
+
+        await asyncio.gather(first, waiter, return_exceptions=True)
+
+        assert scheduler.in_flight == 0
+
+        # слот доступен после отмены ожидающей задачи
+        await asyncio.wait_for(work(), timeout=1)
+
+    asyncio.run(main())
+
+
+def test_task_scheduler_map_errors_do_not_stop_others():
+    async def main():
+        scheduler = TaskScheduler(limit=2)
+        results = []
+
+        async def work(value):
+            if value == 3:
+                raise ValueError(value)
+
+            results.append(value)
+
+        await scheduler.map(work(value) for value in range(6))
+
+        assert sorted(results) == [0, 1, 2, 4, 5]
+
+    asyncio.run(main())
+
+
+def test_task_scheduler_nested_map_bound():
+    async def main():
+        limit = 4
+        scheduler = TaskScheduler(limit=limit)
+        leaves_count = 0
+        max_tasks_count = 0
+
+        async def leaf():
+            nonlocal leaves_count, max_tasks_count
+
+            max_tasks_count = max(max_tasks_count, scheduler._tasks_count)
+
+            async with scheduler.slot():
+                await asyncio.sleep(0)
+
+            leaves_count += 1
+
+        async def level(depth):
+            if not depth:
+                await leaf()
+            else:
+                await scheduler.map(level(depth - 1) for _ in range(10))
+
+        await level(3)
+
+        assert leaves_count == 1000
+        assert max_tasks_count <= limit * TaskScheduler.TASKS_LIMIT_RATIO
+        assert scheduler.get_statistic()['tasks'] == 0
+
+    asyncio.run(main())
+
+
+def test_work_items_scheduler_takes_largest_group_first():
+    async def main():
+        processed = []
+        finished = []
+
+        async def process(group, chunk):
+            processed.append((group, chunk))
+
+        scheduler = WorkItemsScheduler(
+            workers_count=1,
+            process=process,
+            on_group_finished=finished.append,
+        )
+        scheduler.add('small', [1], chunks_count=1, chunk_cost=0.5)
+        scheduler.add('large', [1, 2, 3], chunks_count=3, chunk_cost=1)
+        scheduler.add('heavy', [1], chunks_count=1, chunk_cost=5)
+        scheduler.add('empty', [], chunks_count=0, chunk_cost=1)
+        scheduler.close()
+
+        await scheduler.run()
+
+        assert processed == [
+            ('heavy', 1),
+            ('large', 1),
+            ('large', 2),
+            ('large', 3),
+            ('small', 1),
+        ]
+        assert finished == ['heavy', 'large', 'small']
+        assert scheduler.get_statistic()['items'] == 5
+
+    asyncio.run(main())
+
+
+def test_work_items_scheduler_groups_added_while_running():
+    async def main():
+        processed = []
+        finished = []
+
+        async def process(group, chunk):
+            await asyncio.sleep(0)
+            processed.append((group, chunk))
+
+        scheduler = WorkItemsScheduler(
+            workers_count=2,
+            process=process,
+            on_group_finished=finished.append,
+        )
+        run_task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0)
+
+        # количество частей оценено с избытком
+        scheduler.add('first', iter([1, 2]), chunks_count=3, chunk_cost=1)
+        await asyncio.sleep(0.01)
+
+        scheduler.add('second', [1], chunks_count=1, chunk_cost=1)
+        scheduler.close()
+
+        await asyncio.wait_for(run_task, timeout=1)
+
+        assert sorted(processed) == [('first', 1), ('first', 2), ('second', 1)]
+        assert sorted(finished) == ['first', 'second']
+
+    asyncio.run(main())
+
+
+def test_work_items_scheduler_stops_on_error():
+    async def main():
+        async def process(group, chunk):
+            raise ValueError(chunk)
+
+        scheduler = WorkItemsScheduler(workers_count=2, process=process)
+        scheduler.add('group', [1, 2, 3], chunks_count=3, chunk_cost=1)
+
+        # без закрытия планировщика исполнители ожидали бы новые группы
+        try:
+            await asyncio.wait_for(scheduler.run(), timeout=1)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('error of processing is not raised')
+
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+from types import (
+    SimpleNamespace,
+)
+
+import numpy as np
+import pytest
+
+from databaser.core.db_entities import (
+    DBColumn,
+    DBTable,
+)
+from databaser.core.enums import (
+    ConstraintTypesEnum,
+)
+from databaser.core.snapshots import (
+    PKSnapshot,
+    get_schema_fingerprint,
+)
+from databaser.core.storages import (
+    ArrayPKStorage,
+    SetPKStorage,
+)
+
+
+def make_table(name, data_type):
+    table = DBTable(name)
+    table.columns['id'] = DBColumn(
+        column_name='id',
+        table_name=name,
+        data_type=data_type,
+        ordinal_position=1,
+        constraint_type=ConstraintTypesEnum.PRIMARY_KEY,
+    )
+
+    return table
+
+
+def make_database():
+    # для снимка используются только таблицы базы-приемника
+    return SimpleNamespace(
+        tables={
+            'integer_table': make_table('integer_table', 'integer'),
+            'text_table': make_table('text_table', 'text'),
+            'empty_table': make_table('empty_table', 'integer'),
+        },
+    )
+
+
+def test_schema_fingerprint():
+    fingerprint = get_schema_fingerprint(make_database())
+
+    assert fingerprint == get_schema_fingerprint(make_database())
+
+    database = make_database()
+    database.tables['text_table'].columns['id'].data_type = 'uuid'
+
+    assert fingerprint != get_schema_fingerprint(database)
+
+
+def test_save_and_load(tmp_path):
+    database = make_database()
+    integer_table = database.tables['integer_table']
+    integer_table.need_transfer_pks.update([3, 1, 2])
+    integer_table.full_count = 10
+    integer_table.max_pk = 3
+    database.tables['text_table'].need_transfer_pks.update(['a', 'b'])
+
+    snapshot = PKSnapshot(str(tmp_path))
+    snapshot.save(
+        dst_database=database,
+        key_column_values={2, 1},
+        source_lsn='0/16B3748',
+    )
+
+    assert snapshot.exists()
+
+    loaded_database = make_database()
+    manifest = snapshot.load(loaded_database)
+
+    assert manifest['key_column_values'] == [1, 2]
+    assert manifest['source_lsn'] == '0/16B3748'
+    assert set(manifest['tables']) == {'integer_table', 'text_table'}
+
+    integer_pks = loaded_database.tables['integer_table'].need_transfer_pks
+
+    assert isinstance(integer_pks, ArrayPKStorage)
+    assert isinstance(integer_pks.array, np.memmap)
+    assert list(integer_pks) == [1, 2, 3]
+    assert loaded_database.tables['integer_table'].full_count == 10
+    assert loaded_database.tables['integer_table'].max_pk == 3
+    assert loaded_database.tables['integer_table'].is_ready_for_transferring
+
+    text_pks = loaded_database.tables['text_table'].need_transfer_pks
+
+    assert isinstance(text_pks, SetPKStorage)
+    assert set(text_pks) == {'a', 'b'}
+
+    assert not loaded_database.tables['empty_table'].need_transfer_pks
+
+
+def test_resaving_keeps_loaded_pks(tmp_path):
+    database = make_database()
+    database.tables['integer_table'].need_transfer_pks.update([10, 20, 30])
+
+    snapshot = PKSnapshot(str(tmp_path))
+    snapshot.save(database, key_column_values={1}, source_lsn=None)
+
+    _, tables_pks = snapshot.load_tables_pks(make_database())
+    loaded_pks = tables_pks['integer_table']
+
+    database.tables['integer_table'].need_transfer_pks = ArrayPKStorage([40])
+    snapshot.save(database, key_column_values={1}, source_lsn=None)
+
+    # отображенный в память файл прежнего снимка остается доступным
+    assert list(loaded_pks) == [10, 20, 30]
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_load_of_another_schema(tmp_path):
+    snapshot = PKSnapshot(str(tmp_path))
+    snapshot.save(make_database(), key_column_values={1}, source_lsn=None)
+
+    database = make_database()
+    database.tables['integer_table'].columns['id'].data_type = 'bigint'
+
+    with pytest.raises(ValueError):
+        snapshot.load(database)
@@ -0,0 +1,242 @@
+import os
+from types import (
+    SimpleNamespace,
+)
+
+import numpy as np
+import pytest
+
+from databaser.core.storages import (
+    ArrayPKStorage,
+    PKStoragesSpiller,
+    SetPKStorage,
+    make_pk_storage,
+)
+
+
+@pytest.fixture
+def small_merge_threshold(monkeypatch):
+    monkeypatch.setattr(ArrayPKStorage, 'MERGE_THRESHOLD', 4)
+
+
+def make_array_storage(pks):
+    return ArrayPKStorage(pks)
+
+
+def test_array_storage_deduplicates_and_sorts():
+    storage = make_array_storage([5, 3, 5, 1, 3])
+
+    assert len(storage) == 3
+    assert storage.array.tolist() == [1, 3, 5]
+    assert list(storage) == [1, 3, 5]
+
+
+def test_array_storage_update_merges_pending(small_merge_threshold):
+    storage = make_array_storage([10, 20])
+
+    storage.update([20, 30])
+    storage.update(np.array([1, 40, 10], dtype=np.int32))
+    storage.update(make_array_storage([2, 3]))
+
+    assert storage.array.tolist() == [1, 2, 3, 10, 20, 30, 40]
+    assert storage.array.dtype == np.int64
+
+
+def test_array_storage_empty():
+    storage = make_array_storage([])
+
+    assert not storage
+    assert len(storage) == 0
+    assert 1 not in storage
+    assert list(storage.chunks(10)) == []
+
+    storage.update([])
+
+    assert not storage
+
+
+def test_array_storage_contains():
+    storage = make_array_storage([1, 3, 5])
+
+    assert 3 in storage
+    assert 4 not in storage
+    assert 6 not in storage
+    assert 0 not in storage
+
+
+def test_array_storage_missing():
+    storage = make_array_storage([1, 3, 5])
+
+    missing = storage.missing([5, 6, 1, 7, 6])
+
+    assert isinstance(missing, ArrayPKStorage)
+    assert missing.array.tolist() == [6, 7]
+    # исходное хранилище не изменяется
+    assert storage.array.tolist() == [1, 3, 5]
+
+
+def test_array_storage_difference():
+    storage = make_array_storage([1, 2, 3, 4])
+
+    assert storage.difference([2, 4, 8]).array.tolist() == [1, 3]
+    assert storage.difference(make_array_storage([])).array.tolist() == [
+        1, 2, 3, 4,
+    ]
+    assert not storage.difference(storage)
+
+
+def test_array_storage_chunks():
+    storage = make_array_storage(range(10))
+
+    assert list(storage.chunks(4)) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_array_storage_from_sorted_array_keeps_array():
+    array = np.array([1, 2, 3], dtype=np.int64)
+
+    storage = ArrayPKStorage.from_sorted_array(array)
+
+    assert storage.array is array
+
+
+def test_array_storage_spill_and_load(tmp_path):
+    storage = make_array_storage([3, 1, 2])
+    run_path = str(tmp_path / '1.npy')
+
+    storage.spill(run_path)
+
+    assert storage.is_spilled
+    assert storage.memory_size == 0
+    assert os.path.exists(run_path)
+    assert storage
+    assert len(storage) == 3
+    # части читаются из файла без загрузки массива
+    assert list(storage.chunks(2)) == [[1, 2], [3]]
+    assert storage.is_spilled
+
+    assert storage.array.tolist() == [1, 2, 3]
+    assert not storage.is_spilled
+    assert not os.path.exists(run_path)
+
+
+def test_array_storage_update_of_spilled(tmp_path):
+    storage = make_array_storage([1, 2])
+
+    storage.spill(str(tmp_path / '1.npy'))
+    storage.update([2, 3])
+
+    assert len(storage) == 3
+    assert storage.array.tolist() == [1, 2, 3]
+    assert 3 in storage
+
+
+def test_array_storage_spill_of_empty(tmp_path):
+    storage = make_array_storage([])
+    run_path = str(tmp_path / '1.npy')
+
+    storage.spill(run_path)
+
+    assert not storage.is_spilled
+    assert not os.path.exists(run_path)
+
+
+def test_array_storage_memory_size():
+    storage = make_array_storage([1, 2, 3])
+
+    assert storage.memory_size == 3 * 8
+
+
+def test_set_storage():
+    storage = SetPKStorage(['a', 'b'])
+
+    storage.update(['b', 'c'])
+
+    assert len(storage) == 3
+    assert 'c' in storage
+    assert set(storage.missing(['c', 'd'])) == {'d'}
+    assert set(storage.difference(['a'])) == {'b', 'c'}
+    assert sorted(pk for chunk in storage.chunks(2) for pk in chunk) == [
+        'a', 'b', 'c',
+    ]
+    assert storage.memory_size == 3 * SetPKStorage.ITEM_SIZE
+
+
+def test_make_pk_storage_by_column_type():
+    # для выбора хранилища нужен только тип данных колонки
+    integer_column = SimpleNamespace(data_type='integer')
+    text_column = SimpleNamespace(data_type='text')
+
+    assert isinstance(make_pk_storage(column=integer_column), ArrayPKStorage)
+    assert isinstance(make_pk_storage(column=text_column), SetPKStorage)
+    assert isinstance(make_pk_storage(), SetPKStorage)
+    assert list(make_pk_storage(column=integer_column, pks=[2, 1])) == [1, 2]
+
+
+def test_spiller_spills_least_recently_used(tmp_path):
+    spiller = PKStoragesSpiller(
+        memory_limit=4 * 8,
+        directory=str(tmp_path),
+    )
+
+    first = make_array_storage([1, 2, 3])
+    second = make_array_storage([4, 5, 6])
+    third = make_array_storage([7])
+
+    spiller.touch('first', first)
+    spiller.touch('second', second)
+    spiller.touch('third', third)
+    spiller.check()
+
+    assert first.is_spilled
+    assert not second.is_spilled
+    assert spiller.spills == 1
+    assert spiller.spilled_size == 3 * 8
+
+    statistic = spiller.get_statistic()
+
+    assert statistic['storages'] == 3
+    assert statistic['spilled_storages'] == 1
+
+    # выгруженное хранилище загружается при обращении
+    assert first.array.tolist() == [1, 2, 3]
+
+    spiller.clear()
+
+
+def test_spiller_keeps_most_recently_used(tmp_path):
+    spiller = PKStoragesSpiller(
+        memory_limit=0,
+        directory=str(tmp_path),
+    )
+
+    storage = make_array_storage([1, 2, 3])
+
+    spiller.touch('table', storage)
+    spiller.check()
+
+    assert not storage.is_spilled
+
+    spiller.clear()
+
+
+def test_spiller_checks_by_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(PKStoragesSpiller, 'CHECK_INTERVAL', 2)
+
+    spiller = PKStoragesSpiller(
+        memory_limit=0,
+        directory=str(tmp_path),
+    )
+
+    first = make_array_storage([1])
+    second = make_array_storage([2])
+
+    spiller.touch('first', first)
+
+    assert not first.is_spilled
+
+    spiller.touch('second', second)
+
+    assert first.is_spilled
+    assert not second.is_spilled
+
+    spiller.clear()